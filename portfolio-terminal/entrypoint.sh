@@ -6,5 +6,8 @@ mkdir -p /home/coder/projects
 # Set permissions (don't fail if chown doesn't work in Render)
 chown -R coder:coder /home/coder 2>/dev/null || true
 
-# Start the terminal service
-exec uvicorn main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
+# Start the terminal service; several workers run behind a supervisor
+if [ "${TERMINAL_WORKERS:-1}" -gt 1 ]; then
+	exec uvicorn main:supervisor_app --host 0.0.0.0 --port 8000
+fi
+exec uvicorn main:app --host 0.0.0.0 --port 8000
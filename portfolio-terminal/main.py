@@ -1,15 +1,28 @@
 # portfolio-terminal/main.py
 
 import asyncio
+import bisect
+import functools
+import hashlib
+import io
 import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import re
+import secrets
 import shutil
-import tempfile
+import stat
+import struct
+import sys
+import threading
 import time
 import uuid
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -17,17 +30,156 @@ import aiohttp
 import boto3
 import psutil
 import redis
+from botocore.config import Config as BotoConfig
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse
-from pexpect import EOF, spawn
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+from pexpect import EOF, TIMEOUT, spawn
 
 logger = logging.getLogger(__name__)
 
+LOG_LEVEL = os.environ.get('TERMINAL_LOG_LEVEL', 'INFO').upper()
+# "text" for key=value lines, "json" for one JSON object per line
+LOG_FORMAT = os.environ.get('TERMINAL_LOG_FORMAT', 'text')
+# Fraction of each event that is written as a line, as "event=rate,...".
+# Events not listed are always written; every event is counted either way.
+LOG_SAMPLE = os.environ.get('TERMINAL_LOG_SAMPLE', 'pty_output=0,shell_resize=0.1,command_allowed=0.1')
+# Lines per second per event before further lines are dropped (0: no limit)
+LOG_RATE_LIMIT = float(os.environ.get('TERMINAL_LOG_RATE_LIMIT', '10'))
+
+def parse_sample_rates(spec):
+	rates = {}
+	for item in spec.split(','):
+		event, _, rate = item.partition('=')
+		if event.strip() and rate.strip():
+			rates[event.strip()] = float(rate)
+	return rates
+
+class EventLogger:
+	"""
+	Named events with key=value fields on top of the module logger.
+
+	Every event is counted (see terminal_log_events_total). Whether it also
+	becomes a line depends on the logger level, the event's sample rate and
+	a per-event token bucket of rate_limit lines per second; lines dropped
+	by the bucket are reported as suppressed=N on the event's next line.
+	"""
+
+	def __init__(self, logger, sample_rates=None, rate_limit=0):
+		self.logger = logger
+		self.sample_rates = sample_rates or {}
+		self.rate_limit = rate_limit
+		self.counts = {}
+		self.suppressed = {}
+		self._buckets = {}  # event -> [tokens, last refill, suppressed since last line]
+
+	def log(self, level, event, message='', **fields):
+		self.counts[event] = self.counts.get(event, 0) + 1
+		rate = self.sample_rates.get(event, 1.0)
+		if rate <= 0 or not self.logger.isEnabledFor(level):
+			return
+		if rate < 1:
+			if random.random() >= rate:
+				return
+			fields['sample_rate'] = rate
+		if self.rate_limit > 0 and not self._take(event, fields):
+			return
+		self.logger.log(level, message, extra={'event': event, 'fields': fields})
+
+	def _take(self, event, fields):
+		now = time.monotonic()
+		bucket = self._buckets.get(event)
+		if bucket is None:
+			bucket = self._buckets[event] = [self.rate_limit, now, 0]
+		else:
+			bucket[0] = min(self.rate_limit, bucket[0] + (now - bucket[1]) * self.rate_limit)
+			bucket[1] = now
+		if bucket[0] < 1:
+			bucket[2] += 1
+			self.suppressed[event] = self.suppressed.get(event, 0) + 1
+			return False
+		bucket[0] -= 1
+		if bucket[2]:
+			fields['suppressed'], bucket[2] = bucket[2], 0
+		return True
+
+	def debug(self, event, message='', **fields):
+		self.log(logging.DEBUG, event, message, **fields)
+
+	def info(self, event, message='', **fields):
+		self.log(logging.INFO, event, message, **fields)
+
+	def warning(self, event, message='', **fields):
+		self.log(logging.WARNING, event, message, **fields)
+
+	def error(self, event, message='', **fields):
+		self.log(logging.ERROR, event, message, **fields)
+
+class StructuredFormatter(logging.Formatter):
+	"""Formats records, with their event and fields, as key=value text or JSON"""
+
+	def __init__(self, json_output=False):
+		super().__init__()
+		self.json_output = json_output
+
+	def format(self, record):
+		event = getattr(record, 'event', None)
+		fields = dict(getattr(record, 'fields', {}))
+		timestamp = self.formatTime(record, '%Y-%m-%dT%H:%M:%S')
+		message = record.getMessage()
+		if self.json_output:
+			payload = {'ts': timestamp, 'level': record.levelname, 'event': event}
+			if message:
+				payload['message'] = message
+			payload.update(fields)
+			return json.dumps(payload, default=str)
+		line = f"{timestamp} {record.levelname} {event or '-'}"
+		if message:
+			line += f" {message}"
+		if fields:
+			line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+		return line
+
+log = EventLogger(logger, parse_sample_rates(LOG_SAMPLE), LOG_RATE_LIMIT)
+log_listener = None
+
+def configure_logging():
+	"""
+	Send the module's log records through a queue to a writer thread, so a
+	slow stdout never blocks the event loop. Called from the app lifespans.
+	"""
+	global log_listener
+	if log_listener is not None:
+		return
+	records = queue.SimpleQueue()
+	handler = logging.StreamHandler(sys.stdout)
+	handler.setFormatter(StructuredFormatter(json_output=LOG_FORMAT == 'json'))
+	log_listener = logging.handlers.QueueListener(records, handler)
+	log_listener.start()
+	logger.addHandler(logging.handlers.QueueHandler(records))
+	logger.setLevel(LOG_LEVEL)
+
+def stop_logging():
+	global log_listener
+	if log_listener is None:
+		return
+	log_listener.stop()
+	log_listener = None
+	for handler in [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+		logger.removeHandler(handler)
+
 # Security: Allowed project slugs (whitelist approach)
 ALLOWED_PROJECTS = {
 	'minishell', 'push_swap', 'philosophers', 'minitalk', 
 	'fdf', 'ft_irc', 'minirt', 'cub3d', 'ft_transcendence'
 }
+PROJECTS_DIR = os.environ.get('TERMINAL_PROJECTS_DIR', "/home/coder/projects")
+# Set by the supervisor (see supervisor_app) on each worker process it runs
+WORKER_ID = os.environ.get('TERMINAL_WORKER_ID')
+SANDBOXES_DIR = os.environ.get('TERMINAL_SANDBOXES_DIR', '/home/coder/sandboxes')
+if WORKER_ID is not None:
+	# Each worker clears its own sandboxes on startup, never a sibling's
+	SANDBOXES_DIR = os.path.join(SANDBOXES_DIR, f"worker-{WORKER_ID}")
+WORKSPACE_MODE = os.environ.get('TERMINAL_WORKSPACE_MODE', 'hardlink')
 
 def sanitize_project_slug(project_slug: str) -> str:
 	"""
@@ -103,41 +255,63 @@ def apply_security_restrictions(child_process):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 	# Startup code
-	print("Starting terminal service...")
+	configure_logging()
+	log.info('service_starting', "Starting terminal service", worker=WORKER_ID)
+
+	# Workspaces left behind by a previous run belong to sessions that are gone
+	if os.path.isdir(SANDBOXES_DIR):
+		for entry in os.listdir(SANDBOXES_DIR):
+			shutil.rmtree(os.path.join(SANDBOXES_DIR, entry), ignore_errors=True)
 
 	# Start health check task
 	health_check_task = asyncio.create_task(periodic_health_checks())
+	# Keep pre-spawned shells ready for projects that are on disk
+	pool_task = asyncio.create_task(shell_pool.run())
+	# Fetch every project in the background so first visitors find it cached
+	prefetch_task = asyncio.create_task(prefetch_projects())
+	# Keep this process's sessions alive in the Redis registry
+	registry_task = asyncio.create_task(session_registry.run())
+	# Sample per-session usage and shed load above the watermarks
+	admission_task = asyncio.create_task(admission.run())
+	# Close sessions left idle or past their lifetime
+	reaper_task = asyncio.create_task(reaper.run())
 
 	# Check terminal security (skip in development mode)
 	is_dev = os.getenv('DEBUG', 'False').lower() in ('true', '1', 't')
 	if not is_dev and not check_terminal_security():
-		print("Security check failed. Shutting down...")
+		log.error('security_check_failed', "Security check failed. Shutting down")
 		yield
 		return
 	elif is_dev:
-		print("Running in development mode - security checks skipped")
+		log.info('security_check_skipped', "Running in development mode - security checks skipped")
 
 	yield
 
 	# Shutdown code
-	print("Shutting down terminal service...")
+	log.info('service_stopping', "Shutting down terminal service")
 
-	# Cancel health check task
-	health_check_task.cancel()
-	try:
-		await health_check_task
-	except asyncio.CancelledError:
-		pass
+	# Cancel background tasks
+	for task in (health_check_task, pool_task, prefetch_task, registry_task, admission_task, reaper_task):
+		task.cancel()
+		try:
+			await task
+		except asyncio.CancelledError:
+			pass
+	await shell_pool.close_all()
 
-	# Terminate all active terminals
+	# Close sessions, detached ones included, then anything still running
+	for session in list(terminal_sessions.values()):
+		await session.close()
 	for session_id, child in active_terminals.items():
 		try:
 			child.close()
-			print(f"Terminated terminal session {session_id}")
+			log.info('session_terminated', session=session_id)
 		except Exception as e:
-			print(f"Error terminating session {session_id}: {e}")
+			log.error('session_terminate_failed', str(e), session=session_id)
+	await async_redis.aclose()
 
-	print("Terminal service shutdown complete")
+	log.info('service_stopped', "Terminal service shutdown complete")
+	stop_logging()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -154,542 +328,2629 @@ async def periodic_health_checks():
 				for name, url in services.items():
 					try:
 						async with session.get(f"{url}/healthz", timeout=5) as response:
-							print(f"Health check to {name}: {response.status}")
+							log.info('health_check', service=name, status=response.status)
 					except Exception as e:
-						print(f"Failed health check to {name}: {str(e)}")
+						log.warning('health_check_failed', str(e), service=name)
 		except Exception as e:
-			print(f"Error in health checks: {str(e)}")
+			log.error('health_check_failed', str(e))
 
 		# Wait for 10 minutes before next check
 		await asyncio.sleep(600)  # 600 seconds = 10 minutes
 
 active_terminals = {}
-error_counter = 0
-last_error_message = ""
-last_error_timestamp = None
+# Max bytes pulled from a PTY per readiness callback
+PTY_READ_SIZE = int(os.environ.get('TERMINAL_PTY_READ_SIZE', '4096'))
+# Output read from a PTY but not yet sent on; reading stops past this until it is
+PTY_BACKLOG_BYTES = int(os.environ.get('TERMINAL_PTY_BACKLOG_BYTES', str(64 * 1024)))
+# Bulk output is held for up to this long (or until the byte cap) and sent as one frame
+COALESCE_WINDOW = float(os.environ.get('TERMINAL_COALESCE_WINDOW_MS', '8')) / 1000
+COALESCE_MAX_BYTES = int(os.environ.get('TERMINAL_COALESCE_MAX_BYTES', '16384'))
 
+# Optional binary framing, negotiated through the WebSocket subprotocol.
+# Each binary frame is a 1-byte opcode followed by the payload. Clients that
+# don't request the subprotocol keep using JSON text frames.
+BINARY_SUBPROTOCOL = 'terminal.binary.v1'
+OP_INPUT = 0x00    # client -> server: UTF-8 keystrokes
+OP_OUTPUT = 0x01   # server -> client: UTF-8 terminal output
+OP_RESIZE = 0x02   # client -> server: rows, cols as big-endian uint16
+OP_CONTROL = 0x03  # both ways: UTF-8 JSON object (errors, status, ...)
 
-redis_client = redis.Redis.from_url(
-	os.environ.get('REDIS_URL', 'redis://localhost:6379'),
-	decode_responses=True
-)
+def encode_frame(opcode, payload=b''):
+	"""Build a binary protocol frame"""
+	if isinstance(payload, str):
+		payload = payload.encode('utf-8')
+	return bytes((opcode,)) + payload
 
-@app.get("/metrics")
-async def metrics():
-	memory = psutil.virtual_memory()
-	return {
-		"memory_used_percent": memory.percent,
-		"active_terminals": len(active_terminals),
-		"uptime": time.time() - app_start_time
-	}
+def decode_frame(data):
+	"""
+	Parse a binary protocol frame into a (kind, payload) message.
+	Raises ValueError on malformed frames.
+	"""
+	if not data:
+		raise ValueError("Empty frame")
+	opcode, payload = data[0], data[1:]
+	if opcode == OP_INPUT:
+		return 'input', payload.decode('utf-8', errors='replace')
+	if opcode == OP_RESIZE:
+		if len(payload) != 4:
+			raise ValueError("Resize frame must carry 4 bytes")
+		return 'resize', struct.unpack('!HH', payload)
+	if opcode == OP_CONTROL:
+		return 'control', json.loads(payload)
+	raise ValueError(f"Unknown opcode: {opcode}")
 
-app_start_time = time.time()
+def parse_json_message(data):
+	"""
+	Parse a JSON text frame into a (kind, payload) message.
+	Anything that isn't a JSON object is treated as raw input.
+	"""
+	try:
+		message = json.loads(data)
+	except json.JSONDecodeError:
+		return 'input', data
+	if not isinstance(message, dict):
+		return 'input', data
+	if isinstance(message.get('resize'), dict):
+		return 'resize', (message['resize'].get('rows', 24), message['resize'].get('cols', 80))
+	if 'input' in message:
+		return 'input', str(message['input'])
+	return 'control', message
 
-@app.get("/healthz")
-async def health_check():
-	return {"status": "healthy"}
+class TerminalSocket:
+	"""Speaks either the binary or the JSON framing over a FastAPI WebSocket"""
 
-@app.websocket("/terminal/{project_slug}/")
-async def terminal_endpoint(websocket: WebSocket, project_slug: str):
-	await websocket.accept()
-	logger.info("WebSocket connection accepted for %s", project_slug)
-	
-	# Initialize variables that might be used in finally block
-	read_task = None
+	def __init__(self, websocket, binary=False):
+		self.websocket = websocket
+		self.binary = binary
 
-	try:
-		# Validate and sanitize project slug
-		project_slug = sanitize_project_slug(project_slug)
-	except HTTPException as e:
-		await websocket.send_json({'error': e.detail})
-		await websocket.close()
-		return
+	@classmethod
+	async def accept(cls, websocket):
+		"""Accept the connection, selecting the binary protocol if the client offers it"""
+		binary = BINARY_SUBPROTOCOL in websocket.scope.get('subprotocols', [])
+		await websocket.accept(subprotocol=BINARY_SUBPROTOCOL if binary else None)
+		return cls(websocket, binary)
 
-	# Create unique session ID
-	session_id = str(uuid.uuid4())
-	logger.info("Generated session ID: %s", session_id)
-	
-	# Store terminal session in Redis
-	session_info = {
-		'id': session_id,
-		'project': project_slug,
-		'created': time.time(),
-		'client_ip': websocket.client.host
-	}
-	
-	try:
-		redis_client.setex(f"terminal_session:{session_id}", 3600, json.dumps(session_info))
-	except Exception as e:
-		logger.error("Redis error: %s", e)
-	
-	try:
-		# Check for project directory and download files if needed
-		# Use safe_join_path to prevent path traversal
-		base_projects_dir = "/home/coder/projects"
-		project_dir = safe_join_path(base_projects_dir, project_slug)
-		should_download = False
-		
-		if not os.path.exists(project_dir):
-			os.makedirs(project_dir, exist_ok=True)
-			should_download = True
+	async def send_output(self, text):
+		"""Send terminal output, returning the size of the frame on the wire"""
+		if self.binary:
+			frame = encode_frame(OP_OUTPUT, text)
+			await self.websocket.send_bytes(frame)
 		else:
-			# Directory exists, but check if it's empty or just contains README
-			files = os.listdir(project_dir)
-			if not files or (len(files) == 1 and 'README.md' in files):
-				should_download = True
-		
-		if should_download:
-			await websocket.send_json({
-				'output': f"\r\n📦 Downloading project files for {project_slug}...\r\n"
-			})
-			await websocket.send_json({
-				'output': "This may take 1-2 minutes for large projects. Please wait...\r\n\r\n"
-			})
-			
-			# Download in a separate thread to avoid blocking
-			loop = asyncio.get_event_loop()
-			files_downloaded = await loop.run_in_executor(
-				None, download_project_files, project_slug, project_dir
-			)
-			
-			if not files_downloaded:
-				await websocket.send_json({
-					'output': "\r\n⚠️  Failed to download project files. Using empty project.\r\n"
-				})
-			else:
-				await websocket.send_json({
-					'output': "\r\n✅ Project files downloaded successfully!\r\n"
-				})
+			frame = json.dumps({'output': text})
+			await self.websocket.send_text(frame)
+		return len(frame)
+
+	async def send_control(self, message):
+		if self.binary:
+			await self.websocket.send_bytes(encode_frame(OP_CONTROL, json.dumps(message)))
 		else:
-			logger.info("Using existing project directory: %s, contains: %s", project_dir, os.listdir(project_dir))
-		
-		env = os.environ.copy()
-		env['TERM'] = 'xterm-256color'
-		env['PS1'] = '\\[\\033[1;32m\\]\\u@\\h:\\[\\033[1;34m\\]\\w\\[\\033[0m\\]\\$ '
-		env['HOME'] = '/home/coder'
-		env['PATH'] = '/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin'
-
-		# Initialize terminal with bash instead of zsh - more reliable
-		await websocket.send_json({
-			'output': "\r\n🚀 Spawning terminal session...\r\n"
-		})
-		
-		# Use bash instead of zsh for more reliable prompt detection
-		child = spawn('/bin/bash', ['--login'], cwd=project_dir, env=env, encoding='utf-8', timeout=300)
-		env, _ = apply_security_restrictions(child)
-		child.setwinsize(40, 120)  # Initial size
+			await self.websocket.send_text(json.dumps(message))
 
-		
-		# More permissive prompt detection with longer timeout
-		# Account for:
-		# - Shell initialization scripts (bashrc, profile)
-		# - Network-mounted home directories
-		# - Slow I/O on Render free tier
-		try:
-			# More lenient prompt patterns to catch various bash prompt styles
-			# Including: colored prompts, custom PS1, unicode characters
-			await asyncio.wait_for(
-				asyncio.get_event_loop().run_in_executor(
-					None, lambda: child.expect([
-						r'[$#>]',  # Basic prompt chars
-					r'bash.*[$#>]',  # bash-4.4$
-					r'[@\w-]+[:~].*[$#>]',  # user@host:path$
-					r'\[.*\].*[$#>]',  # Colored prompts with escape codes
-					r'.*[$#>]\s*$',  # Any prompt ending with $/#/>
-				])
-				),
-				timeout=45  # Increased from 15s to 45s to handle slow initialization
-			)
-			logger.info("Bash prompt detected successfully")
-		except asyncio.TimeoutError:
-			# Don't fail - just log and continue
-			# The terminal might be ready even if we didn't detect the prompt
-			logger.warning("Prompt detection timed out after 45s, but continuing anyway")
-			await websocket.send_json({
-				'output': "\r\n⚠️  Prompt detection timed out, but terminal should be ready.\r\n"
-			})
-		except Exception as e:
-			logger.error("Error waiting for prompt: %s", e)
-			await websocket.send_json({
-				'output': f"\r\n⚠️  Prompt detection error: {str(e)}, but terminal may still work.\r\n"
-			})
-		
-		active_terminals[session_id] = child
-		
-		# Send welcome message
-		await websocket.send_json({
-			'output': f"\r\n\r\nWelcome to {project_slug} terminal! Type 'ls' to see project files.\r\n"
-		})
-		
-		# Read from terminal in background task
-		read_task = asyncio.create_task(read_terminal_output(websocket, child))
-		
-		# Process client messages
-		while True:
-			data = await websocket.receive_text()
+	async def receive(self):
+		"""Wait for the next client message as a (kind, payload) tuple"""
+		message = await self.websocket.receive()
+		if message['type'] == 'websocket.disconnect':
+			raise WebSocketDisconnect(message.get('code', 1000))
+		if message.get('bytes') is not None:
+			return decode_frame(message['bytes'])
+		return parse_json_message(message.get('text') or '')
+
+	async def close(self, code=1000):
+		await self.websocket.close(code)
+
+class FrameStats:
+	"""Running totals and a trailing per-second window of frames sent to clients"""
+
+	def __init__(self, window_seconds=60):
+		self.window_seconds = window_seconds
+		self.frames = 0
+		self.bytes = 0
+		self._buckets = deque()  # [second, frames, bytes]
+
+	def record(self, size):
+		self.frames += 1
+		self.bytes += size
+		now = int(time.time())
+		if self._buckets and self._buckets[-1][0] == now:
+			self._buckets[-1][1] += 1
+			self._buckets[-1][2] += size
+		else:
+			self._buckets.append([now, 1, size])
+		self._trim(now)
+
+	def _trim(self, now):
+		while self._buckets and self._buckets[0][0] <= now - self.window_seconds:
+			self._buckets.popleft()
+
+	def snapshot(self):
+		self._trim(int(time.time()))
+		frames = sum(b[1] for b in self._buckets)
+		size = sum(b[2] for b in self._buckets)
+		return {
+			'output_frames_total': self.frames,
+			'output_bytes_total': self.bytes,
+			'output_frames_per_second': round(frames / self.window_seconds, 2),
+			'output_bytes_per_frame': round(size / frames, 1) if frames else 0,
+		}
+
+output_stats = FrameStats()
+
+class OutputCoalescer:
+	"""
+	Batch PTY output into fewer, larger WebSocket frames.
+
+	Chunks are buffered until COALESCE_WINDOW has passed since the first
+	buffered chunk or COALESCE_MAX_BYTES is reached. The first chunk read
+	after user input is flushed immediately so keystroke echo is not delayed.
+	"""
+
+	def __init__(self, terminal, window=None, max_bytes=None):
+		self.terminal = terminal
+		self.window = COALESCE_WINDOW if window is None else window
+		self.max_bytes = COALESCE_MAX_BYTES if max_bytes is None else max_bytes
+		self._pending = []
+		self._pending_size = 0
+		self._deadline = None
+		self._echo_expected = False
+
+	def note_input(self):
+		"""Called when input is written to the PTY: flush its echo right away"""
+		self._echo_expected = True
+
+	@property
+	def pending(self):
+		"""Size of the output buffered for the next frame"""
+		return self._pending_size
+
+	def time_until_flush(self):
+		"""Seconds until buffered output must be sent, or None if nothing is buffered"""
+		if self._deadline is None:
+			return None
+		return max(0.0, self._deadline - time.monotonic())
+
+	async def push(self, text):
+		self._pending.append(text)
+		self._pending_size += len(text)
+		if self._deadline is None:
+			self._deadline = time.monotonic() + self.window
+		if self._echo_expected or self._pending_size >= self.max_bytes or self.window <= 0:
+			self._echo_expected = False
+			await self.flush()
+
+	async def flush(self):
+		if not self._pending:
+			return
+		output = ''.join(self._pending)
+		self._pending.clear()
+		self._pending_size = 0
+		self._deadline = None
+		size = await self.terminal.send_output(output)
+		if size:
+			output_stats.record(size)
+
+# Unacknowledged output at which a session stops reading its PTY, and the
+# level acks must bring it back down to before reading resumes
+FLOW_HIGH_WATER = int(os.environ.get('TERMINAL_FLOW_HIGH_WATER', str(256 * 1024)))
+FLOW_LOW_WATER = int(os.environ.get('TERMINAL_FLOW_LOW_WATER', str(64 * 1024)))
+
+class FlowControl:
+	"""
+	Credit-based backpressure between a session's PTY and its client.
+
+	Positions are output byte offsets, the same ones a client resumes from.
+	A client opts in by acking the offset it has consumed ({"ack": offset});
+	once its unacknowledged output, counting what was read but not sent
+	yet, reaches high_water the reader stops draining the PTY, so the kernel
+	buffer fills and blocks the program writing to it, and reading resumes
+	when acks bring the backlog down to low_water. Clients that never ack
+	are not throttled.
+	"""
+
+	def __init__(self, high_water=None, low_water=None):
+		self.high_water = FLOW_HIGH_WATER if high_water is None else high_water
+		self.low_water = FLOW_LOW_WATER if low_water is None else low_water
+		self.sent = 0
+		self.acked = 0
+		self.enabled = False
+		self._open = asyncio.Event()
+		self._open.set()
+
+	@property
+	def unacked(self):
+		return self.sent - self.acked
+
+	@property
+	def paused(self):
+		return not self._open.is_set()
+
+	def describe(self):
+		"""Announced to clients: ack at least every ack_bytes to never stall"""
+		return {'window': self.high_water, 'ack_bytes': max(1, self.low_water // 2)}
+
+	def reset(self, position):
+		"""A client attached having received everything up to position"""
+		self.sent = self.acked = position
+		self.enabled = False
+		self._open.set()
+
+	def on_sent(self, position):
+		self.sent = position
+		if self.enabled and not self.paused and self.unacked >= self.high_water:
+			self._open.clear()
+			flow_pauses.inc()
+
+	def on_ack(self, position):
+		self.enabled = True
+		# Acks past what was sent come from lines the client got elsewhere
+		self.acked = max(self.acked, min(position, self.sent))
+		if self.unacked <= self.low_water:
+			self._open.set()
+		elif self.unacked >= self.high_water:
+			# Output sent before the client opted in already fills the window
+			self._open.clear()
+
+	def blocks(self, pending):
+		"""Whether reading should stop, with pending bytes read but not sent yet"""
+		return self.paused or (self.enabled and self.unacked + pending >= self.high_water)
+
+	def release(self):
+		"""Stop throttling, e.g. because the client went away"""
+		self.enabled = False
+		self._open.set()
+
+	async def wait(self):
+		await self._open.wait()
+
+# Sustained output rate a session may stream, and the burst it may send at once
+OUTPUT_RATE_BYTES = int(os.environ.get('TERMINAL_OUTPUT_RATE_BYTES', str(64 * 1024)))
+OUTPUT_BURST_BYTES = int(os.environ.get('TERMINAL_OUTPUT_BURST_BYTES', str(256 * 1024)))
+# Output streamed per command, counted from the last input so a pager gets a
+# fresh allowance for each key; matches the API's MAX_OUTPUT_LENGTH
+MAX_OUTPUT_PER_COMMAND = int(os.environ.get('TERMINAL_MAX_OUTPUT_PER_COMMAND', '10000'))
+# Suppressed output is summarized once it has been quiet this long, and at
+# least this often while it keeps coming
+OUTPUT_SUMMARY_QUIET_SECONDS = float(os.environ.get('TERMINAL_OUTPUT_SUMMARY_QUIET_SECONDS', '0.25'))
+OUTPUT_SUMMARY_MAX_DELAY = float(os.environ.get('TERMINAL_OUTPUT_SUMMARY_MAX_DELAY', '2'))
+# Most recent suppressed output shown after the summary, so the prompt isn't lost
+OUTPUT_SUMMARY_TAIL_BYTES = 256
+
+def utf8_boundary(data, index):
+	"""Largest index <= index in data that doesn't fall inside a UTF-8 character"""
+	index = max(0, min(index, len(data)))
+	while 0 < index < len(data) and data[index] & 0xC0 == 0x80:
+		index -= 1
+	return index
+
+class OutputBudget:
+	"""
+	Caps what a session streams to protect bandwidth and the browser.
+
+	A token bucket (rate bytes/s, up to burst) bounds throughput and
+	per_command bounds the output of a single command, counted from the last
+	input, not just the last Enter, so paging through man or less keeps
+	working. Output over either limit is dropped rather than sent, without
+	slowing the program producing it, and is replaced by a summary line
+	("... N bytes suppressed ...") followed by its last few bytes. Once the
+	rate limit trips, streaming resumes only after the bucket has refilled
+	halfway, so a flood alternates between bursts and summaries instead of
+	interleaving them. A limit of 0 disables it.
+	"""
+
+	REASONS = {
+		'rate': "output rate limit",
+		'command': "output limit per command",
+	}
+
+	def __init__(self, rate=None, burst=None, per_command=None, tail_bytes=OUTPUT_SUMMARY_TAIL_BYTES):
+		self.rate = OUTPUT_RATE_BYTES if rate is None else rate
+		self.burst = OUTPUT_BURST_BYTES if burst is None else burst
+		self.per_command = MAX_OUTPUT_PER_COMMAND if per_command is None else per_command
+		self.tail_bytes = tail_bytes
+		self.tokens = float(self.burst)
+		self.command_bytes = 0
+		# Bytes dropped since the last summary, and why
+		self.suppressed = 0
+		self.reason = None
+		# When the output behind the pending summary started being dropped
+		self.suppressed_since = None
+		self.suppressed_total = 0
+		self._tail = b''
+		self._refilled = time.monotonic()
+		self._rate_limited = False
+
+	def note_input(self):
+		"""Called when input is written to the PTY: start counting the command's output again"""
+		self.command_bytes = 0
+
+	def _refill(self):
+		now = time.monotonic()
+		if self.rate:
+			self.tokens = min(float(self.burst), self.tokens + (now - self._refilled) * self.rate)
+		self._refilled = now
+
+	def admit(self, text):
+		"""The part of text to stream, preceded by a summary of what was dropped before it"""
+		data = text.encode('utf-8')
+		self._refill()
+		allowed, reason = len(data), None
+		if self.per_command:
+			remaining = max(0, self.per_command - self.command_bytes)
+			if remaining < allowed:
+				allowed, reason = remaining, 'command'
+		if self.rate:
+			if self._rate_limited and self.tokens >= self.burst / 2:
+				self._rate_limited = False
+			available = 0 if self._rate_limited else int(self.tokens)
+			if available < allowed:
+				allowed, reason = available, 'rate'
+				self._rate_limited = True
+		# Cut on a character boundary; the rest of a split character is suppressed with what follows
+		allowed = utf8_boundary(data, allowed)
+		if self.rate:
+			self.tokens -= allowed
+		self.command_bytes += allowed
+		summary = self.summary(tail=False) if allowed and self.suppressed else ''
+		if allowed < len(data):
+			self._suppress(data[allowed:], reason)
+		return summary + data[:allowed].decode('utf-8')
+
+	def charge(self, text):
+		"""Count output that must be sent whatever the limits, such as the server's own notices"""
+		size = len(text.encode('utf-8'))
+		self._refill()
+		if self.rate:
+			self.tokens -= size
+		self.command_bytes += size
+
+	def _suppress(self, data, reason):
+		if not self.suppressed:
+			self.suppressed_since = time.monotonic()
+		self.suppressed += len(data)
+		self.suppressed_total += len(data)
+		self.reason = reason
+		tail = self._tail + data
+		self._tail = tail[utf8_boundary(tail, len(tail) - self.tail_bytes):] if len(tail) > self.tail_bytes else tail
+		output_suppressed_bytes.labels(reason).inc(len(data))
+
+	def summary(self, tail=True):
+		"""Line standing in for the output dropped so far, '' if there is none"""
+		if not self.suppressed:
+			return ''
+		line = f"\r\n\x1b[0m... {self.suppressed} bytes suppressed ({self.REASONS[self.reason]}) ...\r\n"
+		if tail:
+			line += self._tail.decode('utf-8')
+		self.suppressed = 0
+		self.suppressed_since = None
+		self._tail = b''
+		return line
+
+# A shell outlives its WebSocket by this long, waiting for the client to reattach
+SESSION_GRACE_SECONDS = float(os.environ.get('TERMINAL_SESSION_GRACE_SECONDS', '60'))
+# Recent output kept per session and replayed to a reattaching client
+SCROLLBACK_BYTES = int(os.environ.get('TERMINAL_SCROLLBACK_BYTES', str(64 * 1024)))
+
+class Scrollback:
+	"""Ring buffer of the most recent output bytes, addressed by absolute offset"""
+
+	def __init__(self, max_bytes=None):
+		self.max_bytes = SCROLLBACK_BYTES if max_bytes is None else max_bytes
+		# Bytes of output ever appended; the offset just past the newest byte
+		self.total = 0
+		self._buffer = bytearray()
+
+	def append(self, text):
+		data = text.encode('utf-8')
+		self.total += len(data)
+		self._buffer += data
+		if len(self._buffer) > self.max_bytes:
+			del self._buffer[:len(self._buffer) - self.max_bytes]
+
+	def since(self, offset=None):
+		"""Output after offset, or all that is retained if offset is None or too old"""
+		start = self.total - len(self._buffer)
+		if offset is None or offset < start:
+			offset = start
+		# The oldest bytes may be the tail of a split character
+		return bytes(self._buffer[offset - start:]).decode('utf-8', errors='ignore')
+
+terminal_sessions = {}
+session_stats = {'resumed': 0, 'expired': 0}
+
+class TerminalSession:
+	"""
+	A shell that outlives its WebSocket.
+
+	PTY output is sent through send_output, which keeps it in the scrollback
+	and forwards it to the attached socket, if any. When the socket drops the
+	session is detached, and it closes after SESSION_GRACE_SECONDS unless a
+	client presenting its token reattaches first.
+	"""
+
+	def __init__(self, session_id, project_slug, child, workspace, scrollback_bytes=None):
+		self.session_id = session_id
+		self.project_slug = project_slug
+		self.child = child
+		self.workspace = workspace
+		self.token = secrets.token_urlsafe(32)
+		self.scrollback = Scrollback(scrollback_bytes)
+		self.terminal = None
+		self.coalescer = OutputCoalescer(self)
+		self.flow = FlowControl()
+		self.budget = OutputBudget()
+		self.read_task = None
+		self.detached_at = None
+		self.started_at = time.monotonic()
+		self.last_input = self.started_at
+		self.last_output = self.started_at
+		# Limit the client was last warned about, so each warning is sent once
+		self.warned = None
+		# Latest process-tree usage, refreshed by the admission controller
+		self.resources = {}
+		self.closed = False
+		self._expiry = None
+		self._summary = None
+		# Keeps replay and live output from interleaving on attach
+		self._lock = asyncio.Lock()
+
+	def start(self):
+		terminal_sessions[self.session_id] = self
+		active_terminals[self.session_id] = self.child
+		self.read_task = asyncio.create_task(
+			read_terminal_output(self, self.child, self.coalescer, self.session_id, self.flow)
+		)
+		self.read_task.add_done_callback(self._on_shell_exit)
+
+	def _on_shell_exit(self, task):
+		# Nobody is left to see a detached shell that exited
+		if self.terminal is None and not self.closed:
+			self._expire(0)
+
+	def matches(self, token):
+		return secrets.compare_digest(self.token, token or '')
+
+	async def send_output(self, text):
+		self.last_output = time.monotonic()
+		text = self.budget.admit(text)
+		if self.budget.suppressed:
+			self._schedule_summary()
+		if not text:
+			return 0
+		return await self._forward(text)
+
+	def _schedule_summary(self):
+		"""Summarize suppressed output once it goes quiet, or after OUTPUT_SUMMARY_MAX_DELAY"""
+		if self._summary is not None:
+			if time.monotonic() - self.budget.suppressed_since >= OUTPUT_SUMMARY_MAX_DELAY:
+				return
+			self._summary.cancel()
+		def summarize():
+			self._summary = None
+			summary = self.budget.summary()
+			if summary and not self.closed:
+				asyncio.create_task(self._forward(summary))
+		self._summary = asyncio.get_running_loop().call_later(OUTPUT_SUMMARY_QUIET_SECONDS, summarize)
+
+	async def _forward(self, text):
+		async with self._lock:
+			self.scrollback.append(text)
+			if self.terminal is None:
+				return 0
+			self.flow.on_sent(self.scrollback.total)
 			try:
-				message = json.loads(data)
-				
-				# Handle resize commands
-				if 'resize' in message and isinstance(message['resize'], dict):
-					rows = message['resize'].get('rows', 24)
-					cols = message['resize'].get('cols', 80)
-					logger.info("Resizing terminal to %sx%s", rows, cols)
-					child.setwinsize(rows, cols)
-				
-				# Handle input with command validation
-				elif 'input' in message:
-					user_input = message['input']
-					
-					# Check if this looks like a command (ends with enter/newline)
-					if '\r' in user_input or '\n' in user_input:
-						# Extract the command (everything before the newline)
-						command = user_input.replace('\r', '').replace('\n', '').strip()
-						
-						# Validate command before sending to shell
-						if command and not validate_command(command):
-							# Command blocked - notify user
-							await websocket.send_json({
-								'output': f"\r\n❌ Command blocked by security policy: '{command}'\r\n"
-							})
-							await websocket.send_json({
-								'output': "Only basic file inspection and compilation commands are allowed.\r\n"
-							})
-							# Don't send to the shell
-							continue
-					
-					# Command is allowed or is just keystrokes - send to shell
-					child.write(user_input)
-					
-			except json.JSONDecodeError:
-				# Treat as raw input
-				child.write(data)
+				started = time.perf_counter()
+				size = await self.terminal.send_output(text)
+				websocket_send_seconds.observe(time.perf_counter() - started)
+				return size
 			except Exception as e:
-				logger.error("Error processing message: %s", e)
-				await websocket.send_json({
-					'output': f"\r\nError: {str(e)}\r\n"
-				})
-				
-	except WebSocketDisconnect:
-		logger.info("WebSocket disconnected for session %s", session_id)
-	except Exception as e:
-		logger.error("Terminal session error: %s", e)
-		try:
-			await websocket.send_json({
-				'output': f"\r\n\r\nTerminal error: {str(e)}\r\n"
+				# The receive loop notices the disconnect and detaches
+				logger.debug("Dropping output for session %s: %s", self.session_id, e)
+				return 0
+
+	async def attach(self, terminal, offset=None):
+		"""Make terminal the session's socket, replaying the output it missed"""
+		async with self._lock:
+			previous = self.terminal
+			self.terminal = terminal
+			self.detached_at = None
+			if self._expiry is not None:
+				self._expiry.cancel()
+				self._expiry = None
+			missed = self.scrollback.since(offset)
+			if missed:
+				await terminal.send_output(missed)
+			await terminal.send_control({
+				'session': {
+					'id': self.session_id,
+					'token': self.token,
+					# Offset of the next output byte, for ?offset= and acks
+					'offset': self.scrollback.total,
+				},
+				'flow': self.flow.describe(),
 			})
-		except (RuntimeError, ConnectionError) as send_error:
-			logger.debug("Failed to send error message: %s", send_error)
-	finally:
-		if read_task and not read_task.done():
-			read_task.cancel()
+			self.flow.reset(self.scrollback.total)
+		if previous is not None and previous is not terminal:
+			# A newer connection took over, e.g. after a silent network change
 			try:
-				await read_task
-			except asyncio.CancelledError:
+				await previous.close(code=4000)
+			except (RuntimeError, ConnectionError):
 				pass
-		# Cleanup on disconnect
-		if session_id in active_terminals:
+
+	async def detach(self, terminal):
+		"""terminal went away: keep the shell for the grace period, or close now"""
+		if self.terminal is not terminal:
+			return
+		self.terminal = None
+		self.detached_at = time.monotonic()
+		# Detached output only goes to the scrollback, which never blocks
+		self.flow.release()
+		if SESSION_GRACE_SECONDS <= 0 or not self.child.isalive():
+			await self.close()
+		else:
+			self._expire(SESSION_GRACE_SECONDS)
+
+	def _expire(self, delay):
+		def expire():
+			session_stats['expired'] += 1
+			self._expiry = asyncio.create_task(self.close())
+		self._expiry = asyncio.get_running_loop().call_later(delay, expire)
+
+	async def notify(self, text):
+		"""
+		Show the client a notice of the server's own. It is output like the
+		shell's, so it goes to the scrollback and counts toward flow control,
+		keeping the offsets of both ends in step, and is charged to the output
+		budget, though never suppressed by it.
+		"""
+		self.budget.charge(text)
+		return await self._forward(text)
+
+	async def warn(self, limit, seconds, message):
+		"""Tell an attached client the session is about to be reaped"""
+		terminal = self.terminal
+		if terminal is None:
+			return
+		try:
+			await terminal.send_control({'warning': {'limit': limit, 'seconds': int(seconds)}})
+		except (RuntimeError, ConnectionError) as e:
+			logger.debug("Failed to warn session %s: %s", self.session_id, e)
+			return
+		await self.notify(f"\r\n{message}\r\n")
+
+	async def close(self, reason=None):
+		"""End the session; reason, if given, is shown to an attached client first"""
+		if self.closed:
+			return
+		self.closed = True
+		if self._expiry is not None and self._expiry is not asyncio.current_task():
+			self._expiry.cancel()
+		if self._summary is not None:
+			self._summary.cancel()
+		if self.terminal is not None and reason:
+			await self.notify(f"\r\n\r\n{reason}\r\n")
+		terminal, self.terminal = self.terminal, None
+		if terminal is not None and reason:
 			try:
-				active_terminals[session_id].terminate()
-				del active_terminals[session_id]
-				logger.info("Terminated session %s", session_id)
-			except Exception as cleanup_error:
-				logger.error("Failed to terminate session %s: %s", session_id, cleanup_error)
+				await terminal.close(code=4001)
+			except (RuntimeError, ConnectionError) as e:
+				logger.debug("Failed to notify session %s: %s", self.session_id, e)
+		terminal_sessions.pop(self.session_id, None)
+		active_terminals.pop(self.session_id, None)
+		if self.read_task is not None and not self.read_task.done():
+			self.read_task.cancel()
+			try:
+				await self.read_task
+			except asyncio.CancelledError:
+				pass
+		try:
+			self.child.terminate()
+			logger.info("Terminated session %s", self.session_id)
+		except Exception as cleanup_error:
+			logger.error("Failed to terminate session %s: %s", self.session_id, cleanup_error)
+		if self.workspace:
+			await asyncio.get_running_loop().run_in_executor(None, remove_workspace, self.workspace)
+		try:
+			await session_registry.unregister(self.session_id)
+		except Exception as e:
+			logger.error("Redis error: %s", e)
+			record_error('redis', e)
 
-async def read_terminal_output(websocket, child):
-	while True:
+def process_tree_usage(pid):
+	"""CPU seconds, RSS, open fds and process count for pid and its descendants"""
+	usage = {'cpu_seconds': 0.0, 'rss_bytes': 0, 'fds': 0, 'processes': 0}
+	try:
+		root = psutil.Process(pid)
+		processes = [root] + root.children(recursive=True)
+	except psutil.Error:
+		return usage
+	for process in processes:
 		try:
-			output = await asyncio.get_event_loop().run_in_executor(
-				None, lambda: child.read_nonblocking(size=1024, timeout=0.1)
-			)
-			if output:
-				print(f"Read from terminal: {output[:20]}...")
-				try:
-					await websocket.send_text(json.dumps({
-						'output': output
-					}))
-					print(f"Sent message to client, length: {len(output)}")
-				except Exception as e:
-					print(f"Error sending to WebSocket: {e}")
-					break  # Break the loop if WebSocket is disconnected
-		except EOF:
-			await websocket.send_text(json.dumps({
-				'output': "\r\nSession terminated.\r\n"
-			}))
-			break
-		except Exception:
-			# Timeout or other error, just continue
-			await asyncio.sleep(0.1)
+			with process.oneshot():
+				cpu = process.cpu_times()
+				usage['cpu_seconds'] += cpu.user + cpu.system
+				usage['rss_bytes'] += process.memory_info().rss
+				usage['fds'] += process.num_fds()
+				usage['processes'] += 1
+		except psutil.Error:
+			# Exited while we were looking
+			continue
+	usage['cpu_seconds'] = round(usage['cpu_seconds'], 2)
+	return usage
 
-def validate_command(command):
-	"""Validate terminal commands with improved security"""
-	# Strip whitespace for cleaner matching
-	command = command.strip()
-	
-	# Allow empty commands (just pressing enter)
-	if not command:
-		return True
-	
-	# Allowlist approach for basic commands
-	allowed_patterns = [
-		# Basic navigation and file inspection
-		r'^ls(\s+-[altrh]+)*(\s+[\w\./-]+)*$',
-		r'^cat(\s+[\w\./-]+)+$',
-		r'^cd(\s+[\w\./-]+)?$',
-		r'^pwd$',
-		r'^echo\s+.*$',
-		r'^clear$',
-		
-		# Development commands
-		r'^make(\s+[\w-]+)?$',
-		r'^gcc(\s+-[a-zA-Z]+)*(\s+[\w\./-]+)+$',
-		r'^./[\w-]+$',  # Run executables in current directory
-		
-		# Basic file manipulation
-		r'^touch\s+[\w\./-]+$',
-		r'^mkdir(\s+-p)?\s+[\w\./-]+$',
-		
-		# Help commands
-		r'^help$',
-		r'^man\s+[\w-]+$',
-		r'^download\s+[\w\./-]+$',
-	]
-	
-	# Check if command matches any allowed pattern
-	for pattern in allowed_patterns:
-		if re.match(pattern, command):
-			logger.info("Command allowed by pattern: %s", command)
+class AdmissionController:
+	"""
+	Keeps the host usable for every visitor.
+
+	A background loop samples host CPU and memory and each session's process
+	tree. A session whose tree outgrows max_session_rss is closed, and while
+	the host is above a watermark the most idle sessions are evicted, detached
+	ones first, one per sample so a single CPU spike can't empty the host.
+	New sessions are admitted only below both watermarks: they wait up to
+	wait_seconds for room, then are refused, and CPU is measured again after
+	each session evicted for them.
+	"""
+
+	def __init__(self, memory_high, cpu_high, wait_seconds, evict_min_idle, max_session_rss, interval):
+		self.memory_high = memory_high
+		self.cpu_high = cpu_high
+		self.wait_seconds = wait_seconds
+		self.evict_min_idle = evict_min_idle
+		self.max_session_rss = max_session_rss
+		self.interval = interval
+		self.cpu_percent = 0.0
+		self.counts = {'admitted': 0, 'queued': 0, 'refused': 0, 'evicted': 0, 'killed_over_limit': 0}
+
+	def measure_cpu(self):
+		# Average CPU since the previous measurement
+		self.cpu_percent = psutil.cpu_percent(interval=None)
+
+	def overloaded(self):
+		return psutil.virtual_memory().percent >= self.memory_high or self.cpu_percent >= self.cpu_high
+
+	def eviction_candidates(self):
+		"""Sessions idle long enough to evict, most idle first, detached before attached"""
+		now = time.monotonic()
+		idle = [
+			session for session in terminal_sessions.values()
+			if not session.closed and now - session.last_input >= self.evict_min_idle
+		]
+		return sorted(idle, key=lambda session: (session.terminal is not None, session.last_input))
+
+	async def evict_one(self):
+		for session in self.eviction_candidates():
+			logger.warning("Evicting idle session %s to relieve load", session.session_id)
+			self.counts['evicted'] += 1
+			await session.close("⚠️  This idle session was closed to free resources for other visitors.")
 			return True
-		
-	# Container escape checks - CRITICAL SECURITY
-	blocked_sequences = [
-		'docker', 'kubectl', 'sudo', 'su ', 'ssh',
-		'--privileged', '--cap-add', 'nsenter', 
-		'unshare', 'mount', 'umount', 'chroot',
-		'pivot_root', 'cgroup', 'setns', 'ptrace',
-		'ld.so', 'proc', '/dev/'
-	]
-	
-	if any(seq in command for seq in blocked_sequences):
-		logger.warning("Blocked command with suspicious sequence: %s", command)
-		return False
-		
-	# Path traversal protection
-	if any('../' in part for part in command.split()):
-		logger.warning("Blocked command with path traversal: %s", command)
-		return False
-		
-	# Protect against command chaining/injection
-	command_operators = [';', '&&', '||', '`', '$(',  '|', '>', '<']
-	if any(op in command for op in command_operators):
-		logger.warning("Blocked command with operator: %s", command)
-		return False
-		
-	# Additional deny list for extra security
-	dangerous_commands = [
-		'rm -rf', 'chmod 777', ':(){', 'curl | bash',
-		'wget | bash', '> /dev', '> /proc', '> /sys'
-	]
-	
-	if any(cmd in command for cmd in dangerous_commands):
-		logger.warning("Blocked dangerous command: %s", command)
 		return False
 
-	# If nothing matched, deny by default (security first)
-	logger.warning("Command denied (no matching pattern): %s", command)
-	return False
+	async def admit(self, on_wait=None):
+		"""True once a new session may start, False if the host stayed overloaded"""
+		deadline = time.monotonic() + self.wait_seconds
+		waited = False
+		while self.overloaded():
+			if await self.evict_one():
+				# Give the kernel a moment to reclaim the evicted tree
+				await asyncio.sleep(0.5)
+				self.measure_cpu()
+				continue
+			if time.monotonic() >= deadline:
+				self.counts['refused'] += 1
+				return False
+			if not waited:
+				waited = True
+				self.counts['queued'] += 1
+				if on_wait is not None:
+					await on_wait()
+			await asyncio.sleep(min(1.0, self.interval))
+		self.counts['admitted'] += 1
+		return True
 
-@app.get("/error-stats")
-async def error_statistics():
-	return {
-		"errors": error_counter,
-		"last_error": last_error_message,
-		"last_error_time": last_error_timestamp
-	}
+	async def sample(self):
+		loop = asyncio.get_running_loop()
+		self.measure_cpu()
+		for session in list(terminal_sessions.values()):
+			session.resources = await loop.run_in_executor(None, process_tree_usage, session.child.pid)
+			if self.max_session_rss and session.resources['rss_bytes'] > self.max_session_rss and not session.closed:
+				logger.warning("Session %s exceeded %d bytes RSS", session.session_id, self.max_session_rss)
+				self.counts['killed_over_limit'] += 1
+				await session.close(
+					f"⛔ Session closed: it used more than {self.max_session_rss // 1048576} MB of memory."
+				)
+		if self.overloaded():
+			# The next sample sees whether that was enough
+			await self.evict_one()
 
-def download_project_files(project_slug, project_dir):
-	"""Download project files from S3 if they exist, or copy from local backend in DEBUG mode"""
-	try:
-		# Check if running in DEBUG mode (local development)
-		is_dev = os.getenv('DEBUG', 'False').lower() in ('true', '1', 't')
-		
-		if is_dev:
-			# Local development: copy from backend media directory
-			local_zip_path = f'/backend-media/project-files/{project_slug}.zip'
-			if os.path.exists(local_zip_path):
-				print(f"Using local project files: {local_zip_path}")
+	async def run(self):
+		while True:
+			await asyncio.sleep(self.interval)
+			try:
+				await self.sample()
+			except Exception as e:
+				logger.error("Resource sampling failed: %s", e)
+
+	def stats(self):
+		return {
+			**self.counts,
+			'cpu_percent': self.cpu_percent,
+			'memory_high_percent': self.memory_high,
+			'cpu_high_percent': self.cpu_high,
+		}
+
+admission = AdmissionController(
+	memory_high=float(os.environ.get('TERMINAL_MEMORY_HIGH_PERCENT', '85')),
+	cpu_high=float(os.environ.get('TERMINAL_CPU_HIGH_PERCENT', '90')),
+	wait_seconds=float(os.environ.get('TERMINAL_ADMISSION_WAIT_SECONDS', '30')),
+	evict_min_idle=float(os.environ.get('TERMINAL_EVICT_MIN_IDLE_SECONDS', '120')),
+	max_session_rss=int(os.environ.get('TERMINAL_SESSION_MAX_RSS_MB', '512')) * 1048576,
+	interval=float(os.environ.get('TERMINAL_RESOURCE_INTERVAL', '5')),
+)
+
+class SessionReaper:
+	"""
+	Closes sessions nobody is using.
+
+	A session is idle once neither input nor output has happened for
+	idle_timeout seconds, and expires max_lifetime seconds after it started
+	regardless of activity. warning_seconds before either limit the client
+	gets a warning frame; activity after an idle warning resets the clock.
+	"""
+
+	MESSAGES = {
+		'idle': (
+			"⏳ This session has been idle and will close in {seconds}s. Press a key to keep it open.",
+			"⏹️  Session closed after {minutes} minutes of inactivity.",
+		),
+		'lifetime': (
+			"⏳ This session reaches its time limit in {seconds}s. Save anything you need.",
+			"⏹️  Session closed: the {minutes} minute limit was reached. Reload to start a new one.",
+		),
+	}
+
+	def __init__(self, idle_timeout, max_lifetime, warning_seconds, interval):
+		self.idle_timeout = idle_timeout
+		self.max_lifetime = max_lifetime
+		self.warning_seconds = warning_seconds
+		self.interval = interval
+		self.counts = {'idle': 0, 'lifetime': 0}
+
+	def deadline(self, session, now):
+		"""(limit, seconds left) for whichever limit the session reaches first"""
+		remaining = []
+		if self.idle_timeout:
+			last_activity = max(session.last_input, session.last_output)
+			remaining.append((self.idle_timeout - (now - last_activity), 'idle'))
+		if self.max_lifetime:
+			remaining.append((self.max_lifetime - (now - session.started_at), 'lifetime'))
+		if not remaining:
+			return None, None
+		seconds, limit = min(remaining)
+		return limit, seconds
+
+	async def sweep(self):
+		now = time.monotonic()
+		for session in list(terminal_sessions.values()):
+			if session.closed:
+				continue
+			limit, seconds = self.deadline(session, now)
+			if limit is None:
+				continue
+			warning, farewell = self.MESSAGES[limit]
+			timeout = self.idle_timeout if limit == 'idle' else self.max_lifetime
+			if seconds <= 0:
+				logger.info("Reaping session %s: %s limit reached", session.session_id, limit)
+				self.counts[limit] += 1
+				await session.close(farewell.format(minutes=round(timeout / 60)))
+			elif seconds <= self.warning_seconds:
+				if session.warned != limit:
+					session.warned = limit
+					await session.warn(limit, seconds, warning.format(seconds=int(seconds)))
+			else:
+				session.warned = None
+
+	async def run(self):
+		while True:
+			await asyncio.sleep(self.interval)
+			try:
+				await self.sweep()
+			except Exception as e:
+				logger.error("Session reaper failed: %s", e)
+
+	def stats(self):
+		return {
+			'reaped_idle_total': self.counts['idle'],
+			'reaped_lifetime_total': self.counts['lifetime'],
+			'idle_timeout_seconds': self.idle_timeout,
+			'max_lifetime_seconds': self.max_lifetime,
+		}
+
+# Defaults match TERMINAL_SETTINGS['MAX_SESSION_DURATION'] in the API
+reaper = SessionReaper(
+	idle_timeout=float(os.environ.get('TERMINAL_IDLE_TIMEOUT_SECONDS', '600')),
+	max_lifetime=float(os.environ.get('TERMINAL_MAX_SESSION_SECONDS', '900')),
+	warning_seconds=float(os.environ.get('TERMINAL_REAP_WARNING_SECONDS', '60')),
+	interval=float(os.environ.get('TERMINAL_REAP_INTERVAL', '5')),
+)
+
+error_counter = 0
+last_error_message = ""
+last_error_timestamp = None
+
+def record_error(where, error):
+	"""Count an error for /error-stats and terminal_errors_total"""
+	global error_counter, last_error_message, last_error_timestamp
+	error_counter += 1
+	last_error_message = f"{where}: {error}"
+	last_error_timestamp = time.time()
+	errors_total.labels(where).inc()
+
+
+# Blocking client, only for code that already runs in executor threads
+redis_client = redis.Redis.from_url(
+	os.environ.get('REDIS_URL', 'redis://localhost:6379'),
+	decode_responses=True
+)
+
+# Event-loop code talks to Redis through a shared asyncio pool; the socket
+# timeout bounds how long a slow Redis can hold up a session.
+async_redis = redis.asyncio.Redis(
+	connection_pool=redis.asyncio.ConnectionPool.from_url(
+		os.environ.get('REDIS_URL', 'redis://localhost:6379'),
+		max_connections=int(os.environ.get('TERMINAL_REDIS_MAX_CONNECTIONS', '20')),
+		socket_timeout=float(os.environ.get('TERMINAL_REDIS_TIMEOUT', '2')),
+		socket_connect_timeout=float(os.environ.get('TERMINAL_REDIS_TIMEOUT', '2')),
+		decode_responses=True,
+	)
+)
+
+class SessionRegistry:
+	"""
+	Terminal sessions in Redis.
+
+	Each session is a hash at terminal_session:<id> holding its metadata,
+	last heartbeat and last input/output times. The terminal_sessions sorted
+	set indexes sessions by last heartbeat, so listing the active ones is one
+	range query. Activity is recorded in memory and written with the periodic
+	heartbeat; every write is a single pipelined round trip.
+	"""
+
+	INDEX_KEY = 'terminal_sessions'
+
+	def __init__(self, client, ttl=3600, heartbeat_interval=30):
+		self.client = client
+		self.ttl = ttl
+		self.heartbeat_interval = heartbeat_interval
+		# A session that missed three heartbeats is gone (its process died)
+		self.stale_after = heartbeat_interval * 3
+		self._activity = {}
+		# Ids from active() as of the last heartbeat, None until one succeeds
+		self.registered = None
+
+	@staticmethod
+	def key(session_id):
+		return f"terminal_session:{session_id}"
+
+	async def register(self, session_id, info):
+		now = time.time()
+		self._activity[session_id] = {}
+		pipe = self.client.pipeline(transaction=False)
+		pipe.hset(self.key(session_id), mapping={
+			**{field: str(value) for field, value in info.items()},
+			'last_heartbeat': now,
+		})
+		pipe.expire(self.key(session_id), self.ttl)
+		pipe.zadd(self.INDEX_KEY, {session_id: now})
+		await pipe.execute()
+
+	def touch(self, session_id, field):
+		"""Note activity (last_input/last_output) for the next heartbeat; no I/O"""
+		if session_id in self._activity:
+			self._activity[session_id][field] = time.time()
+
+	async def unregister(self, session_id):
+		self._activity.pop(session_id, None)
+		pipe = self.client.pipeline(transaction=False)
+		pipe.delete(self.key(session_id))
+		pipe.zrem(self.INDEX_KEY, session_id)
+		await pipe.execute()
+
+	async def heartbeat(self):
+		"""Refresh every local session and flush its activity in one round trip"""
+		if not self._activity:
+			return
+		now = time.time()
+		pipe = self.client.pipeline(transaction=False)
+		for session_id, activity in self._activity.items():
+			pipe.hset(self.key(session_id), mapping={**activity, 'last_heartbeat': now})
+			pipe.expire(self.key(session_id), self.ttl)
+		pipe.zadd(self.INDEX_KEY, {session_id: now for session_id in self._activity})
+		for activity in self._activity.values():
+			activity.clear()
+		await pipe.execute()
+
+	async def active(self):
+		"""Ids of sessions with a recent heartbeat, across every process"""
+		cutoff = time.time() - self.stale_after
+		pipe = self.client.pipeline(transaction=False)
+		pipe.zremrangebyscore(self.INDEX_KEY, '-inf', cutoff)
+		pipe.zrangebyscore(self.INDEX_KEY, cutoff, '+inf')
+		_, session_ids = await pipe.execute()
+		return session_ids
+
+	async def run(self):
+		while True:
+			await asyncio.sleep(self.heartbeat_interval)
+			try:
+				await self.heartbeat()
+				self.registered = sorted(await self.active())
+			except redis.RedisError as e:
+				logger.error("Session heartbeat failed: %s", e)
+
+session_registry = SessionRegistry(
+	async_redis,
+	heartbeat_interval=float(os.environ.get('TERMINAL_SESSION_HEARTBEAT', '30')),
+)
+
+# Prompt detection for freshly spawned shells. Patterns are lenient to catch
+# colored prompts, custom PS1 and unicode characters, and the timeout accounts
+# for shell init scripts and slow I/O on the Render free tier.
+PROMPT_PATTERNS = [
+	r'[$#>]',  # Basic prompt chars
+	r'bash.*[$#>]',  # bash-4.4$
+	r'[@\w-]+[:~].*[$#>]',  # user@host:path$
+	r'\[.*\].*[$#>]',  # Colored prompts with escape codes
+	r'.*[$#>]\s*$',  # Any prompt ending with $/#/>
+]
+PROMPT_TIMEOUT = 45
+
+def spawn_shell(workspace):
+	"""Spawn a login bash in a session workspace; use wait_for_prompt before handing it out"""
+	env = os.environ.copy()
+	env['TERM'] = 'xterm-256color'
+	env['PS1'] = '\\[\\033[1;32m\\]\\u@\\h:\\[\\033[1;34m\\]\\w\\[\\033[0m\\]\\$ '
+	env['HOME'] = '/home/coder'
+	env['PATH'] = '/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin'
+
+	# Use bash instead of zsh for more reliable prompt detection
+	started = time.monotonic()
+	child = spawn('/bin/bash', ['--login'], cwd=workspace, env=env, encoding='utf-8', timeout=300)
+	# pexpect sleeps 50 ms before every write() by default, which would
+	# block the event loop and delay each keystroke
+	child.delaybeforesend = None
+	shell_spawn_seconds.observe(time.monotonic() - started)
+	apply_security_restrictions(child)
+	child.setwinsize(40, 120)  # Initial size
+	return child
+
+async def wait_for_prompt(child, timeout=PROMPT_TIMEOUT):
+	"""Block (in the executor) until the shell prints its first prompt"""
+	loop = asyncio.get_running_loop()
+	started = time.monotonic()
+	outcome = 'error'
+	try:
+		await asyncio.wait_for(
+			loop.run_in_executor(None, lambda: child.expect(PROMPT_PATTERNS)),
+			timeout=timeout
+		)
+		outcome = 'ok'
+	except asyncio.TimeoutError:
+		outcome = 'timeout'
+		raise
+	finally:
+		prompt_detection_seconds.labels(outcome).observe(time.monotonic() - started)
+
+class Histogram:
+	"""Fixed-bucket histogram with cumulative counts, cheap enough for hot paths"""
+
+	def __init__(self, buckets):
+		self.buckets = tuple(sorted(buckets))
+		self.counts = [0] * (len(self.buckets) + 1)
+		self.sum = 0.0
+		self.count = 0
+
+	def observe(self, value):
+		self.counts[bisect.bisect_left(self.buckets, value)] += 1
+		self.sum += value
+		self.count += 1
+
+	def snapshot(self):
+		cumulative = 0
+		buckets = {}
+		for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+			cumulative += count
+			buckets['+Inf' if bound == float('inf') else str(bound)] = cumulative
+		return {'buckets': buckets, 'sum': round(self.sum, 6), 'count': self.count}
+
+class Counter:
+
+	def __init__(self):
+		self.value = 0
+
+	def inc(self, amount=1):
+		self.value += amount
+
+class MetricFamily:
+	"""
+	One named metric with a child per combination of label values.
+	Hot paths should look their child up once with labels() and keep it.
+	"""
+
+	def __init__(self, name, kind, help, labels=(), buckets=None, collect=None):
+		self.name = name
+		self.kind = kind
+		self.help = help
+		self.label_names = tuple(labels)
+		self.buckets = buckets
+		# Callback returning {label values: value}, for values read at scrape time
+		self.collect = collect
+		self.children = {}
+
+	def labels(self, *values):
+		child = self.children.get(values)
+		if child is None:
+			child = Histogram(self.buckets) if self.kind == 'histogram' else Counter()
+			self.children[values] = child
+		return child
+
+	def _labels(self, values, extra=()):
+		pairs = list(zip(self.label_names, values)) + list(extra)
+		if not pairs:
+			return ''
+		escaped = (
+			(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+			for name, value in pairs
+		)
+		return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+	def render(self):
+		lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+		if self.collect is not None:
+			for values, value in self.collect().items():
+				lines.append(f"{self.name}{self._labels(values)} {value}")
+			return lines
+		for values, child in list(self.children.items()):
+			if self.kind != 'histogram':
+				lines.append(f"{self.name}{self._labels(values)} {child.value}")
+				continue
+			cumulative = 0
+			for bound, count in zip(child.buckets + (float('inf'),), child.counts):
+				cumulative += count
+				le = '+Inf' if bound == float('inf') else repr(float(bound))
+				lines.append(f"{self.name}_bucket{self._labels(values, [('le', le)])} {cumulative}")
+			lines.append(f"{self.name}_sum{self._labels(values)} {child.sum}")
+			lines.append(f"{self.name}_count{self._labels(values)} {child.count}")
+		return lines
+
+class MetricsRegistry:
+	"""The metrics served in Prometheus text format at /metrics/prometheus"""
+
+	def __init__(self):
+		self.families = {}
+
+	def _add(self, family):
+		if family.name in self.families:
+			raise ValueError(f"Metric {family.name} is already registered")
+		self.families[family.name] = family
+		return family
+
+	def counter(self, name, help, labels=(), collect=None):
+		return self._add(MetricFamily(name, 'counter', help, labels, collect=collect))
+
+	def gauge(self, name, help, labels=(), collect=None):
+		return self._add(MetricFamily(name, 'gauge', help, labels, collect=collect))
+
+	def histogram(self, name, help, buckets, labels=()):
+		return self._add(MetricFamily(name, 'histogram', help, labels, buckets=buckets))
+
+	def render(self):
+		lines = []
+		for family in self.families.values():
+			lines.extend(family.render())
+		return '\n'.join(lines) + '\n'
+
+def merge_prometheus(texts):
+	"""
+	Combine Prometheus text from several workers, given as {worker_id: text},
+	into one exposition with a worker label on every sample.
+	"""
+	families = {}  # name -> [help and type lines, samples]
+	for worker_id, text in texts.items():
+		current = None
+		for line in text.splitlines():
+			if line.startswith('# '):
+				_, directive, name, _ = (line.split(' ', 3) + [''])[:4]
+				current = families.setdefault(name, [[], []])
+				if directive in ('HELP', 'TYPE') and len(current[0]) < 2 and line not in current[0]:
+					current[0].append(line)
+				continue
+			if not line or current is None:
+				continue
+			name, _, rest = line.partition('{')
+			if rest:
+				line = f'{name}{{worker="{worker_id}",{rest}'
+			else:
+				name, _, value = line.partition(' ')
+				line = f'{name}{{worker="{worker_id}"}} {value}'
+			current[1].append(line)
+	lines = []
+	for header, samples in families.values():
+		lines.extend(header)
+		lines.extend(samples)
+	return '\n'.join(lines) + '\n'
+
+metrics_registry = MetricsRegistry()
+
+def active_sessions_by_project():
+	counts = {}
+	for session in list(terminal_sessions.values()):
+		key = (session.project_slug, 'attached' if session.terminal is not None else 'detached')
+		counts[key] = counts.get(key, 0) + 1
+	return counts
+
+PROMPT_BUCKETS = (0.005, 0.05, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+time_to_first_prompt_family = metrics_registry.histogram(
+	'terminal_time_to_first_prompt_seconds',
+	"Time from accepting a session to a usable prompt, by pooled (warm) or fresh (cold) shell",
+	PROMPT_BUCKETS, labels=('source',),
+)
+time_to_first_prompt = {
+	'warm': time_to_first_prompt_family.labels('warm'),
+	'cold': time_to_first_prompt_family.labels('cold'),
+}
+shell_spawn_seconds = metrics_registry.histogram(
+	'terminal_shell_spawn_seconds', "Time to fork a bash under a new PTY",
+	(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+).labels()
+prompt_detection_seconds = metrics_registry.histogram(
+	'terminal_prompt_detection_seconds', "Time for a new shell to print its first prompt",
+	PROMPT_BUCKETS, labels=('outcome',),
+)
+project_download_seconds = metrics_registry.histogram(
+	'terminal_project_download_seconds', "Time to download and extract a project archive version",
+	(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300), labels=('outcome',),
+)
+archive_extract_seconds = metrics_registry.histogram(
+	'terminal_archive_extract_seconds', "Time spent in the extraction pass over a project archive",
+	(0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+).labels()
+archive_bytes = metrics_registry.counter(
+	'terminal_archive_bytes_total', "Bytes of project archives extracted",
+	labels=('size',),
+)
+pty_read_bytes = metrics_registry.histogram(
+	'terminal_pty_read_bytes', "Size of each read from a shell's PTY",
+	(16, 64, 256, 1024, 4096, 16384, 65536),
+).labels()
+websocket_send_seconds = metrics_registry.histogram(
+	'terminal_websocket_send_seconds', "Time to hand one output frame to the WebSocket",
+	(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1),
+).labels()
+command_verdicts = metrics_registry.counter(
+	'terminal_command_verdicts_total', "Validated commands by verdict and deciding rule",
+	labels=('verdict', 'rule'),
+)
+errors_total = metrics_registry.counter(
+	'terminal_errors_total', "Errors surfaced to clients or logged by the service",
+	labels=('where',),
+)
+metrics_registry.gauge(
+	'terminal_active_sessions', "Live sessions by project and whether a client is attached",
+	labels=('project', 'state'),
+	collect=active_sessions_by_project,
+)
+metrics_registry.counter(
+	'terminal_output_frames_total', "Output frames sent to clients",
+	collect=lambda: {(): output_stats.frames},
+)
+metrics_registry.counter(
+	'terminal_output_bytes_total', "Output bytes sent to clients",
+	collect=lambda: {(): output_stats.bytes},
+)
+metrics_registry.counter(
+	'terminal_sessions_reaped_total', "Sessions closed by the reaper, by limit reached",
+	labels=('limit',),
+	collect=lambda: {(limit,): count for limit, count in reaper.counts.items()},
+)
+metrics_registry.counter(
+	'terminal_admission_total', "Admission decisions and load-shedding actions",
+	labels=('outcome',),
+	collect=lambda: {(outcome,): count for outcome, count in admission.counts.items()},
+)
+metrics_registry.counter(
+	'terminal_shell_pool_total', "New sessions served from the pre-spawned pool or not",
+	labels=('result',),
+	collect=lambda: {('hit',): shell_pool.hits, ('miss',): shell_pool.misses},
+)
+output_suppressed_bytes = metrics_registry.counter(
+	'terminal_output_suppressed_bytes_total', "Output bytes summarized instead of streamed, by limit exceeded",
+	labels=('reason',),
+)
+flow_pauses = metrics_registry.counter(
+	'terminal_flow_pauses_total', "Times a session stopped reading its PTY for lack of client acks",
+).labels()
+metrics_registry.gauge(
+	'terminal_registered_sessions', "Sessions live on any instance, as of the last registry heartbeat",
+	collect=lambda: {} if session_registry.registered is None else {(): len(session_registry.registered)},
+)
+metrics_registry.gauge(
+	'terminal_flow_paused_sessions', "Sessions currently waiting for client acks",
+	collect=lambda: {(): sum(1 for session in list(terminal_sessions.values()) if session.flow.paused)},
+)
+metrics_registry.gauge(
+	'terminal_memory_used_percent', "Host memory in use",
+	collect=lambda: {(): psutil.virtual_memory().percent},
+)
+metrics_registry.counter(
+	'terminal_log_events_total', "Log events by name, whether or not they were written",
+	labels=('event',),
+	collect=lambda: {(event,): count for event, count in list(log.counts.items())},
+)
+metrics_registry.counter(
+	'terminal_log_suppressed_total', "Log lines dropped by the per-event rate limit",
+	labels=('event',),
+	collect=lambda: {(event,): count for event, count in list(log.suppressed.items())},
+)
+
+class ShellPool:
+	"""
+	Per-project pool of bash sessions that are already spawned and sitting
+	at a prompt in their own workspace, so a new connection doesn't wait for
+	shell start-up.
+
+	Only projects with a cached archive version are warmed. Every
+	refill_interval seconds the pool drops shells that are idle for longer
+	than max_idle or belong to a superseded version, and spawns up to
+	refill_rate new ones per project until it holds size shells.
+	"""
+
+	def __init__(self, size, refill_rate, refill_interval, max_idle):
+		self.size = size
+		self.refill_rate = refill_rate
+		self.refill_interval = refill_interval
+		self.max_idle = max_idle
+		self.hits = 0
+		self.misses = 0
+		self._idle = {}  # slug -> deque of (child, ready_at, workspace, version)
+		self._wakeup = asyncio.Event()
+
+	async def acquire(self, project_slug, version):
+		"""Take a live pooled (child, workspace) for this project version, or None on a miss"""
+		idle = self._idle.get(project_slug)
+		while idle:
+			entry = idle.popleft()
+			if self._usable(entry, version):
+				self.hits += 1
+				return entry[0], entry[2]
+			await self._discard(entry)
+		self.misses += 1
+		return None
+
+	def wake(self):
+		"""Ask the refill loop to run now instead of at its next interval"""
+		self._wakeup.set()
+
+	def stats(self):
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'idle': {slug: len(idle) for slug, idle in self._idle.items()},
+		}
+
+	async def run(self):
+		"""Background refill loop, started from lifespan"""
+		if self.size <= 0:
+			return
+		while True:
+			for project_slug in sorted(ALLOWED_PROJECTS):
 				try:
-					with zipfile.ZipFile(local_zip_path, 'r') as zip_ref:
-						zip_ref.extractall(project_dir)
-					print(f"✅ Extracted project files to {project_dir}")
-					return True
+					await self._refill(project_slug)
 				except Exception as e:
-					print(f"Failed to extract local zip: {e}")
+					logger.error("Failed to refill shell pool for %s: %s", project_slug, e)
+			self._wakeup.clear()
+			try:
+				await asyncio.wait_for(self._wakeup.wait(), self.refill_interval)
+			except asyncio.TimeoutError:
+				pass
+
+	def _usable(self, entry, version):
+		child, ready_at, _, entry_version = entry
+		return (
+			entry_version == version
+			and child.isalive()
+			and time.monotonic() - ready_at <= self.max_idle
+		)
+
+	async def _refill(self, project_slug):
+		version = project_cache.current_version(project_slug)
+		idle = self._idle.setdefault(project_slug, deque())
+		stale = [e for e in idle if not self._usable(e, version)]
+		for entry in stale:
+			idle.remove(entry)
+		await asyncio.gather(*(self._discard(entry) for entry in stale))
+
+		if version is None:
+			return
+		loop = asyncio.get_running_loop()
+		for _ in range(min(self.refill_rate, self.size - len(idle))):
+			workspace = await loop.run_in_executor(None, create_workspace, project_slug, version)
+			child = await loop.run_in_executor(None, spawn_shell, workspace)
+			try:
+				await wait_for_prompt(child)
+			except Exception as e:
+				logger.warning("Discarding pre-spawned shell for %s: %s", project_slug, e)
+				await self._discard((child, None, workspace, version))
+				continue
+			idle.append((child, time.monotonic(), workspace, version))
+
+	@staticmethod
+	def _close(entry):
+		child, _, workspace, _ = entry
+		try:
+			child.close(force=True)
+		except Exception as e:
+			logger.debug("Error closing pooled shell: %s", e)
+		remove_workspace(workspace)
+
+	async def _discard(self, entry):
+		# Closing a shell waits on the process for ~0.1s; keep that off the event loop
+		await asyncio.get_running_loop().run_in_executor(None, self._close, entry)
+
+	async def close_all(self):
+		entries = [entry for idle in self._idle.values() for entry in idle]
+		for idle in self._idle.values():
+			idle.clear()
+		await asyncio.gather(*(self._discard(entry) for entry in entries))
+
+shell_pool = ShellPool(
+	size=int(os.environ.get('TERMINAL_POOL_SIZE', '1')),
+	refill_rate=int(os.environ.get('TERMINAL_POOL_REFILL_RATE', '1')),
+	refill_interval=float(os.environ.get('TERMINAL_POOL_REFILL_INTERVAL', '5')),
+	max_idle=float(os.environ.get('TERMINAL_POOL_MAX_IDLE', '600')),
+)
+
+@app.get("/metrics")
+async def metrics():
+	memory = psutil.virtual_memory()
+	return {
+		"memory_used_percent": memory.percent,
+		"active_terminals": len(active_terminals),
+		"sessions": {
+			"attached": sum(1 for session in terminal_sessions.values() if session.terminal is not None),
+			"detached": sum(1 for session in terminal_sessions.values() if session.terminal is None),
+			"resumed_total": session_stats['resumed'],
+			"expired_total": session_stats['expired'],
+			# Across every instance sharing the Redis registry, as of its last
+			# heartbeat, so a scrape never waits on Redis
+			"registered": session_registry.registered,
+			"flow_paused": sum(1 for session in terminal_sessions.values() if session.flow.paused),
+			"flow_pauses_total": flow_pauses.value,
+			"output_suppressed_bytes_total": {
+				reason: output_suppressed_bytes.labels(reason).value for reason in OutputBudget.REASONS
+			},
+			**reaper.stats(),
+			"resources": {
+				session_id: {
+					"project": session.project_slug,
+					"idle_seconds": round(time.monotonic() - session.last_input, 1),
+					"age_seconds": round(time.monotonic() - session.started_at, 1),
+					"suppressed_bytes": session.budget.suppressed_total,
+					**session.resources,
+				}
+				for session_id, session in terminal_sessions.items()
+			},
+		},
+		"admission": admission.stats(),
+		"uptime": time.time() - app_start_time,
+		**output_stats.snapshot(),
+		"shell_pool": shell_pool.stats(),
+		"project_cache": project_cache.stats(),
+		"project_installs": project_installs.stats(),
+		"command_validator": command_validator.stats(),
+		"time_to_first_prompt_seconds": {
+			source: histogram.snapshot() for source, histogram in time_to_first_prompt.items()
+		},
+	}
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+@app.get("/metrics/prometheus")
+async def prometheus_metrics():
+	return PlainTextResponse(metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+app_start_time = time.time()
+
+@app.get("/healthz")
+async def health_check():
+	return {"status": "healthy"}
+
+@app.get("/readyz")
+async def readiness_check():
+	"""
+	Ready once the startup prefetch has settled every hot project.
+	Failed prefetches do not hold readiness back; sessions fetch lazily.
+	"""
+	projects = {
+		project_slug: {
+			"state": state,
+			"version": project_cache.current_version(project_slug),
+		}
+		for project_slug, state in sorted(prefetch_state.items())
+	}
+	ready = all(prefetch_state[project_slug] not in ('pending', 'fetching') for project_slug in HOT_PROJECTS)
+	return JSONResponse(
+		status_code=200 if ready else 503,
+		content={"status": "ready" if ready else "warming", "projects": projects},
+	)
+
+@app.websocket("/terminal/{project_slug}/")
+async def terminal_endpoint(websocket: WebSocket, project_slug: str):
+	terminal = await TerminalSocket.accept(websocket)
+	log.info('ws_connected', project=project_slug, binary=terminal.binary)
+	
+	# Initialize variables that might be used in finally block
+	session = None
+	child = None
+	workspace = None
+
+	try:
+		# Validate and sanitize project slug
+		project_slug = sanitize_project_slug(project_slug)
+	except HTTPException as e:
+		await terminal.send_control({'error': e.detail})
+		await terminal.close()
+		return
+
+	# Reattach to a detached session if the client presents its id and token
+	resume_id = websocket.query_params.get('session')
+	if resume_id:
+		session = terminal_sessions.get(resume_id)
+		if (session is None or session.closed or session.project_slug != project_slug
+				or not session.matches(websocket.query_params.get('resume'))):
+			session = None
+			await terminal.send_output("\r\n⚠️  Previous session has expired. Starting a new one.\r\n")
+	if session is not None:
+		session_stats['resumed'] += 1
+		log.info('session_resumed', session=session.session_id)
+		try:
+			offset = int(websocket.query_params['offset'])
+		except (KeyError, ValueError):
+			offset = None
+		try:
+			await session.attach(terminal, offset)
+			await handle_client_messages(terminal, session)
+		except WebSocketDisconnect:
+			log.info('ws_disconnected', session=session.session_id)
+		except Exception as e:
+			logger.error("Terminal session error: %s", e)
+			record_error('session', e)
+		finally:
+			await session.detach(terminal)
+		return
+
+	async def announce_wait():
+		await terminal.send_output("\r\n⏳ The server is busy. Waiting for a free slot...\r\n")
+	
+	if not await admission.admit(on_wait=announce_wait):
+		await terminal.send_output("\r\n⛔ The server is too busy right now. Please try again in a few minutes.\r\n")
+		await terminal.close(code=1013)  # Try again later
+		return
+	
+	# Create unique session ID, unless the supervisor already assigned one
+	session_id = websocket.headers.get('x-terminal-session') if WORKER_ID is not None else None
+	session_id = session_id or str(uuid.uuid4())
+	log.info('session_created', session=session_id, project=project_slug)
+	
+	# Store terminal session in Redis
+	session_info = {
+		'id': session_id,
+		'project': project_slug,
+		'created': time.time(),
+		'client_ip': websocket.client.host
+	}
+	if WORKER_ID is not None:
+		# Session directory entry the supervisor routes reconnects by
+		session_info['worker'] = WORKER_ID
+	
+	try:
+		await session_registry.register(session_id, session_info)
+	except Exception as e:
+		logger.error("Redis error: %s", e)
+		record_error('redis', e)
+	
+	try:
+		# Resolve the newest archive version and make sure it is extracted
+		loop = asyncio.get_running_loop()
+		version, etag = await loop.run_in_executor(None, project_cache.latest_version, project_slug)
+		
+		if version is not None:
+			downloading = not project_cache.has_version(project_slug, version)
+			if downloading:
+				await terminal.send_output(f"\r\n📦 Downloading project files for {project_slug}...\r\n")
+				await terminal.send_output("This may take 1-2 minutes for large projects. Please wait...\r\n\r\n")
+			
+			async def report_progress(event):
+				if event['stage'] == 'waiting':
+					await terminal.send_output("⏳ Waiting for another download of this project...\r\n")
+				elif event['stage'] == 'extract':
+					await terminal.send_control({'progress': event})
+					eta = f", ~{event['eta']:.0f}s left" if event['eta'] is not None else ""
+					await terminal.send_output(
+						f"\r📥 {event['files']}/{event['total_files']} files, "
+						f"{event['bytes'] / 1048576:.1f}/{event['total_bytes'] / 1048576:.1f} MB{eta}   "
+					)
+			
+			# Download in a separate thread to avoid blocking. Concurrent
+			# connections for the same version share one download.
+			files_downloaded = await project_installs.run(
+				(project_slug, version), install_project_version,
+				project_slug, version, etag, on_progress=report_progress
+			)
+			
+			if not files_downloaded:
+				# Fall back to whatever version is already cached, if any
+				version = project_cache.current_version(project_slug)
+				await terminal.send_output("\r\n⚠️  Failed to download project files. Using cached or empty project.\r\n")
+			elif downloading:
+				await terminal.send_output("\r\n✅ Project files downloaded successfully!\r\n")
+		else:
+			await terminal.send_output("\r\n⚠️  No project files available. Using empty project.\r\n")
+		
+		if version is not None:
+			project_cache.activate(project_slug, version)
+		
+		started = time.monotonic()
+		pooled = await shell_pool.acquire(project_slug, version)
+		if pooled is not None:
+			child, workspace = pooled
+			time_to_first_prompt['warm'].observe(time.monotonic() - started)
+			log.info('shell_ready', source='warm', session=session_id)
+		else:
+			# Initialize terminal with bash instead of zsh - more reliable
+			await terminal.send_output("\r\n🚀 Spawning terminal session...\r\n")
+			workspace = await loop.run_in_executor(None, create_workspace, project_slug, version)
+			child = spawn_shell(workspace)
+			try:
+				await wait_for_prompt(child)
+				log.info('shell_ready', source='cold', session=session_id)
+			except asyncio.TimeoutError:
+				# Don't fail - just log and continue
+				# The terminal might be ready even if we didn't detect the prompt
+				logger.warning("Prompt detection timed out after %ss, but continuing anyway", PROMPT_TIMEOUT)
+				await terminal.send_output("\r\n⚠️  Prompt detection timed out, but terminal should be ready.\r\n")
+			except Exception as e:
+				logger.error("Error waiting for prompt: %s", e)
+				record_error('prompt', e)
+				await terminal.send_output(f"\r\n⚠️  Prompt detection error: {str(e)}, but terminal may still work.\r\n")
+			time_to_first_prompt['cold'].observe(time.monotonic() - started)
+		# Top the pool back up for the next visitor
+		shell_pool.wake()
+		
+		session = TerminalSession(session_id, project_slug, child, workspace)
+		session.start()
+		
+		# Send welcome message
+		await terminal.send_output(f"\r\n\r\nWelcome to {project_slug} terminal! Type 'ls' to see project files.\r\n")
+		
+		await session.attach(terminal)
+		await handle_client_messages(terminal, session)
+				
+	except WebSocketDisconnect:
+		log.info('ws_disconnected', session=session_id)
+	except Exception as e:
+		logger.error("Terminal session error: %s", e)
+		record_error('session', e)
+		try:
+			if session is not None:
+				await session.notify(f"\r\n\r\nTerminal error: {str(e)}\r\n")
+			else:
+				await terminal.send_output(f"\r\n\r\nTerminal error: {str(e)}\r\n")
+		except (RuntimeError, ConnectionError) as send_error:
+			logger.debug("Failed to send error message: %s", send_error)
+	finally:
+		if session is not None:
+			# The shell stays around for the grace period in case the client reconnects
+			await session.detach(terminal)
+		else:
+			# Setup failed before the session existed
+			if child is not None:
+				try:
+					child.terminate()
+				except Exception as cleanup_error:
+					logger.error("Failed to terminate session %s: %s", session_id, cleanup_error)
+			if workspace:
+				await asyncio.get_running_loop().run_in_executor(None, remove_workspace, workspace)
+			try:
+				await session_registry.unregister(session_id)
+			except Exception as e:
+				logger.error("Redis error: %s", e)
+				record_error('redis', e)
+
+async def handle_client_messages(terminal, session):
+	"""Process client messages for a session until the WebSocket disconnects"""
+	while True:
+		try:
+			kind, payload = await terminal.receive()
+		except (ValueError, UnicodeDecodeError) as e:
+			logger.warning("Malformed client frame: %s", e)
+			continue
+		try:
+			# Client consumed output up to this offset
+			if kind == 'control' and isinstance(payload, dict) and isinstance(payload.get('ack'), int):
+				session.flow.on_ack(payload['ack'])
+			
+			# Handle resize commands
+			elif kind == 'resize':
+				rows, cols = payload
+				log.info('shell_resize', session=session.session_id, rows=rows, cols=cols)
+				session.child.setwinsize(rows, cols)
+			
+			# Handle input with command validation
+			elif kind == 'input':
+				user_input = payload
+				
+				# Check if this looks like a command (ends with enter/newline)
+				if '\r' in user_input or '\n' in user_input:
+					# Extract the command (everything before the newline)
+					command = user_input.replace('\r', '').replace('\n', '').strip()
+					
+					# Validate command before sending to shell
+					if command and not validate_command(command):
+						# Command blocked - notify user
+						await session.notify(
+							f"\r\n❌ Command blocked by security policy: '{command}'\r\n"
+							"Only basic file inspection and compilation commands are allowed.\r\n"
+						)
+						# Don't send to the shell
+						continue
+				
+				# Command is allowed or is just keystrokes - send to shell
+				session.coalescer.note_input()
+				session.budget.note_input()
+				session.last_input = time.monotonic()
+				session_registry.touch(session.session_id, 'last_input')
+				session.child.write(user_input)
+				
+		except Exception as e:
+			logger.error("Error processing message: %s", e)
+			record_error('message', e)
+			await session.notify(f"\r\nError: {str(e)}\r\n")
+
+async def _next_chunk(chunks, timeout):
+	"""
+	The next item of chunks, or '' after timeout seconds (None waits forever).
+	Unlike asyncio.wait_for, a cancellation is never swallowed because the
+	get() happened to finish at the same time.
+	"""
+	if not chunks.empty():
+		return chunks.get_nowait()
+	getter = asyncio.ensure_future(chunks.get())
+	try:
+		await asyncio.wait({getter}, timeout=timeout)
+	finally:
+		if not getter.done():
+			getter.cancel()
+	# cancel() only schedules the cancellation, so a timed-out getter isn't cancelled() yet
+	return getter.result() if getter.done() and not getter.cancelled() else ''
+
+async def read_terminal_output(terminal, child, coalescer=None, session_id=None, flow=None):
+	"""
+	Forward PTY output to the WebSocket as soon as the kernel reports it.
+
+	The child's fd is registered with the event loop via add_reader, so no
+	executor thread is parked per session and there is no polling delay
+	between a keystroke and its echo. Output goes through an OutputCoalescer
+	so bulk output is sent as a few large frames instead of many small ones.
+	Once PTY_BACKLOG_BYTES are read but not yet sent, or flow control says
+	the client is too far behind, the fd is unregistered before reading
+	more, leaving the output in the kernel's PTY buffer where it blocks the
+	program writing it. It is registered again once the backlog is sent.
+	"""
+	loop = asyncio.get_running_loop()
+	fd = child.child_fd
+	chunks = asyncio.Queue()
+	if coalescer is None:
+		coalescer = OutputCoalescer(terminal)
+	# Bytes in chunks, and whether the fd is registered
+	backlog = 0
+	reading = False
+	finished = False
+
+	def start_reading():
+		nonlocal reading
+		if not reading and not finished:
+			loop.add_reader(fd, on_readable)
+			reading = True
+
+	def stop_reading():
+		nonlocal reading
+		if reading:
+			loop.remove_reader(fd)
+			reading = False
+
+	def backlogged():
+		pending = backlog + coalescer.pending
+		if pending >= PTY_BACKLOG_BYTES:
+			return True
+		return flow is not None and flow.blocks(pending)
+
+	def on_readable():
+		nonlocal backlog, finished
+		if backlogged():
+			stop_reading()
+			if chunks.empty():
+				# Wake the consumer so it waits for acks instead of output
+				chunks.put_nowait('')
+			return
+		try:
+			chunk = child.read_nonblocking(size=PTY_READ_SIZE, timeout=0)
+			pty_read_bytes.observe(len(chunk))
+			backlog += len(chunk)
+			chunks.put_nowait(chunk)
+		except TIMEOUT:
+			# Spurious wakeup, nothing to read yet
+			pass
+		except EOF:
+			stop_reading()
+			finished = True
+			chunks.put_nowait(None)
+		except OSError as e:
+			logger.error("PTY read error: %s", e)
+			record_error('pty_read', e)
+			stop_reading()
+			finished = True
+			chunks.put_nowait(None)
+
+	start_reading()
+	try:
+		while True:
+			try:
+				if not reading and chunks.empty():
+					# Everything read has been pushed; send it, then wait for acks if behind
+					await coalescer.flush()
+					if flow is not None and flow.paused:
+						await flow.wait()
+					start_reading()
+				output = await _next_chunk(chunks, coalescer.time_until_flush())
+				if output is None:
+					await coalescer.flush()
+					await terminal.send_output("\r\nSession terminated.\r\n")
+					break
+				if output:
+					backlog -= len(output)
+					log.debug('pty_output', bytes=len(output), session=session_id)
+					session_registry.touch(session_id, 'last_output')
+					await coalescer.push(output)
+				if coalescer.time_until_flush() == 0:
+					await coalescer.flush()
+			except Exception as e:
+				log.error('ws_send_failed', str(e), session=session_id)
+				record_error('websocket_send', e)
+				break  # Break the loop if WebSocket is disconnected
+	finally:
+		stop_reading()
+
+class CommandValidator:
+	"""
+	Allow/deny policy for shell commands, compiled once.
+
+	check(command) returns (allowed, rule_id). Commands are allowed only by
+	matching an allowlist pattern; the deny rules just name the reason a
+	command was refused, checked in order. Both lists are folded into one
+	compiled alternation each, and recent verdicts are kept in an LRU cache.
+	"""
+
+	# Allowlist approach for basic commands, as (rule id, pattern) pairs
+	ALLOWED_PATTERNS = [
+		# Basic navigation and file inspection
+		('ls', r'ls(\s+-[altrh]+)*(\s+[\w\./-]+)*'),
+		('cat', r'cat(\s+[\w\./-]+)+'),
+		('cd', r'cd(\s+[\w\./-]+)?'),
+		('pwd', r'pwd'),
+		('echo', r'echo\s+.*'),
+		('clear', r'clear'),
+		
+		# Development commands
+		('make', r'make(\s+[\w-]+)?'),
+		('gcc', r'gcc(\s+-[a-zA-Z]+)*(\s+[\w\./-]+)+'),
+		('run', r'./[\w-]+'),  # Run executables in current directory
+		
+		# Basic file manipulation
+		('touch', r'touch\s+[\w\./-]+'),
+		('mkdir', r'mkdir(\s+-p)?\s+[\w\./-]+'),
+		
+		# Help commands
+		('help', r'help'),
+		('man', r'man\s+[\w-]+'),
+		('download', r'download\s+[\w\./-]+'),
+	]
+
+	# Reasons for refusing a command, as (rule id, substrings) pairs
+	DENY_RULES = [
+		# Container escape checks - CRITICAL SECURITY
+		('container_escape', [
+			'docker', 'kubectl', 'sudo', 'su ', 'ssh',
+			'--privileged', '--cap-add', 'nsenter',
+			'unshare', 'mount', 'umount', 'chroot',
+			'pivot_root', 'cgroup', 'setns', 'ptrace',
+			'ld.so', 'proc', '/dev/'
+		]),
+		# Path traversal protection
+		('path_traversal', ['../']),
+		# Protect against command chaining/injection
+		('operator', [';', '&&', '||', '`', '$(', '|', '>', '<']),
+		# Additional deny list for extra security
+		('dangerous', [
+			'rm -rf', 'chmod 777', ':(){', 'curl | bash',
+			'wget | bash', '> /dev', '> /proc', '> /sys'
+		]),
+	]
+
+	def __init__(self, cache_size=1024):
+		# Alternatives are tried in order, so the first matching rule wins
+		# exactly as it did when each pattern was matched in turn
+		self._allow = re.compile('^(?:{})$'.format('|'.join(
+			f'(?P<allow_{rule}>{pattern})' for rule, pattern in self.ALLOWED_PATTERNS
+		)))
+		self._deny = re.compile('(?s)^(?:{})'.format('|'.join(
+			'(?=.*?(?P<deny_{}>{}))'.format(rule, '|'.join(re.escape(seq) for seq in sequences))
+			for rule, sequences in self.DENY_RULES
+		)))
+		self.check = functools.lru_cache(maxsize=cache_size)(self._check)
+
+	def _check(self, command):
+		# Strip whitespace for cleaner matching
+		command = command.strip()
+		
+		# Allow empty commands (just pressing enter)
+		if not command:
+			return True, 'empty'
+		
+		match = self._allow.match(command)
+		if match:
+			return True, match.lastgroup[len('allow_'):]
+		
+		match = self._deny.match(command)
+		if match:
+			return False, next(name for name, value in match.groupdict().items() if value is not None)[len('deny_'):]
+		
+		# If nothing matched, deny by default (security first)
+		return False, 'default_deny'
+
+	def stats(self):
+		info = self.check.cache_info()
+		return {'cache_hits': info.hits, 'cache_misses': info.misses, 'cache_size': info.currsize}
+
+command_validator = CommandValidator(
+	cache_size=int(os.environ.get('TERMINAL_VALIDATOR_CACHE_SIZE', '1024')),
+)
+
+def validate_command(command):
+	"""Validate terminal commands with improved security"""
+	allowed, rule = command_validator.check(command)
+	if rule == 'empty':
+		return True
+	command_verdicts.labels('allowed' if allowed else 'blocked', rule).inc()
+	if allowed:
+		log.info('command_allowed', rule=rule, command=command)
+	else:
+		log.warning('command_blocked', rule=rule, command=command)
+	return allowed
+
+@app.get("/error-stats")
+async def error_statistics():
+	return {
+		"errors": error_counter,
+		"last_error": last_error_message,
+		"last_error_time": last_error_timestamp
+	}
+
+# HTTP connections kept open to R2, shared by every download in the process
+S3_MAX_POOL_CONNECTIONS = int(os.environ.get('TERMINAL_S3_MAX_POOL_CONNECTIONS', '32'))
+# Bounds for the parallel ranged GETs an archive download is split into
+S3_MAX_CONCURRENCY = int(os.environ.get('TERMINAL_S3_MAX_CONCURRENCY', '8'))
+S3_MIN_PART_SIZE = int(os.environ.get('TERMINAL_S3_MIN_PART_SIZE', str(1024 * 1024)))
+S3_MAX_PART_SIZE = int(os.environ.get('TERMINAL_S3_MAX_PART_SIZE', str(8 * 1024 * 1024)))
+# Share of available memory a download may hold in parts fetched ahead of extraction
+S3_MEMORY_FRACTION = float(os.environ.get('TERMINAL_S3_MEMORY_FRACTION', '0.05'))
+
+def make_s3_client():
+	"""Build an R2 (S3-compatible) client from environment variables"""
+	return boto3.client(
+		's3',
+		aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
+		aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
+		region_name=os.environ.get('AWS_S3_REGION_NAME', 'auto'),
+		endpoint_url=os.environ.get('AWS_S3_ENDPOINT_URL'),  # R2 endpoint
+		config=BotoConfig(
+			max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+			tcp_keepalive=True,
+			connect_timeout=10,
+			read_timeout=60,
+			retries={'max_attempts': 5, 'mode': 'standard'},
+			# Local stand-ins like MinIO want path-style URLs
+			s3={'addressing_style': os.environ.get('AWS_S3_ADDRESSING_STYLE', 'auto')},
+		),
+	)
+
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+def get_s3_client():
+	"""
+	The process-wide S3 client, built on first use so that credentials,
+	endpoint resolution and TLS connections are set up once and reused.
+	boto3 clients are thread-safe, so downloads running in the executor share it.
+	"""
+	global _s3_client
+	if _s3_client is None:
+		with _s3_client_lock:
+			if _s3_client is None:
+				_s3_client = make_s3_client()
+	return _s3_client
+
+def transfer_plan(size):
+	"""
+	Part size and number of parallel ranged GETs for an object of size bytes.
+	Parts split the object evenly across the concurrency the host's cores
+	allow, within the part size bounds, and the parts in flight must fit in
+	S3_MEMORY_FRACTION of available memory.
+	"""
+	concurrency = max(1, min(S3_MAX_CONCURRENCY, (os.cpu_count() or 1) * 2))
+	part_size = min(S3_MAX_PART_SIZE, max(S3_MIN_PART_SIZE, -(-size // concurrency)))
+	budget = int(psutil.virtual_memory().available * S3_MEMORY_FRACTION)
+	parts = max(1, -(-size // part_size))
+	return part_size, max(1, min(concurrency, budget // part_size, parts))
+
+def is_dev_mode():
+	return os.getenv('DEBUG', 'False').lower() in ('true', '1', 't')
+
+# Where DEBUG mode finds project archives; the backend's media volume by default
+LOCAL_ARCHIVE_DIR = os.environ.get('TERMINAL_LOCAL_ARCHIVE_DIR', '/backend-media/project-files')
+
+def local_project_zip(project_slug):
+	"""Path of the project archive served by the backend in DEBUG mode"""
+	return os.path.join(LOCAL_ARCHIVE_DIR, f'{project_slug}.zip')
+
+# Blocklist instead of allowlist - block dangerous file types
+BLOCKED_EXTENSIONS = {'.exe', '.dll', '.so', '.dylib', '.bin', '.app', '.dmg', '.pkg', '.deb', '.rpm'}
+# Minimum seconds between extraction progress events
+PROGRESS_INTERVAL = 0.25
+# Read-ahead buffer for archives streamed from object storage
+STREAM_BUFFER_SIZE = 256 * 1024
+# Bytes fetched in one go from the end of an archive, where the zip central directory lives
+ARCHIVE_TAIL_SIZE = 1024 * 1024
+
+class RangedObjectReader(io.RawIOBase):
+	"""
+	Seekable, read-only view of an S3 object backed by ranged GETs.
+
+	The last ARCHIVE_TAIL_SIZE bytes are fetched once and served from memory.
+	With concurrency 1 other reads come from one open response body, and
+	seeking elsewhere reopens it at the new offset. With more, the rest of
+	the object is fetched as part_size ranges by that many threads, reading
+	ahead of the current position; parts already read are dropped, so at
+	most concurrency parts are held at once. zipfile reads the central
+	directory at the tail and then walks the members in order, so a whole
+	archive streams without ever being written to disk.
+	"""
+
+	def __init__(self, s3, bucket, key, size, etag=None, part_size=None, concurrency=1):
+		self.s3 = s3
+		self.bucket = bucket
+		self.key = key
+		self.size = size
+		self.etag = etag
+		self.part_size = part_size or S3_MIN_PART_SIZE
+		self.concurrency = concurrency
+		self.requests = 0
+		self._pos = 0
+		self._body = None
+		self._body_pos = None
+		self._tail = None
+		self._tail_start = max(0, size - ARCHIVE_TAIL_SIZE)
+		self._parts = {}  # part index -> Future of its bytes
+		self._executor = None
+		if concurrency > 1:
+			self._executor = ThreadPoolExecutor(concurrency, thread_name_prefix='s3-range')
+
+	def readable(self):
+		return True
+
+	def seekable(self):
+		return True
+
+	def tell(self):
+		return self._pos
+
+	def seek(self, offset, whence=io.SEEK_SET):
+		if whence == io.SEEK_CUR:
+			offset += self._pos
+		elif whence == io.SEEK_END:
+			offset += self.size
+		self._pos = max(0, offset)
+		return self._pos
+
+	def readinto(self, buffer):
+		if self._pos >= self.size:
+			return 0
+		if self._pos >= self._tail_start:
+			if self._tail is None:
+				self.requests += 1
+				self._tail = self._get(f'bytes={self._tail_start}-').read()
+			data = self._tail[self._pos - self._tail_start:][:len(buffer)]
+		elif self._executor is not None:
+			data = self._read_part(len(buffer))
+		else:
+			if self._body is None or self._body_pos != self._pos:
+				self._open()
+			data = self._body.read(len(buffer))
+			self._body_pos += len(data)
+		if not data:
+			raise OSError(f"Unexpected end of {self.key} at byte {self._pos}")
+		size = len(data)
+		buffer[:size] = data
+		self._pos += size
+		return size
+
+	def _read_part(self, limit):
+		index = self._pos // self.part_size
+		self._schedule(index)
+		offset = self._pos - index * self.part_size
+		return self._parts[index].result()[offset:offset + limit]
+
+	def _schedule(self, index):
+		"""Fetch part index and the ones after it, dropping parts outside that window"""
+		window = range(index, min(index + self.concurrency, -(-self._tail_start // self.part_size)))
+		for stale in [i for i in self._parts if i not in window]:
+			self._parts.pop(stale).cancel()
+		for i in window:
+			if i not in self._parts:
+				start = i * self.part_size
+				end = min(start + self.part_size, self._tail_start) - 1
+				self.requests += 1
+				self._parts[i] = self._executor.submit(self._fetch, f'bytes={start}-{end}')
+
+	def _fetch(self, byte_range):
+		body = self._get(byte_range)
+		try:
+			return body.read()
+		finally:
+			body.close()
+
+	def _open(self):
+		self._close_body()
+		self.requests += 1
+		self._body = self._get(f'bytes={self._pos}-')
+		self._body_pos = self._pos
+
+	def _get(self, byte_range):
+		request = {'Bucket': self.bucket, 'Key': self.key, 'Range': byte_range}
+		if self.etag:
+			# Fail instead of mixing ranges from two versions of the archive
+			request['IfMatch'] = self.etag
+		return self.s3.get_object(**request)['Body']
+
+	def _close_body(self):
+		if self._body is not None:
+			self._body.close()
+			self._body = None
+
+	def close(self):
+		self._close_body()
+		if self._executor is not None:
+			self._parts.clear()
+			self._executor.shutdown(wait=False, cancel_futures=True)
+		super().close()
+
+def extract_project_archive(archive, project_dir, progress):
+	"""
+	Validate and extract a project zip in a single pass over its entries.
+	Directories, blocked file types and suspicious paths are skipped.
+	Returns the number of files extracted.
+	"""
+	with zipfile.ZipFile(archive, 'r') as zip_ref:
+		members = [info for info in zip_ref.infolist() if not info.is_dir()]
+		total_files = len(members)
+		total_bytes = sum(info.compress_size for info in members)
+		needed = sum(info.file_size for info in members)
+		if shutil.disk_usage(project_dir).free < needed:
+			log.error('archive_disk_full', needed_bytes=needed)
+			return 0
+		log.info('archive_extract_started', files=total_files, compressed_bytes=total_bytes)
+		
+		started = time.monotonic()
+		last_reported = None
+		done_bytes = 0
+		extracted = 0
+		for files, info in enumerate(members, 1):
+			file = info.filename
+			file_ext = os.path.splitext(file)[1].lower()
+			if file_ext in BLOCKED_EXTENSIONS:
+				log.warning('archive_entry_skipped', reason='blocked_type', path=file)
+			elif '..' in file or file.startswith('/'):
+				log.warning('archive_entry_skipped', reason='suspicious_path', path=file)
+			else:
+				zip_ref.extract(info, project_dir)
+				extracted += 1
+				archive_bytes.labels('compressed').inc(info.compress_size)
+				archive_bytes.labels('uncompressed').inc(info.file_size)
+			done_bytes += info.compress_size
+			
+			now = time.monotonic()
+			if last_reported is None or now - last_reported >= PROGRESS_INTERVAL or files == total_files:
+				last_reported = now
+				elapsed = now - started
+				eta = elapsed * (total_bytes - done_bytes) / done_bytes if done_bytes else None
+				progress({
+					'stage': 'extract',
+					'bytes': done_bytes,
+					'total_bytes': total_bytes,
+					'files': files,
+					'total_files': total_files,
+					'eta': round(eta, 1) if eta is not None else None,
+				})
+	
+	archive_extract_seconds.observe(time.monotonic() - started)
+	log.info('archive_extracted', files=extracted, total_files=total_files, target=project_dir)
+	return extracted
+
+def download_project_files(project_slug, project_dir, etag=None, progress=None):
+	"""
+	Download project files from S3 if they exist, or copy from local backend in DEBUG mode.
+	The archive is streamed straight into extraction; nothing is staged on disk.
+	When etag is given the download only succeeds if the object still has that ETag.
+	progress, if given, is called with event dicts as the extraction advances.
+	"""
+	if progress is None:
+		progress = lambda event: None
+	try:
+		# Check if running in DEBUG mode (local development)
+		if is_dev_mode():
+			# Local development: copy from backend media directory
+			local_zip_path = local_project_zip(project_slug)
+			if os.path.exists(local_zip_path):
+				log.info('archive_local', path=local_zip_path)
+				try:
+					return extract_project_archive(local_zip_path, project_dir, progress) > 0
+				except Exception as e:
+					log.error('archive_extract_failed', str(e), path=local_zip_path)
+					record_error('download', e)
 					return False
 			else:
-				print(f"Local project file not found: {local_zip_path}")
+				log.warning('archive_missing', path=local_zip_path)
 				return False
 		
 		# Production: download from Cloudflare R2 (S3-compatible)
 		logger.info("Production mode: downloading from R2 for project: %s", project_slug)
-		# Initialize R2 client with environment variables
-		s3 = boto3.client(
-			's3',
-			aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
-			aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
-			region_name=os.environ.get('AWS_S3_REGION_NAME', 'auto'),
-			endpoint_url=os.environ.get('AWS_S3_ENDPOINT_URL')  # R2 endpoint
-		)
+		s3 = get_s3_client()
 		
 		# The expected file path in R2 (matches your Django view)
 		s3_path = f'project-files/{project_slug}.zip'
 		bucket_name = os.environ.get('AWS_STORAGE_BUCKET_NAME', 'portfolio-bucket')
 		
 		if not bucket_name:
-			print("Missing R2 bucket configuration")
+			log.error('archive_bucket_missing', "Missing R2 bucket configuration")
 			return False
 			
-		print(f"Looking for R2 object: {s3_path} in bucket {bucket_name}")
-
-		# Check if we've already downloaded this project in the last 24 hours
-		cache_marker = os.path.join(project_dir, ".cached_download")
-		if os.path.exists(cache_marker):
-			with open(cache_marker, 'r') as f:
-				try:
-					timestamp = float(f.read().strip())
-					if time.time() - timestamp < 86400:  # 24 hours
-						print("Using cached project files (downloaded less than 24h ago)")
-						return True
-				except Exception as exc:
-					logger.debug("Ignoring invalid cache marker: %s", exc)
 
 		try:
 			# Get object metadata to check if it exists and get size
 			obj = s3.head_object(Bucket=bucket_name, Key=s3_path)
 			file_size = obj['ContentLength']
-			print(f"Found object in S3. Size: {file_size} bytes")
-			
-			# For large files, check if we have enough disk space
-			free_space = shutil.disk_usage(project_dir).free
-			if free_space < file_size * 2:  # Need twice the space for zip + extracted files
-				print(f"Not enough disk space to download and extract {file_size} bytes")
+			log.info('archive_found', key=s3_path, bucket=bucket_name, bytes=file_size)
+			if file_size == 0:
+				log.warning('archive_empty', key=s3_path)
 				return False
-				
 		except s3.exceptions.ClientError as e:
 			if e.response['Error']['Code'] == '404':
-				print(f"Project file {s3_path} doesn't exist in S3 bucket")
+				log.warning('archive_missing', key=s3_path, bucket=bucket_name)
 				return False
 			else:
-				print(f"Error checking S3 object: {e}")
+				log.error('archive_head_failed', str(e), key=s3_path)
 				raise
 
-		# Create temp file for downloading
-		with tempfile.NamedTemporaryFile(suffix='.zip') as temp_file:
+		part_size, concurrency = transfer_plan(file_size)
+		reader = RangedObjectReader(s3, bucket_name, s3_path, file_size, etag, part_size, concurrency)
+		try:
+			with io.BufferedReader(reader, buffer_size=STREAM_BUFFER_SIZE) as archive:
+				extracted = extract_project_archive(archive, project_dir, progress)
+			log.info(
+				'archive_streamed', key=s3_path, requests=reader.requests,
+				part_bytes=part_size, concurrency=concurrency,
+			)
+			if extracted == 0:
+				log.warning('archive_no_files', key=s3_path)
+				return False
+			return True
+		except zipfile.BadZipFile as e:
+			log.error('archive_bad_zip', str(e), key=s3_path)
+			return False
+		except Exception as e:
+			log.error('archive_extract_failed', str(e), key=s3_path)
+			record_error('download', e)
+			return False
+	except Exception as e:
+		log.error('archive_download_failed', str(e), project=project_slug)
+		record_error('download', e)
+		return False
+
+def fetch_project_version(project_slug):
+	"""
+	Identify the current project archive without downloading it: the object
+	ETag on R2, or the SHA-256 of the local zip in DEBUG mode.
+	Returns (version, etag), or (None, None) if there is no archive.
+	"""
+	if is_dev_mode():
+		local_zip_path = local_project_zip(project_slug)
+		try:
+			zip_stat = os.stat(local_zip_path)
+		except FileNotFoundError:
+			return None, None
+		key = (local_zip_path, zip_stat.st_mtime_ns, zip_stat.st_size)
+		if key not in _local_zip_digests:
+			digest = hashlib.sha256()
+			with open(local_zip_path, 'rb') as f:
+				for block in iter(lambda: f.read(1024 * 1024), b''):
+					digest.update(block)
+			_local_zip_digests[key] = digest.hexdigest()
+		return f"sha256-{_local_zip_digests[key]}", None
+
+	s3 = get_s3_client()
+	bucket_name = os.environ.get('AWS_STORAGE_BUCKET_NAME', 'portfolio-bucket')
+	try:
+		obj = s3.head_object(Bucket=bucket_name, Key=f'project-files/{project_slug}.zip')
+	except s3.exceptions.ClientError as e:
+		if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+			return None, None
+		raise
+	etag = obj['ETag']
+	# ETags are quoted hex, with a "-N" suffix for multipart uploads
+	return "etag-" + re.sub(r'[^A-Za-z0-9-]', '', etag), etag
+
+_local_zip_digests = {}
+
+class ProjectCache:
+	"""
+	Versioned, content-addressed store of extracted project archives.
+
+	Each archive version is extracted once into a read-only tree at
+	PROJECTS_DIR/<slug>/<version>, and PROJECTS_DIR/<slug>/current points at
+	the newest one. Sessions never work in these trees directly: each gets a
+	private workspace built from hardlinks (or copies) of the files, so
+	sessions can't see each other's changes and a new upload takes effect
+	for the next session without disturbing running ones.
+
+	Versions other than each project's current one are evicted least
+	recently used first once the cache grows past max_bytes. Workspaces keep
+	their hardlinked inodes, so evicting a version under a live session is safe.
+	"""
+
+	def __init__(self, root, max_bytes, revalidate_seconds):
+		self.root = root
+		self.max_bytes = max_bytes
+		self.revalidate_seconds = revalidate_seconds
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._checked = {}  # slug -> (checked_at, version, etag)
+
+	def project_root(self, project_slug):
+		return safe_join_path(self.root, project_slug)
+
+	def version_dir(self, project_slug, version):
+		return safe_join_path(self.project_root(project_slug), version)
+
+	def current_version(self, project_slug):
+		"""The version the project's 'current' link points at, or None"""
+		try:
+			return os.readlink(os.path.join(self.project_root(project_slug), 'current'))
+		except OSError:
+			return None
+
+	def has_version(self, project_slug, version):
+		return os.path.exists(os.path.join(self.version_dir(project_slug, version), '.complete'))
+
+	def latest_version(self, project_slug):
+		"""
+		Resolve the newest archive version, checking the origin at most once
+		per revalidate_seconds. Returns (version, etag); falls back to the
+		cached current version if the origin can't be reached.
+		"""
+		checked = self._checked.get(project_slug)
+		if checked and time.monotonic() - checked[0] < self.revalidate_seconds:
+			return checked[1], checked[2]
+		try:
+			version, etag = fetch_project_version(project_slug)
+		except Exception as e:
+			logger.error("Could not check archive version for %s: %s", project_slug, e)
+			return self.current_version(project_slug), None
+		self._checked[project_slug] = (time.monotonic(), version, etag)
+		return version, etag
+
+	def install(self, project_slug, version, etag=None, progress=None):
+		"""Download and extract a version unless it is already cached. Blocking."""
+		if self.has_version(project_slug, version):
+			self.hits += 1
+			return True
+		self.misses += 1
+		project_root = self.project_root(project_slug)
+		os.makedirs(project_root, exist_ok=True)
+		staging = os.path.join(project_root, f".staging-{uuid.uuid4().hex}")
+		os.makedirs(staging)
+		try:
+			started = time.monotonic()
+			downloaded = download_project_files(project_slug, staging, etag, progress)
+			project_download_seconds.labels('success' if downloaded else 'failure').observe(
+				time.monotonic() - started
+			)
+			if not downloaded:
+				return False
+			size = 0
+			for dirpath, _, filenames in os.walk(staging):
+				for name in filenames:
+					path = os.path.join(dirpath, name)
+					mode = os.lstat(path).st_mode
+					if stat.S_ISREG(mode):
+						# Shared by every workspace through hardlinks: never writable
+						os.chmod(path, mode & ~0o222)
+						size += os.path.getsize(path)
+			with open(os.path.join(staging, '.complete'), 'w') as f:
+				f.write(str(size))
 			try:
-				# Download the zip file from S3 with progress reporting
-				print(f"Downloading {s3_path} to {temp_file.name}")
-				
-				# Set up a callback to track download progress
-				downloaded = 0
-				last_reported = 0
-				
-				def download_progress(chunk):
-					nonlocal downloaded, last_reported
-					downloaded += chunk
-					progress = int((downloaded / file_size) * 100)
-					if progress > last_reported + 4:  # Report every 5%
-						last_reported = progress
-						print(f"Download progress: {progress}%")
-				
-				# Use TransferConfig with reduced threads for Render free tier
-				config = boto3.s3.transfer.TransferConfig(
-					multipart_threshold=1024 * 50,  # 50MB
-					max_concurrency=2,  # Reduced from 10 to avoid thread exhaustion
-					use_threads=False  # Disable threading on free tier
-				)
-				
-				s3.download_file(
-					bucket_name, 
-					s3_path, 
-					temp_file.name,
-					Callback=download_progress,
-					Config=config
+				os.rename(staging, self.version_dir(project_slug, version))
+			except OSError:
+				# Another worker installed the same version first
+				if not self.has_version(project_slug, version):
+					raise
+		finally:
+			shutil.rmtree(staging, ignore_errors=True)
+		self.collect_garbage(keep=(project_slug, version))
+		return True
+
+	def activate(self, project_slug, version):
+		"""Point 'current' at version and mark it as recently used"""
+		project_root = self.project_root(project_slug)
+		if self.current_version(project_slug) != version:
+			link = os.path.join(project_root, f".current-{uuid.uuid4().hex}")
+			os.symlink(version, link)
+			os.replace(link, os.path.join(project_root, 'current'))
+		os.utime(os.path.join(self.version_dir(project_slug, version), '.complete'))
+
+	def collect_garbage(self, keep=None):
+		"""
+		Evict least recently used versions until under max_bytes. Current
+		versions and keep, a (slug, version) about to be activated, are spared.
+		"""
+		entries = []
+		total = 0
+		for project_slug in os.listdir(self.root):
+			if project_slug not in ALLOWED_PROJECTS:
+				continue
+			current = self.current_version(project_slug)
+			for version in os.listdir(self.project_root(project_slug)):
+				if version == 'current' or version.startswith('.'):
+					continue
+				marker = os.path.join(self.root, project_slug, version, '.complete')
+				try:
+					with open(marker) as f:
+						size = int(f.read() or 0)
+					last_used = os.path.getmtime(marker)
+				except (OSError, ValueError):
+					continue
+				total += size
+				if version != current and (project_slug, version) != keep:
+					entries.append((last_used, size, project_slug, version))
+		for _, size, project_slug, version in sorted(entries):
+			if total <= self.max_bytes:
+				break
+			logger.info("Evicting cached %s version %s", project_slug, version)
+			shutil.rmtree(self.version_dir(project_slug, version), ignore_errors=True)
+			total -= size
+			self.evictions += 1
+
+	def stats(self):
+		return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+project_cache = ProjectCache(
+	root=PROJECTS_DIR,
+	max_bytes=int(os.environ.get('TERMINAL_CACHE_MAX_BYTES', str(2 * 1024 ** 3))),
+	revalidate_seconds=float(os.environ.get('TERMINAL_CACHE_REVALIDATE_SECONDS', '5')),
+)
+
+class SingleFlight:
+	"""
+	Coalesce concurrent calls for the same key into one executor job.
+
+	The first caller for a key starts func(*args, publish) in the executor.
+	Later callers join it: every caller gets the progress events func passes
+	to publish (replaying the latest one on join) and the same result.
+	"""
+
+	def __init__(self):
+		self.started = 0
+		self.joined = 0
+		self._flights = {}
+
+	async def run(self, key, func, *args, on_progress=None):
+		flight = self._flights.get(key)
+		if flight is None:
+			flight = self._start(key, func, args)
+			self.started += 1
+		else:
+			self.joined += 1
+
+		events = asyncio.Queue()
+		if flight['last_event'] is not None:
+			events.put_nowait(flight['last_event'])
+		flight['subscribers'].add(events)
+		try:
+			while not flight['result'].done():
+				next_event = asyncio.ensure_future(events.get())
+				try:
+					await asyncio.wait({next_event, flight['result']}, return_when=asyncio.FIRST_COMPLETED)
+				finally:
+					next_event.cancel()
+				if next_event.done() and not next_event.cancelled() and on_progress is not None:
+					await on_progress(next_event.result())
+			# Deliver events published just before the job finished
+			while not events.empty() and on_progress is not None:
+				await on_progress(events.get_nowait())
+			return flight['result'].result()
+		finally:
+			flight['subscribers'].discard(events)
+
+	def _start(self, key, func, args):
+		loop = asyncio.get_running_loop()
+		flight = {'result': loop.create_future(), 'subscribers': set(), 'last_event': None}
+
+		def publish(event):
+			flight['last_event'] = event
+			for subscriber in flight['subscribers']:
+				subscriber.put_nowait(event)
+
+		async def execute():
+			try:
+				result = await loop.run_in_executor(
+					None, func, *args, lambda event: loop.call_soon_threadsafe(publish, event)
 				)
-				
-				# Check if file downloaded correctly
-				file_size = os.path.getsize(temp_file.name)
-				print(f"Downloaded file size: {file_size} bytes")
-				if file_size == 0:
-					print("Downloaded file is empty")
-					return False
-				
-				# Extract the zip file to the project directory with progress updates
-				print(f"Opening ZIP file {temp_file.name}")
-				# Use blocklist instead of allowlist - block dangerous file types
-				BLOCKED_EXTENSIONS = {'.exe', '.dll', '.so', '.dylib', '.bin', '.app', '.dmg', '.pkg', '.deb', '.rpm'}
-				with zipfile.ZipFile(temp_file.name, 'r') as zip_ref:
-					for file in zip_ref.namelist():
-						# Skip directory entries (end with /)
-						if file.endswith('/'):
-							continue
-						# Check for dangerous file extensions
-						file_ext = os.path.splitext(file)[1].lower()
-						if file_ext in BLOCKED_EXTENSIONS:
-							print(f"Warning: Skipping blocked file type: {file}")
-							continue
-						# Block path traversal attempts
-						if '..' in file or file.startswith('/'):
-							print(f"Warning: Skipping file with suspicious path: {file}")
-							continue
-					total_files = len([f for f in zip_ref.namelist() if not f.endswith('/')])
-					print(f"ZIP contains {total_files} files (excluding directories): {zip_ref.namelist()[:5]}...")
-					
-					# Extract in smaller batches to avoid memory issues
-					for i, file in enumerate(zip_ref.namelist()):
-						# Skip directories
-						if file.endswith('/'):
-							continue
-						# Skip blocked extensions
-						file_ext = os.path.splitext(file)[1].lower()
-						if file_ext in BLOCKED_EXTENSIONS:
-							continue
-						# Skip path traversal
-						if '..' in file or file.startswith('/'):
-							continue
-							
-						zip_ref.extract(file, project_dir)
-						if i % 10 == 0:  # Report progress every 10 files
-							print(f"Extracted {i}/{total_files} files")
-					
-					# Verify extraction
-					extracted = os.listdir(project_dir)
-					print(f"Files in project dir after extraction: {extracted}")
-					if len(extracted) == 0:
-						print("No files extracted")
-						return False
-						
-					# Create cache marker
-					with open(cache_marker, 'w') as f:
-						f.write(str(time.time()))
-						
-					return True
-			except zipfile.BadZipFile as e:
-				print(f"Bad ZIP file: {e}")
-				# Try to get file format info
-				with open(temp_file.name, 'rb') as f:
-					header = f.read(10)
-					print(f"File header (hex): {header.hex()}")
-				return False
+				flight['result'].set_result(result)
 			except Exception as e:
-				print(f"Error extracting project: {e}")
-				return False
+				flight['result'].set_exception(e)
+			finally:
+				del self._flights[key]
+
+		self._flights[key] = flight
+		# The job outlives its callers: an abandoned download still fills the cache
+		flight['task'] = asyncio.create_task(execute())
+		flight['result'].add_done_callback(lambda f: f.cancelled() or f.exception())
+		return flight
+
+	def stats(self):
+		return {'started': self.started, 'joined': self.joined}
+
+# Across processes or replicas sharing the projects volume, installs of a
+# version are serialized with a Redis lock, and whoever gets the lock second
+# finds the version already cached.
+INSTALL_LOCK_TIMEOUT = 600
+
+def install_project_version(project_slug, version, etag, progress):
+	"""Install a project version while holding its cross-process Redis lock. Blocking."""
+	lock = None
+	if not project_cache.has_version(project_slug, version):
+		try:
+			lock = redis_client.lock(
+				f"terminal_install:{project_slug}:{version}",
+				timeout=INSTALL_LOCK_TIMEOUT,
+				blocking_timeout=INSTALL_LOCK_TIMEOUT,
+			)
+			if not lock.acquire(blocking=False):
+				progress({'stage': 'waiting'})
+				if not lock.acquire():
+					lock = None
+		except redis.RedisError as e:
+			logger.warning("Install lock unavailable, installing without it: %s", e)
+			lock = None
+	try:
+		return project_cache.install(project_slug, version, etag, progress)
+	finally:
+		if lock is not None:
+			try:
+				lock.release()
+			except redis.RedisError as e:
+				logger.warning("Failed to release install lock: %s", e)
+
+project_installs = SingleFlight()
+
+# Startup prefetch: hot projects gate /readyz and are fetched first
+PREFETCH_ENABLED = os.environ.get('TERMINAL_PREFETCH', 'True').lower() in ('true', '1', 't')
+PREFETCH_CONCURRENCY = int(os.environ.get('TERMINAL_PREFETCH_CONCURRENCY', '3'))
+HOT_PROJECTS = [
+	project_slug.strip()
+	for project_slug in os.environ.get('TERMINAL_HOT_PROJECTS', ','.join(sorted(ALLOWED_PROJECTS))).split(',')
+	if project_slug.strip() in ALLOWED_PROJECTS
+]
+# pending -> fetching -> cached | missing | failed, or skipped when prefetch is off
+prefetch_state = {project_slug: 'pending' for project_slug in ALLOWED_PROJECTS}
+
+async def prefetch_project(project_slug):
+	"""Fetch, extract and activate the latest version of one project"""
+	prefetch_state[project_slug] = 'fetching'
+	loop = asyncio.get_running_loop()
+	try:
+		version, etag = await loop.run_in_executor(None, project_cache.latest_version, project_slug)
+		if version is None:
+			prefetch_state[project_slug] = 'missing'
+			return
+		# Shares the download with any session opening the project meanwhile
+		installed = await project_installs.run(
+			(project_slug, version), install_project_version, project_slug, version, etag
+		)
+		if installed:
+			project_cache.activate(project_slug, version)
+			shell_pool.wake()
+		prefetch_state[project_slug] = 'cached' if installed else 'failed'
 	except Exception as e:
-		print(f"Project file download error: {e}")
-		return False
+		logger.error("Prefetch of %s failed: %s", project_slug, e)
+		record_error('prefetch', e)
+		prefetch_state[project_slug] = 'failed'
+
+async def prefetch_projects():
+	"""Prefetch every allowed project, hot ones first, with bounded concurrency"""
+	if not PREFETCH_ENABLED:
+		for project_slug in prefetch_state:
+			prefetch_state[project_slug] = 'skipped'
+		return
+	
+	semaphore = asyncio.Semaphore(max(1, PREFETCH_CONCURRENCY))
+	
+	async def bounded(project_slug):
+		async with semaphore:
+			await prefetch_project(project_slug)
+	
+	started = time.monotonic()
+	order = HOT_PROJECTS + sorted(ALLOWED_PROJECTS - set(HOT_PROJECTS))
+	await asyncio.gather(*(bounded(project_slug) for project_slug in order))
+	logger.info("Prefetched %d projects in %.1fs", len(order), time.monotonic() - started)
+
+def create_workspace(project_slug, version=None):
+	"""
+	Build a private working copy of a cached project version for one session.
+	Files are hardlinked from the read-only cache tree (falling back to copies
+	across filesystems, or always when TERMINAL_WORKSPACE_MODE=copy). Blocking.
+	"""
+	workspace = os.path.join(SANDBOXES_DIR, uuid.uuid4().hex, project_slug)
+	os.makedirs(workspace)
+	if version is None:
+		return workspace
+	source = project_cache.version_dir(project_slug, version)
+	use_links = WORKSPACE_MODE == 'hardlink'
+	for dirpath, dirnames, filenames in os.walk(source):
+		target_dir = os.path.join(workspace, os.path.relpath(dirpath, source))
+		for name in dirnames:
+			os.makedirs(os.path.join(target_dir, name), exist_ok=True)
+		for name in filenames:
+			if dirpath == source and name == '.complete':
+				continue
+			src, dst = os.path.join(dirpath, name), os.path.join(target_dir, name)
+			if use_links:
+				try:
+					os.link(src, dst)
+					continue
+				except OSError:
+					use_links = False
+			shutil.copy2(src, dst)
+			os.chmod(dst, os.stat(dst).st_mode | stat.S_IWUSR)
+	return workspace
+
+def remove_workspace(workspace):
+	shutil.rmtree(os.path.dirname(workspace), ignore_errors=True)
 
 @app.get("/images/{project_slug}/{image_name}")
-async def get_project_image(project_slug: str, image_name: str):
-	"""Serve project generated images"""
+async def get_project_image(project_slug: str, image_name: str, session: str = None, resume: str = None):
+	"""
+	Serve project generated images. Given a session's id and token (the
+	?session=&resume= pair used to reattach), images the session wrote to
+	its workspace are served first, then those of the cached project.
+	"""
 	try:
 		# Validate and sanitize project slug
 		project_slug = sanitize_project_slug(project_slug)
@@ -703,9 +2964,14 @@ async def get_project_image(project_slug: str, image_name: str):
 			raise HTTPException(status_code=400, detail="Invalid characters in image name")
 		
 		# Use safe_join_path to construct the path
-		base_projects_dir = "/home/coder/projects"
-		project_dir = safe_join_path(base_projects_dir, project_slug)
-		image_path = safe_join_path(project_dir, "images", image_name)
+		project_dir = safe_join_path(PROJECTS_DIR, project_slug)
+		image_path = safe_join_path(project_dir, "current", "images", image_name)
+		owner = terminal_sessions.get(session) if session else None
+		if (owner is not None and owner.workspace and owner.project_slug == project_slug
+				and owner.matches(resume)):
+			session_image = safe_join_path(owner.workspace, "images", image_name)
+			if os.path.isfile(session_image):
+				image_path = session_image
 		
 		# Verify the file exists and is within the expected directory
 		if not os.path.exists(image_path):
@@ -752,4 +3018,276 @@ def check_terminal_security():
 		return False
 	
 	logger.info("Security checks passed. Terminal environment is secure")
-	return True
\ No newline at end of file
+	return True
+
+# Supervisor mode: with TERMINAL_WORKERS > 1, entrypoint.sh serves
+# supervisor_app instead of app. It runs that many copies of app on loopback
+# ports and relays every terminal WebSocket to the worker owning its session,
+# so PTY I/O is spread over several event loops and cores.
+
+class HashRing:
+	"""Consistent hashing of keys onto nodes, with virtual nodes for balance"""
+
+	def __init__(self, nodes, replicas=100):
+		self._ring = sorted((self._hash(f"{node}:{i}"), node) for node in nodes for i in range(replicas))
+		self._keys = [point for point, _ in self._ring]
+
+	@staticmethod
+	def _hash(key):
+		return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+	def node_for(self, key):
+		index = bisect.bisect(self._keys, self._hash(key)) % len(self._ring)
+		return self._ring[index][1]
+
+def merge_metrics(snapshots):
+	"""Sum numeric fields, recursively, across per-worker /metrics snapshots"""
+	merged = {}
+	for snapshot in snapshots:
+		for key, value in snapshot.items():
+			if isinstance(value, dict):
+				merged[key] = merge_metrics([merged.get(key, {}), value])
+			elif isinstance(value, (int, float)) and not isinstance(value, bool):
+				merged[key] = merged.get(key, 0) + value
+			else:
+				merged.setdefault(key, value)
+	return merged
+
+class WorkerSupervisor:
+	"""Runs the worker processes, restarts them if they die, and routes sessions"""
+
+	def __init__(self, count, base_port, monitor_interval=1.0):
+		self.ports = {str(i): base_port + i for i in range(count)}
+		self.ring = HashRing(self.ports)
+		self.monitor_interval = monitor_interval
+		self.restarts = 0
+		self.http = None
+		self._processes = {}
+
+	def url(self, worker_id, path, scheme='http'):
+		return f"{scheme}://127.0.0.1:{self.ports[worker_id]}{path}"
+
+	async def _spawn(self, worker_id):
+		env = {**os.environ, 'TERMINAL_WORKER_ID': worker_id}
+		self._processes[worker_id] = await asyncio.create_subprocess_exec(
+			sys.executable, '-m', 'uvicorn', 'main:app',
+			'--host', '127.0.0.1', '--port', str(self.ports[worker_id]),
+			# Every connection comes from the relay; take the client address it forwards
+			'--proxy-headers', '--forwarded-allow-ips', '127.0.0.1',
+			env=env,
+		)
+		logger.info("Started worker %s on port %s", worker_id, self.ports[worker_id])
+
+	async def start(self):
+		self.http = aiohttp.ClientSession()
+		for worker_id in self.ports:
+			await self._spawn(worker_id)
+
+	async def run(self):
+		"""Restart workers that exit. Their sessions are gone; new ones hash back in."""
+		while True:
+			await asyncio.sleep(self.monitor_interval)
+			for worker_id, process in list(self._processes.items()):
+				if process.returncode is not None:
+					logger.error("Worker %s exited with %s, restarting", worker_id, process.returncode)
+					self.restarts += 1
+					await self._spawn(worker_id)
+
+	async def stop(self, timeout=10):
+		for process in self._processes.values():
+			if process.returncode is None:
+				process.terminate()
+		for worker_id, process in self._processes.items():
+			try:
+				await asyncio.wait_for(process.wait(), timeout)
+			except asyncio.TimeoutError:
+				logger.warning("Worker %s did not stop, killing it", worker_id)
+				process.kill()
+		if self.http is not None:
+			await self.http.close()
+
+	async def owner(self, session_id):
+		"""Worker holding a session: the directory entry if any, else its ring position"""
+		try:
+			worker_id = await async_redis.hget(SessionRegistry.key(session_id), 'worker')
+		except redis.RedisError as e:
+			logger.warning("Session directory unavailable: %s", e)
+			worker_id = None
+		return worker_id if worker_id in self.ports else self.ring.node_for(session_id)
+
+	def place(self, client_host):
+		"""
+		Worker for a new session: the client's ring position, so one client's
+		sessions share a worker (and its per-client state) while clients spread
+		over all of them
+		"""
+		return self.ring.node_for(client_host)
+
+	async def gather(self, path, text=False):
+		"""GET path from every worker; returns {worker_id: (status, json, or text if asked, or None)}"""
+		async def fetch(worker_id):
+			try:
+				async with self.http.get(self.url(worker_id, path), timeout=aiohttp.ClientTimeout(total=5)) as response:
+					body = await response.text() if text else await response.json()
+					return worker_id, (response.status, body)
+			except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+				logger.warning("Worker %s %s failed: %s", worker_id, path, e)
+				return worker_id, (None, None)
+		return dict(await asyncio.gather(*(fetch(worker_id) for worker_id in self.ports)))
+
+supervisor = WorkerSupervisor(
+	count=int(os.environ.get('TERMINAL_WORKERS', '1')),
+	base_port=int(os.environ.get('TERMINAL_WORKER_BASE_PORT', '8100')),
+)
+
+@asynccontextmanager
+async def supervisor_lifespan(app: FastAPI):
+	configure_logging()
+	log.info('supervisor_starting', workers=len(supervisor.ports))
+	await supervisor.start()
+	monitor_task = asyncio.create_task(supervisor.run())
+	yield
+	log.info('supervisor_stopping')
+	monitor_task.cancel()
+	try:
+		await monitor_task
+	except asyncio.CancelledError:
+		pass
+	await supervisor.stop()
+	await async_redis.aclose()
+	stop_logging()
+
+supervisor_app = FastAPI(lifespan=supervisor_lifespan)
+supervisor_app.add_api_route("/healthz", health_check)
+
+@supervisor_app.get("/images/{project_slug}/{image_name}")
+async def supervisor_project_image(project_slug: str, image_name: str, session: str = None, resume: str = None):
+	"""Session images live in the owning worker's memory and sandbox, so ask it"""
+	if not session:
+		return await get_project_image(project_slug, image_name)
+	worker_id = await supervisor.owner(session)
+	url = supervisor.url(worker_id, f"/images/{project_slug}/{image_name}")
+	try:
+		async with supervisor.http.get(
+			url, params={'session': session, 'resume': resume or ''}, timeout=aiohttp.ClientTimeout(total=30)
+		) as response:
+			return Response(
+				content=await response.read(),
+				status_code=response.status,
+				media_type=response.headers.get('Content-Type'),
+			)
+	except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+		logger.error("Worker %s unreachable: %s", worker_id, e)
+		raise HTTPException(status_code=503, detail="Worker unavailable")
+
+@supervisor_app.get("/readyz")
+async def supervisor_readiness_check():
+	"""Ready once every worker is"""
+	results = await supervisor.gather('/readyz')
+	ready = all(status == 200 for status, _ in results.values())
+	return JSONResponse(
+		status_code=200 if ready else 503,
+		content={
+			"status": "ready" if ready else "warming",
+			"workers": {worker_id: body for worker_id, (_, body) in results.items()},
+		},
+	)
+
+@supervisor_app.get("/metrics")
+async def supervisor_metrics():
+	"""Every worker's /metrics, summed, plus the per-worker snapshots"""
+	results = await supervisor.gather('/metrics')
+	snapshots = [body for _, body in results.values() if body is not None]
+	merged = merge_metrics(snapshots)
+	# Fields that do not add up across processes
+	if snapshots:
+		merged["memory_used_percent"] = max(s["memory_used_percent"] for s in snapshots)
+		frames = merged["output_frames_per_second"]
+		merged["output_bytes_per_frame"] = sum(
+			s["output_bytes_per_frame"] * s["output_frames_per_second"] for s in snapshots
+		) / frames if frames else 0.0
+	merged["uptime"] = time.time() - app_start_time
+	merged["supervisor"] = {"workers": len(supervisor.ports), "restarts": supervisor.restarts}
+	merged["workers"] = {worker_id: body for worker_id, (_, body) in results.items()}
+	return merged
+
+@supervisor_app.get("/metrics/prometheus")
+async def supervisor_prometheus_metrics():
+	"""Every worker's samples, labelled by worker, plus the supervisor's own"""
+	results = await supervisor.gather('/metrics/prometheus', text=True)
+	text = merge_prometheus({
+		worker_id: body for worker_id, (status, body) in results.items() if status == 200
+	})
+	text += (
+		"# HELP terminal_supervisor_worker_up Whether the worker answered the last scrape\n"
+		"# TYPE terminal_supervisor_worker_up gauge\n"
+		+ ''.join(
+			f'terminal_supervisor_worker_up{{worker="{worker_id}"}} {int(status == 200)}\n'
+			for worker_id, (status, _) in results.items()
+		)
+		+ "# HELP terminal_supervisor_restarts_total Workers restarted after exiting\n"
+		"# TYPE terminal_supervisor_restarts_total counter\n"
+		f"terminal_supervisor_restarts_total {supervisor.restarts}\n"
+	)
+	return PlainTextResponse(text, media_type=PROMETHEUS_CONTENT_TYPE)
+
+@supervisor_app.websocket("/terminal/{project_slug}/")
+async def supervisor_terminal_endpoint(websocket: WebSocket, project_slug: str):
+	"""Relay a terminal WebSocket to the worker that owns the session"""
+	session_id = websocket.query_params.get('session')
+	client_host = websocket.client.host if websocket.client else ''
+	headers = {'X-Forwarded-For': client_host}
+	if session_id:
+		worker_id = await supervisor.owner(session_id)
+	else:
+		session_id = str(uuid.uuid4())
+		worker_id = supervisor.place(client_host or session_id)
+		headers['X-Terminal-Session'] = session_id
+	
+	url = supervisor.url(worker_id, f"/terminal/{project_slug}/", scheme='ws')
+	if websocket.url.query:
+		url += f"?{websocket.url.query}"
+	try:
+		upstream = await supervisor.http.ws_connect(
+			url,
+			protocols=websocket.scope.get('subprotocols', []),
+			headers=headers,
+			max_msg_size=0,
+		)
+	except aiohttp.ClientError as e:
+		logger.error("Worker %s unreachable: %s", worker_id, e)
+		await websocket.close(code=1013)  # Try again later
+		return
+	
+	# Frames pass through untouched, so the client gets whatever framing the worker chose
+	await websocket.accept(subprotocol=upstream.protocol)
+	
+	async def relay_to_client():
+		async for message in upstream:
+			if message.type == aiohttp.WSMsgType.TEXT:
+				await websocket.send_text(message.data)
+			elif message.type == aiohttp.WSMsgType.BINARY:
+				await websocket.send_bytes(message.data)
+			else:
+				break
+		await websocket.close()
+	
+	relay_task = asyncio.create_task(relay_to_client())
+	try:
+		while True:
+			message = await websocket.receive()
+			if message['type'] == 'websocket.disconnect':
+				break
+			if message.get('bytes') is not None:
+				await upstream.send_bytes(message['bytes'])
+			elif message.get('text') is not None:
+				await upstream.send_str(message['text'])
+	except (RuntimeError, ConnectionError) as e:
+		logger.debug("Relay for session %s ended: %s", session_id, e)
+	finally:
+		relay_task.cancel()
+		try:
+			await relay_task
+		except (asyncio.CancelledError, RuntimeError, ConnectionError):
+			pass
+		await upstream.close()
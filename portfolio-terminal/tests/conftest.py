@@ -1,7 +1,9 @@
 # tests/conftest.py
 """Shared fixtures for the portfolio-terminal test suite."""
 
+import asyncio
 import os
+from unittest import mock
 
 import pytest
 from fastapi.testclient import TestClient
@@ -30,6 +32,8 @@ def client():
             pass
 
     with patch('main.periodic_health_checks', new=_idle), \
+         patch('main.prefetch_projects', new=_idle), \
+         patch('main.async_redis', new=mock.AsyncMock()), \
          patch('main.redis_client') as _mock_redis:
         _mock_redis.setex.return_value = True
         _mock_redis.get.return_value = None
@@ -38,3 +42,92 @@ def client():
         from main import app
         with TestClient(app, raise_server_exceptions=True) as c:
             yield c
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for redis.asyncio.Redis covering what the session
+    registry uses. Every round trip (a command or a pipeline execute) waits
+    `latency` seconds without blocking the loop, like a real network call.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.round_trips = 0
+        self.hashes = {}
+        self.ttls = {}
+        self.zsets = {}
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def hgetall(self, key):
+        await self._round_trip()
+        return dict(self.hashes.get(key, {}))
+
+    async def hget(self, key, field):
+        await self._round_trip()
+        return self.hashes.get(key, {}).get(field)
+
+    async def zscore(self, key, member):
+        await self._round_trip()
+        return self.zsets.get(key, {}).get(member)
+
+    # Commands applied by FakePipeline.execute
+
+    def _hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+        return len(mapping)
+
+    def _expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+    def _delete(self, key):
+        self.ttls.pop(key, None)
+        return int(self.hashes.pop(key, None) is not None)
+
+    def _zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    def _zrem(self, key, member):
+        return int(self.zsets.get(key, {}).pop(member, None) is not None)
+
+    def _zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        doomed = [m for m, score in zset.items() if float(low) <= score <= float(high)]
+        for member in doomed:
+            del zset[member]
+        return len(doomed)
+
+    def _zrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        return sorted((m for m, score in zset.items() if float(low) <= score <= float(high)), key=zset.get)
+
+
+class FakePipeline:
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, f'_{name}')
+        return lambda *args, **kwargs: self.commands.append((command, args, kwargs))
+
+    async def execute(self):
+        await self.redis._round_trip()
+        results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
@@ -28,6 +28,8 @@ def app_client():
             pass
 
     with patch('main.periodic_health_checks', new=_idle), \
+         patch('main.prefetch_projects', new=_idle), \
+         patch('main.async_redis', new=m.AsyncMock()), \
          patch('main.redis_client') as mock_redis:
         mock_redis.setex.return_value = True
         mock_redis.get.return_value = None
@@ -65,8 +67,83 @@ class TestMetricsEndpoint:
         assert 'active_terminals' in data
         assert 'uptime' in data
 
+    def test_metrics_contains_output_frame_stats(self, app_client):
+        with m.patch('main.psutil') as mock_psutil:
+            mock_psutil.virtual_memory.return_value.percent = 0.0
+            data = app_client.get('/metrics').json()
+        assert 'output_frames_per_second' in data
+        assert 'output_bytes_per_frame' in data
+
+    def test_metrics_report_registered_sessions_without_calling_redis(self, app_client):
+        registry = m.Mock(registered=['a', 'other-instance'], active=m.AsyncMock())
+        with m.patch('main.psutil') as mock_psutil, m.patch('main.session_registry', new=registry):
+            mock_psutil.virtual_memory.return_value.percent = 0.0
+            data = app_client.get('/metrics').json()
+        assert data['sessions']['registered'] == ['a', 'other-instance']
+        registry.active.assert_not_called()
+
     def test_metrics_active_terminals_is_int(self, app_client):
         with m.patch('main.psutil') as mock_psutil:
             mock_psutil.virtual_memory.return_value.percent = 0.0
             data = app_client.get('/metrics').json()
         assert isinstance(data['active_terminals'], int)
+
+
+class TestPrometheusEndpoint:
+
+    def test_serves_text_exposition(self, app_client):
+        with m.patch('main.psutil') as mock_psutil:
+            mock_psutil.virtual_memory.return_value.percent = 42.0
+            response = app_client.get('/metrics/prometheus')
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+        assert '# TYPE terminal_time_to_first_prompt_seconds histogram' in response.text
+        assert 'terminal_memory_used_percent 42.0' in response.text
+
+    def test_counts_active_sessions_per_project(self, app_client):
+        import main
+        sessions = {
+            'a': m.Mock(project_slug='minishell', terminal=object()),
+            'b': m.Mock(project_slug='minishell', terminal=None),
+        }
+        with m.patch.dict(main.terminal_sessions, sessions, clear=True), \
+             m.patch('main.psutil') as mock_psutil:
+            mock_psutil.virtual_memory.return_value.percent = 0.0
+            text = app_client.get('/metrics/prometheus').text
+        assert 'terminal_active_sessions{project="minishell",state="attached"} 1' in text
+        assert 'terminal_active_sessions{project="minishell",state="detached"} 1' in text
+
+
+class TestErrorStatsEndpoint:
+
+    def test_reports_recorded_errors(self, app_client):
+        import main
+        before = app_client.get('/error-stats').json()['errors']
+        main.record_error('download', OSError("disk full"))
+        data = app_client.get('/error-stats').json()
+        assert data['errors'] == before + 1
+        assert data['last_error'] == 'download: disk full'
+        assert data['last_error_time'] is not None
+
+
+class TestReadinessEndpoint:
+
+    def test_warming_until_hot_projects_settle(self, app_client):
+        import main
+        with m.patch.dict(main.prefetch_state, {slug: 'pending' for slug in main.prefetch_state}):
+            response = app_client.get('/readyz')
+        assert response.status_code == 503
+        assert response.json()['status'] == 'warming'
+
+    def test_ready_reports_per_project_state(self, app_client):
+        import main
+        states = {slug: 'cached' for slug in main.prefetch_state}
+        states['minishell'] = 'failed'
+        with m.patch.dict(main.prefetch_state, states), \
+             m.patch.object(main.project_cache, 'current_version', return_value='v1'):
+            response = app_client.get('/readyz')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['status'] == 'ready'
+        assert data['projects']['minishell'] == {'state': 'failed', 'version': 'v1'}
+        assert set(data['projects']) == main.ALLOWED_PROJECTS
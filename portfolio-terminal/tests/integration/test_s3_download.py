@@ -0,0 +1,160 @@
+# tests/integration/test_s3_download.py
+"""Archive downloads through a real boto3 client against a local S3 stand-in."""
+
+import io
+import os
+import re
+import sys
+import threading
+import types
+import unittest.mock as m
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+
+# Other modules replace boto3 with a MagicMock when it is imported first
+pytestmark = pytest.mark.skipif(
+    not isinstance(main.boto3, types.ModuleType), reason="boto3 is mocked in this run",
+)
+
+
+class LocalS3:
+    """
+    Minimal S3-compatible server for HeadObject and ranged GetObject.
+    Objects live in memory; it records each request and the client
+    connections they arrived on.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.requests = []
+        self.connections = set()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def put(self, bucket, key, data):
+        self.objects[f'/{bucket}/{key}'] = data
+
+    def _handler(self):
+        s3 = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _object(self):
+                s3.connections.add(self.client_address)
+                data = s3.objects.get(self.path.split('?')[0])
+                if data is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                return data
+
+            def do_HEAD(self):
+                s3.requests.append(('HEAD', None))
+                data = self._object()
+                if data is not None:
+                    self.send_response(200)
+                    self.send_header('Content-Length', str(len(data)))
+                    self.send_header('ETag', '"v1"')
+                    self.end_headers()
+
+            def do_GET(self):
+                byte_range = self.headers.get('Range')
+                s3.requests.append(('GET', byte_range))
+                data = self._object()
+                if data is None:
+                    return
+                if self.headers.get('If-Match') not in (None, '"v1"'):
+                    self.send_response(412)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                start, end = re.match(r'bytes=(\d+)-(\d*)', byte_range).groups()
+                end = int(end) + 1 if end else len(data)
+                body = data[int(start):end]
+                self.send_response(206)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Content-Range', f'bytes {start}-{end - 1}/{len(data)}')
+                self.send_header('ETag', '"v1"')
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def local_s3():
+    env = {
+        'AWS_S3_ENDPOINT_URL': None,
+        'AWS_ACCESS_KEY_ID': 'test',
+        'AWS_SECRET_ACCESS_KEY': 'test',
+        'AWS_S3_REGION_NAME': 'us-east-1',
+        'AWS_S3_ADDRESSING_STYLE': 'path',
+        'AWS_STORAGE_BUCKET_NAME': 'portfolio-bucket',
+    }
+    with LocalS3() as s3:
+        env['AWS_S3_ENDPOINT_URL'] = s3.endpoint
+        with m.patch.dict(os.environ, env), m.patch('main._s3_client', None), \
+             m.patch('main.is_dev_mode', return_value=False):
+            yield s3
+
+
+class TestS3Download:
+
+    def test_parallel_download_reuses_connections(self, local_s3, tmp_path):
+        files = {f'src/file{i}.c': os.urandom(40000) for i in range(100)}
+        data = make_zip(files)
+        local_s3.put('portfolio-bucket', 'project-files/minishell.zip', data)
+
+        (tmp_path / 'again').mkdir()
+        with m.patch('main.transfer_plan', return_value=(256 * 1024, 4)):
+            assert main.download_project_files('minishell', str(tmp_path), etag='"v1"')
+            assert main.download_project_files('minishell', str(tmp_path / 'again'), etag='"v1"')
+
+        assert (tmp_path / 'src' / 'file7.c').read_bytes() == files['src/file7.c']
+        gets = [r for method, r in local_s3.requests if method == 'GET']
+        parts = -(-(len(data) - main.ARCHIVE_TAIL_SIZE) // (256 * 1024))
+        assert len(gets) == 2 * (parts + 1)
+        # Both downloads went through one client and its pooled connections
+        assert len(local_s3.connections) <= 5
+
+    def test_version_check_and_download_share_the_client(self, local_s3, tmp_path):
+        local_s3.put('portfolio-bucket', 'project-files/minishell.zip', make_zip({'main.c': b'int main;'}))
+        version, etag = main.fetch_project_version('minishell')
+        assert (version, etag) == ('etag-v1', '"v1"')
+        client = main._s3_client
+        assert main.download_project_files('minishell', str(tmp_path), etag=etag)
+        assert main._s3_client is client
+
+    def test_changed_archive_fails_the_download(self, local_s3, tmp_path):
+        local_s3.put('portfolio-bucket', 'project-files/minishell.zip', make_zip({'main.c': b'int main;'}))
+        assert not main.download_project_files('minishell', str(tmp_path), etag='"v0"')
@@ -0,0 +1,445 @@
+# tests/performance/loadgen.py
+"""
+Load generator for the terminal WebSocket service.
+
+Opens many concurrent /terminal/{slug}/ WebSockets, types a scripted
+command sequence into each one keystroke by keystroke and reports connect
+time, time to first prompt, keystroke echo latency, command latency,
+output throughput and the server's RSS.
+
+By default it starts its own server on a free port, serving a synthetic
+project archive from a local directory (the DEBUG archive path), so it
+runs offline. Use --s3-endpoint to serve the archive from a MinIO (or any
+S3-compatible) stand-in for R2 instead, or --url to drive a server that is
+already running.
+
+Examples:
+    python tests/performance/loadgen.py --sessions 200
+    python tests/performance/loadgen.py --sessions 50 --archive-dir /backend-media/project-files
+    python tests/performance/loadgen.py --s3-endpoint http://127.0.0.1:9000 --bucket portfolio-bucket
+    python tests/performance/loadgen.py --url ws://127.0.0.1:8000 --pid 1234
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import zipfile
+
+import psutil
+import websockets
+
+TERMINAL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+DEFAULT_COMMANDS = ('ls -la', 'cat Makefile', 'make')
+# The sandbox PS1 ends in "\$ " after a colour reset
+DEFAULT_PROMPT = r'[$#] $'
+
+FIXTURE_FILES = {
+    'Makefile': (
+        "NAME = hello\n"
+        "SRCS = src/main.c src/util.c\n\n"
+        "all: $(NAME)\n\n"
+        "$(NAME): $(SRCS)\n"
+        "\tcc -Wall -Wextra -o $(NAME) $(SRCS)\n\n"
+        "clean:\n"
+        "\trm -f $(NAME)\n"
+    ),
+    'src/main.c': (
+        '#include <stdio.h>\n'
+        'int twice(int n);\n'
+        'int main(void) { printf("%d\\n", twice(21)); return 0; }\n'
+    ),
+    'src/util.c': 'int twice(int n) { return n * 2; }\n',
+    'README.md': "Synthetic project used by the terminal load generator.\n" * 40,
+}
+
+
+def make_fixture_archive():
+    """A small C project as zip bytes, with a Makefile so `make` has work to do"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, content in FIXTURE_FILES.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+
+def upload_fixture(endpoint, bucket, project_slug, archive):
+    """Put the archive where download_project_files looks for it on R2"""
+    import boto3
+    s3 = boto3.client(
+        's3',
+        endpoint_url=endpoint,
+        aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID', 'minioadmin'),
+        aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY', 'minioadmin'),
+        region_name=os.environ.get('AWS_S3_REGION_NAME', 'us-east-1'),
+    )
+    try:
+        s3.head_bucket(Bucket=bucket)
+    except s3.exceptions.ClientError:
+        s3.create_bucket(Bucket=bucket)
+    s3.put_object(Bucket=bucket, Key=f'project-files/{project_slug}.zip', Body=archive)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """The terminal service in a uvicorn subprocess, with its state in a temp dir"""
+
+    def __init__(self, project_slug, archive_dir=None, s3_endpoint=None, bucket=None, workers=1):
+        self.project_slug = project_slug
+        self.archive_dir = archive_dir
+        self.s3_endpoint = s3_endpoint
+        self.bucket = bucket
+        self.workers = workers
+        self.port = free_port()
+        self.process = None
+        self._tmp = None
+
+    @property
+    def url(self):
+        return f'ws://127.0.0.1:{self.port}'
+
+    def start(self, timeout=120):
+        self._tmp = tempfile.TemporaryDirectory(prefix='terminal-load-')
+        archive = make_fixture_archive()
+        env = dict(
+            os.environ,
+            TERMINAL_PROJECTS_DIR=os.path.join(self._tmp.name, 'projects'),
+            TERMINAL_SANDBOXES_DIR=os.path.join(self._tmp.name, 'sandboxes'),
+            TERMINAL_HOT_PROJECTS=self.project_slug,
+            TERMINAL_WORKERS=str(self.workers),
+        )
+        if self.s3_endpoint:
+            upload_fixture(self.s3_endpoint, self.bucket, self.project_slug, archive)
+            env.update(
+                DEBUG='False',
+                AWS_S3_ENDPOINT_URL=self.s3_endpoint,
+                AWS_STORAGE_BUCKET_NAME=self.bucket,
+                AWS_ACCESS_KEY_ID=os.environ.get('AWS_ACCESS_KEY_ID', 'minioadmin'),
+                AWS_SECRET_ACCESS_KEY=os.environ.get('AWS_SECRET_ACCESS_KEY', 'minioadmin'),
+                AWS_S3_REGION_NAME=os.environ.get('AWS_S3_REGION_NAME', 'us-east-1'),
+                AWS_S3_ADDRESSING_STYLE='path',
+            )
+        else:
+            archive_dir = self.archive_dir
+            if archive_dir is None:
+                archive_dir = os.path.join(self._tmp.name, 'archives')
+                os.makedirs(archive_dir)
+                with open(os.path.join(archive_dir, f'{self.project_slug}.zip'), 'wb') as f:
+                    f.write(archive)
+            env.update(DEBUG='True', TERMINAL_LOCAL_ARCHIVE_DIR=archive_dir)
+
+        app = 'main:supervisor_app' if self.workers > 1 else 'main:app'
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', app, '--host', '127.0.0.1', '--port', str(self.port),
+             '--log-level', 'warning'],
+            cwd=TERMINAL_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self._wait_ready(timeout)
+        return self
+
+    def _wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Terminal service exited with {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{self.port}/readyz', timeout=2) as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                pass
+            time.sleep(0.25)
+        raise RuntimeError("Terminal service did not become ready")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+
+class RssSampler:
+    """Peak and latest RSS of a process and its descendants (the shells included)"""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self.latest = 0
+
+    def sample(self):
+        try:
+            root = psutil.Process(self.pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+        self.latest = rss
+        self.peak = max(self.peak, rss)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self.sample)
+            await asyncio.sleep(self.interval)
+
+
+class SessionResult:
+
+    def __init__(self):
+        self.connect = None
+        self.first_prompt = None
+        self.echoes = []
+        self.commands = []
+        self.output_bytes = 0
+        self.duration = 0.0
+        self.error = None
+
+
+class TerminalClient:
+    """One scripted visitor typing into a terminal over the JSON framing"""
+
+    def __init__(self, url, prompt, timeout):
+        self.url = url
+        self.prompt = re.compile(prompt)
+        self.timeout = timeout
+        self.websocket = None
+        self.output = ''
+        self.output_bytes = 0
+        # Flow control state, acking like the browser client does
+        self.position = 0
+        self.acked = 0
+        self.ack_bytes = 0
+
+    async def _receive(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        message = json.loads(await asyncio.wait_for(self.websocket.recv(), remaining))
+        if 'session' in message:
+            self.position = self.acked = message['session']['offset']
+        if 'flow' in message:
+            self.ack_bytes = message['flow']['ack_bytes']
+        text = message.get('output', '')
+        size = len(text.encode('utf-8'))
+        self.output += text
+        self.output_bytes += size
+        if self.ack_bytes:
+            self.position += size
+            if self.position - self.acked >= self.ack_bytes:
+                self.acked = self.position
+                await self.websocket.send(json.dumps({'ack': self.position}))
+
+    async def wait_for(self, predicate):
+        """Receive until predicate(output) holds"""
+        deadline = time.monotonic() + self.timeout
+        while not predicate(self.output):
+            await self._receive(deadline)
+
+    def at_prompt(self, output):
+        return self.prompt.search(output) is not None
+
+    async def send(self, text):
+        await self.websocket.send(json.dumps({'input': text}))
+
+    async def run(self, commands, result):
+        started = time.perf_counter()
+        self.websocket = await websockets.connect(self.url, max_size=None, open_timeout=self.timeout)
+        try:
+            result.connect = time.perf_counter() - started
+            # The shell's first prompt is consumed by the server's prompt
+            # detection; the welcome line is sent once the shell is usable
+            await self.wait_for(lambda output: 'Welcome to' in output)
+            result.first_prompt = time.perf_counter() - started
+            for command in commands:
+                for char in command:
+                    self.output = ''
+                    sent = time.perf_counter()
+                    await self.send(char)
+                    await self.wait_for(lambda output, char=char: char in output)
+                    result.echoes.append(time.perf_counter() - sent)
+                self.output = ''
+                sent = time.perf_counter()
+                await self.send('\r')
+                await self.wait_for(lambda output: '\n' in output and self.at_prompt(output.split('\n', 1)[1]))
+                result.commands.append(time.perf_counter() - sent)
+        finally:
+            result.output_bytes = self.output_bytes
+            result.duration = time.perf_counter() - started
+            await self.websocket.close()
+
+
+async def run_session(url, commands, prompt, timeout):
+    result = SessionResult()
+    try:
+        await TerminalClient(url, prompt, timeout).run(commands, result)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = sorted(values)
+
+    def at(fraction):
+        return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+    return {
+        'p50': at(0.5),
+        'p90': at(0.9),
+        'p99': at(0.99),
+        'max': values[-1],
+        'mean': statistics.fmean(values),
+    }
+
+
+async def run_load(url, project_slug, sessions, commands, ramp=50, prompt=DEFAULT_PROMPT, timeout=120, pid=None):
+    """
+    Run `sessions` scripted visitors against url, starting `ramp` per second.
+    Returns a report dict; pid, if given, is the server process to sample.
+    """
+    terminal_url = f"{url.rstrip('/')}/terminal/{project_slug}/"
+    sampler = RssSampler(pid) if pid else None
+    sampler_task = asyncio.create_task(sampler.run()) if sampler else None
+
+    async def delayed(index):
+        await asyncio.sleep(index / ramp if ramp else 0)
+        return await run_session(terminal_url, commands, prompt, timeout)
+
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(delayed(i) for i in range(sessions)))
+    finally:
+        if sampler_task is not None:
+            sampler_task.cancel()
+    elapsed = time.perf_counter() - started
+    if sampler is not None:
+        sampler.sample()
+
+    completed = [r for r in results if r.error is None]
+    errors = {}
+    for result in results:
+        if result.error is not None:
+            errors[result.error] = errors.get(result.error, 0) + 1
+    output_bytes = sum(r.output_bytes for r in results)
+    return {
+        'sessions': sessions,
+        'completed': len(completed),
+        'failed': sessions - len(completed),
+        'errors': errors,
+        'elapsed_seconds': elapsed,
+        'connect_seconds': percentiles([r.connect for r in results if r.connect is not None]),
+        'first_prompt_seconds': percentiles([r.first_prompt for r in results if r.first_prompt is not None]),
+        'echo_seconds': percentiles([e for r in results for e in r.echoes]),
+        'command_seconds': percentiles([c for r in results for c in r.commands]),
+        'output_bytes': output_bytes,
+        'output_bytes_per_second': output_bytes / elapsed if elapsed else 0.0,
+        'server_rss_peak_bytes': sampler.peak if sampler else None,
+        'server_rss_final_bytes': sampler.latest if sampler else None,
+    }
+
+
+def format_report(report):
+    lines = [
+        f"sessions: {report['completed']}/{report['sessions']} completed in {report['elapsed_seconds']:.1f}s",
+    ]
+    for error, count in sorted(report['errors'].items(), key=lambda item: -item[1]):
+        lines.append(f"  {count} x {error}")
+    lines.append(f"{'':<16}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for key, label in (
+        ('connect_seconds', 'connect'),
+        ('first_prompt_seconds', 'first prompt'),
+        ('echo_seconds', 'echo'),
+        ('command_seconds', 'command'),
+    ):
+        stats = report[key]
+        if stats is None:
+            lines.append(f"{label:<16}{'-':>10}")
+            continue
+        lines.append(f"{label:<16}" + ''.join(f"{stats[p] * 1000:>8.1f}ms" for p in ('p50', 'p90', 'p99', 'max')))
+    lines.append(
+        f"output: {report['output_bytes'] / 1024:.1f} KiB, "
+        f"{report['output_bytes_per_second'] / 1024:.1f} KiB/s"
+    )
+    if report['server_rss_peak_bytes'] is not None:
+        lines.append(
+            f"server RSS: peak {report['server_rss_peak_bytes'] / 1048576:.1f} MiB, "
+            f"final {report['server_rss_final_bytes'] / 1048576:.1f} MiB"
+        )
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=100, help="concurrent WebSocket sessions")
+    parser.add_argument('--ramp', type=float, default=50, help="sessions started per second (0: all at once)")
+    parser.add_argument('--project', default='minishell', help="project slug to open")
+    parser.add_argument('--command', action='append', dest='commands',
+                        help=f"command to type, repeatable (default: {', '.join(DEFAULT_COMMANDS)})")
+    parser.add_argument('--prompt', default=DEFAULT_PROMPT, help="regex matching the end of a shell prompt")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds to wait for any one step")
+    parser.add_argument('--url', help="drive a running server (ws://host:port) instead of starting one")
+    parser.add_argument('--pid', type=int, help="with --url, the server process to sample RSS from")
+    parser.add_argument('--archive-dir', help="directory of <slug>.zip archives (default: a synthetic project)")
+    parser.add_argument('--s3-endpoint', help="serve the synthetic archive from this S3-compatible endpoint")
+    parser.add_argument('--bucket', default='portfolio-bucket', help="bucket for --s3-endpoint")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes for the started server")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    commands = args.commands or list(DEFAULT_COMMANDS)
+    server = None
+    url, pid = args.url, args.pid
+    if url is None:
+        server = LocalServer(
+            args.project,
+            archive_dir=args.archive_dir,
+            s3_endpoint=args.s3_endpoint,
+            bucket=args.bucket,
+            workers=args.workers,
+        ).start()
+        url, pid = server.url, server.process.pid
+    try:
+        report = asyncio.run(run_load(
+            url, args.project, args.sessions, commands,
+            ramp=args.ramp, prompt=args.prompt, timeout=args.timeout, pid=pid,
+        ))
+    finally:
+        if server is not None:
+            server.stop()
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# tests/performance/test_load_benchmark.py
+"""
+End-to-end load benchmark for the terminal WebSocket service.
+
+Starts the service in a subprocess against a synthetic project archive
+and drives it with tests/performance/loadgen.py: SESSIONS concurrent
+visitors each type ls, cat and make keystroke by keystroke. Prints the
+latency percentiles, throughput and server RSS.
+
+Skipped by default. Run with:
+    RUN_BENCHMARKS=1 pytest tests/performance -s --no-cov
+For larger runs use the generator directly:
+    python tests/performance/loadgen.py --sessions 200
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import loadgen
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get('RUN_BENCHMARKS'),
+    reason='benchmarks are opt-in: set RUN_BENCHMARKS=1',
+)
+
+SESSIONS = int(os.environ.get('LOAD_SESSIONS', '50'))
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = loadgen.LocalServer('minishell').start()
+    yield server
+    server.stop()
+
+
+def test_scripted_sessions_complete(server):
+    report = asyncio.run(loadgen.run_load(
+        server.url, 'minishell', SESSIONS, loadgen.DEFAULT_COMMANDS, pid=server.process.pid,
+    ))
+    print()
+    print(loadgen.format_report(report))
+
+    assert report['failed'] == 0, report['errors']
+    assert report['echo_seconds'] is not None
+    assert report['server_rss_peak_bytes'] > 0
@@ -0,0 +1,136 @@
+# tests/performance/test_pty_pump_benchmark.py
+"""
+Benchmark for the PTY → WebSocket output pump.
+
+Measures keystroke echo round-trip latency and process thread count with
+1, 50 and 200 concurrent bash sessions, for both the event-driven pump in
+main.read_terminal_output and the previous executor-polling loop.
+
+Skipped by default. Run with:
+    RUN_BENCHMARKS=1 pytest tests/performance -s --no-cov
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+import pytest
+from pexpect import EOF, spawn
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from main import OutputCoalescer, TerminalSocket, read_terminal_output
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get('RUN_BENCHMARKS'),
+    reason='benchmarks are opt-in: set RUN_BENCHMARKS=1',
+)
+
+SESSION_COUNTS = (1, 50, 200)
+ECHO_ROUNDS = 20
+
+
+class RecordingWebSocket:
+    """Minimal stand-in for a FastAPI WebSocket that timestamps output."""
+
+    def __init__(self):
+        self.buffer = ''
+        self.changed = asyncio.Event()
+
+    async def send_text(self, data):
+        self.buffer += json.loads(data).get('output', '')
+        self.changed.set()
+
+    async def wait_for(self, marker, timeout=5):
+        deadline = time.perf_counter() + timeout
+        while marker not in self.buffer:
+            self.changed.clear()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(marker)
+            await asyncio.wait_for(self.changed.wait(), remaining)
+
+
+async def legacy_read_terminal_output(websocket, child, coalescer=None):
+    """The executor-polling loop that read_terminal_output replaced."""
+    while True:
+        try:
+            output = await asyncio.get_event_loop().run_in_executor(
+                None, lambda: child.read_nonblocking(size=1024, timeout=0.1)
+            )
+            if output:
+                await websocket.send_output(output)
+        except EOF:
+            break
+        except Exception:
+            await asyncio.sleep(0.1)
+
+
+def spawn_bench_shell():
+    env = {'PATH': '/usr/bin:/bin', 'PS1': '$ ', 'TERM': 'dumb'}
+    child = spawn('/bin/bash', ['--norc', '--noprofile'], env=env, encoding='utf-8', timeout=10)
+    child.delaybeforesend = None  # matches terminal_endpoint
+    return child
+
+
+async def run_sessions(pump, count):
+    sessions = []
+    for _ in range(count):
+        ws = RecordingWebSocket()
+        sessions.append((spawn_bench_shell(), ws, OutputCoalescer(TerminalSocket(ws))))
+    tasks = [
+        asyncio.create_task(pump(coalescer.terminal, child, coalescer))
+        for child, _, coalescer in sessions
+    ]
+    try:
+        await asyncio.gather(*(ws.wait_for('$ ') for _, ws, _ in sessions))
+        # Let the pumps settle into their idle state before sampling threads
+        await asyncio.sleep(0.5)
+        threads = threading.active_count()
+
+        latencies = []
+        for i in range(ECHO_ROUNDS):
+            child, ws, coalescer = sessions[i % count]
+            marker = f'k{i}z'
+            start = time.perf_counter()
+            coalescer.note_input()
+            child.write(marker)
+            await ws.wait_for(marker)
+            latencies.append((time.perf_counter() - start) * 1000)
+            child.write('\x15')  # Ctrl-U: discard the typed marker
+        return threads, latencies
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for child, _, _ in sessions:
+            child.close(force=True)
+
+
+def report(label, count, threads, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:<14} sessions={count:<4} threads={threads:<4} "
+        f"echo_p50={statistics.median(latencies):7.2f}ms echo_p95={p95:7.2f}ms"
+    )
+
+
+class TestPtyPumpBenchmark:
+
+    @pytest.mark.parametrize('count', SESSION_COUNTS)
+    def test_event_driven_pump(self, count):
+        threads, latencies = asyncio.run(run_sessions(read_terminal_output, count))
+        report('event-driven', count, threads, latencies)
+        # No per-session threads: the pool stays at its baseline size
+        assert threads < 10
+        assert statistics.median(latencies) < 50
+
+    @pytest.mark.parametrize('count', SESSION_COUNTS)
+    def test_legacy_executor_pump(self, count):
+        threads, latencies = asyncio.run(run_sessions(legacy_read_terminal_output, count))
+        report('executor-poll', count, threads, latencies)
@@ -0,0 +1,86 @@
+# tests/performance/test_redis_stall_benchmark.py
+"""
+Benchmark for event-loop stalls caused by Redis session bookkeeping.
+
+Connects a burst of sessions against a fake Redis with configurable
+latency and measures the longest gap between ticks of a 1 ms heartbeat
+task, first with the previous blocking redis.Redis setex call and then
+with the asyncio SessionRegistry.
+
+Skipped by default. Run with:
+    RUN_BENCHMARKS=1 pytest tests/performance -s --no-cov
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from main import SessionRegistry
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get('RUN_BENCHMARKS'),
+    reason='benchmarks are opt-in: set RUN_BENCHMARKS=1',
+)
+
+SESSIONS = 50
+LATENCIES = (0.001, 0.01, 0.1)
+
+
+class BlockingFakeRedis:
+    """Models the synchronous client: each command blocks the calling thread."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def setex(self, key, ttl, value):
+        time.sleep(self.latency)
+
+
+async def max_stall(workload):
+    """Longest event-loop stall in seconds while workload runs."""
+    worst = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            worst = max(worst, now - last - 0.001)
+            last = now
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await workload()
+    done = True
+    await tick_task
+    return worst
+
+
+class TestRedisStall:
+
+    @pytest.mark.parametrize('latency', LATENCIES)
+    async def test_event_loop_stall(self, latency, fake_redis):
+        blocking = BlockingFakeRedis(latency)
+
+        async def connect_blocking(i):
+            blocking.setex(f"terminal_session:{i}", 3600, '{}')
+
+        fake_redis.latency = latency
+        registry = SessionRegistry(fake_redis)
+
+        async def connect_async(i):
+            await registry.register(str(i), {'project': 'minishell'})
+
+        before = await max_stall(lambda: asyncio.gather(*(connect_blocking(i) for i in range(SESSIONS))))
+        after = await max_stall(lambda: asyncio.gather(*(connect_async(i) for i in range(SESSIONS))))
+
+        print(f"\n[redis latency {latency * 1000:.0f}ms, {SESSIONS} connects] "
+              f"max loop stall: blocking {before * 1000:.1f}ms, async {after * 1000:.1f}ms")
+        assert after < before
@@ -0,0 +1,120 @@
+# tests/performance/test_validator_benchmark.py
+"""
+Microbenchmark for command validation.
+
+Replays every command string from tests/unit/test_command_validator.py
+through the previous validate_command (a fresh pattern list and sequential
+re.match calls per command) and through CommandValidator, with and without
+its verdict cache, and reports validations per second. Also checks that
+the verdicts are identical.
+
+Skipped by default. Run with:
+    RUN_BENCHMARKS=1 pytest tests/performance -s --no-cov
+"""
+
+import ast
+import os
+import re
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from main import CommandValidator
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get('RUN_BENCHMARKS'),
+    reason='benchmarks are opt-in: set RUN_BENCHMARKS=1',
+)
+
+ROUNDS = 200
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), '..', 'unit', 'test_command_validator.py')
+
+
+def load_corpus():
+    """String literals passed to validate_command() in the unit tests."""
+    with open(CORPUS_FILE) as f:
+        tree = ast.parse(f.read())
+    return [
+        node.args[0].value
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Call)
+        and getattr(node.func, 'id', None) == 'validate_command'
+        and node.args and isinstance(node.args[0], ast.Constant)
+    ]
+
+
+def legacy_validate_command(command):
+    """The per-call pattern loop that CommandValidator replaced, minus logging."""
+    command = command.strip()
+    if not command:
+        return True
+    allowed_patterns = [
+        r'^ls(\s+-[altrh]+)*(\s+[\w\./-]+)*$',
+        r'^cat(\s+[\w\./-]+)+$',
+        r'^cd(\s+[\w\./-]+)?$',
+        r'^pwd$',
+        r'^echo\s+.*$',
+        r'^clear$',
+        r'^make(\s+[\w-]+)?$',
+        r'^gcc(\s+-[a-zA-Z]+)*(\s+[\w\./-]+)+$',
+        r'^./[\w-]+$',
+        r'^touch\s+[\w\./-]+$',
+        r'^mkdir(\s+-p)?\s+[\w\./-]+$',
+        r'^help$',
+        r'^man\s+[\w-]+$',
+        r'^download\s+[\w\./-]+$',
+    ]
+    for pattern in allowed_patterns:
+        if re.match(pattern, command):
+            return True
+    blocked_sequences = [
+        'docker', 'kubectl', 'sudo', 'su ', 'ssh',
+        '--privileged', '--cap-add', 'nsenter',
+        'unshare', 'mount', 'umount', 'chroot',
+        'pivot_root', 'cgroup', 'setns', 'ptrace',
+        'ld.so', 'proc', '/dev/'
+    ]
+    if any(seq in command for seq in blocked_sequences):
+        return False
+    if any('../' in part for part in command.split()):
+        return False
+    command_operators = [';', '&&', '||', '`', '$(', '|', '>', '<']
+    if any(op in command for op in command_operators):
+        return False
+    dangerous_commands = [
+        'rm -rf', 'chmod 777', ':(){', 'curl | bash',
+        'wget | bash', '> /dev', '> /proc', '> /sys'
+    ]
+    if any(cmd in command for cmd in dangerous_commands):
+        return False
+    return False
+
+
+def rate(validate, corpus):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for command in corpus:
+            validate(command)
+    return ROUNDS * len(corpus) / (time.perf_counter() - started)
+
+
+class TestValidatorThroughput:
+
+    def test_validations_per_second(self):
+        corpus = load_corpus()
+        assert len(corpus) > 50
+
+        uncached = CommandValidator(cache_size=0)
+        cached = CommandValidator()
+        assert [legacy_validate_command(c) for c in corpus] == [uncached.check(c)[0] for c in corpus]
+
+        legacy = rate(legacy_validate_command, corpus)
+        compiled = rate(uncached.check, corpus)
+        with_cache = rate(cached.check, corpus)
+
+        print(f"\n[{len(corpus)} commands x {ROUNDS}] validations/s: "
+              f"legacy {legacy:,.0f}, compiled {compiled:,.0f}, compiled+cache {with_cache:,.0f}")
+        assert with_cache > legacy
@@ -0,0 +1,171 @@
+# tests/unit/test_admission.py
+"""Unit tests for per-session resource accounting and admission control."""
+
+import os
+import subprocess
+import sys
+import time
+import types
+import unittest.mock as m
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import AdmissionController, process_tree_usage
+
+
+class FakeSession:
+
+    def __init__(self, session_id, idle, attached=False, pid=None):
+        self.session_id = session_id
+        self.last_input = time.monotonic() - idle
+        self.terminal = object() if attached else None
+        self.child = m.Mock(pid=pid or os.getpid())
+        self.closed = False
+        self.close_reason = None
+        self.resources = {}
+
+    async def close(self, reason=None):
+        self.closed = True
+        self.close_reason = reason
+
+
+def controller(**overrides):
+    settings = dict(memory_high=85, cpu_high=90, wait_seconds=0.05, evict_min_idle=60,
+                    max_session_rss=0, interval=0.01)
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+def memory(percent):
+    return m.patch('main.psutil.virtual_memory', return_value=m.Mock(percent=percent))
+
+
+@pytest.fixture
+def sessions():
+    with m.patch.dict(main.terminal_sessions, clear=True):
+        yield main.terminal_sessions
+
+
+# Other modules replace psutil with a MagicMock when it is imported first
+real_psutil = pytest.mark.skipif(
+    not isinstance(main.psutil, types.ModuleType), reason="psutil is mocked in this run"
+)
+
+
+@real_psutil
+class TestProcessTreeUsage:
+
+    def test_counts_children(self):
+        child = subprocess.Popen(['sleep', '5'])
+        try:
+            usage = process_tree_usage(os.getpid())
+        finally:
+            child.kill()
+            child.wait()
+        assert usage['processes'] >= 2
+        assert usage['rss_bytes'] > 0
+        assert usage['fds'] > 0
+
+    def test_missing_process_reports_zero(self):
+        usage = process_tree_usage(2 ** 22 + 12345)
+        assert usage == {'cpu_seconds': 0.0, 'rss_bytes': 0, 'fds': 0, 'processes': 0}
+
+
+class TestEvictionOrder:
+
+    def test_detached_then_most_idle_first(self, sessions):
+        sessions['a'] = FakeSession('a', idle=300, attached=True)
+        sessions['b'] = FakeSession('b', idle=100)
+        sessions['c'] = FakeSession('c', idle=200)
+        sessions['d'] = FakeSession('d', idle=10)  # too recently active
+        order = [s.session_id for s in controller().eviction_candidates()]
+        assert order == ['c', 'b', 'a']
+
+
+class TestAdmit:
+
+    async def test_admits_below_watermarks(self, sessions):
+        admission = controller()
+        with memory(50):
+            assert await admission.admit()
+        assert admission.counts['admitted'] == 1
+
+    async def test_evicts_idle_session_to_make_room(self, sessions):
+        sessions['idle'] = FakeSession('idle', idle=600)
+        admission = controller()
+        readings = iter([95, 40])
+        with m.patch('main.psutil.virtual_memory', side_effect=lambda: m.Mock(percent=next(readings))), \
+             m.patch('main.psutil.cpu_percent', return_value=5.0), \
+             m.patch('main.asyncio.sleep', new=m.AsyncMock()):
+            assert await admission.admit()
+        assert sessions['idle'].closed
+        assert admission.counts['evicted'] == 1
+
+    async def test_measures_cpu_again_after_each_eviction(self, sessions):
+        for i in range(6):
+            sessions[str(i)] = FakeSession(str(i), idle=600 + i)
+        admission = controller()
+        admission.cpu_percent = 95
+        with memory(10), \
+             m.patch('main.psutil.cpu_percent', return_value=30.0), \
+             m.patch('main.asyncio.sleep', new=m.AsyncMock()):
+            assert await admission.admit()
+        assert admission.counts['evicted'] == 1
+        assert sum(s.closed for s in sessions.values()) == 1
+
+    async def test_queues_then_refuses_when_nothing_to_evict(self, sessions):
+        admission = controller(wait_seconds=0.03)
+        on_wait = m.AsyncMock()
+        with memory(99):
+            assert not await admission.admit(on_wait=on_wait)
+        on_wait.assert_awaited_once()
+        assert admission.counts['queued'] == 1
+        assert admission.counts['refused'] == 1
+
+    async def test_cpu_watermark(self, sessions):
+        admission = controller(wait_seconds=0)
+        admission.cpu_percent = 95
+        with memory(10):
+            assert not await admission.admit()
+
+
+class TestSample:
+
+    async def test_records_usage_and_kills_sessions_over_rss_limit(self, sessions):
+        sessions['hog'] = FakeSession('hog', idle=0)
+        admission = controller(max_session_rss=1024)
+        usage = {'cpu_seconds': 1.0, 'rss_bytes': 4096, 'fds': 3, 'processes': 2}
+        with memory(10), \
+             m.patch('main.psutil.cpu_percent', return_value=5.0), \
+             m.patch('main.process_tree_usage', return_value=usage):
+            await admission.sample()
+        assert sessions['hog'].resources == usage
+        assert sessions['hog'].closed
+        assert 'memory' in sessions['hog'].close_reason
+        assert admission.counts['killed_over_limit'] == 1
+
+    async def test_sessions_under_limit_are_kept(self, sessions):
+        sessions['small'] = FakeSession('small', idle=0)
+        admission = controller(max_session_rss=1024)
+        usage = {'cpu_seconds': 0.1, 'rss_bytes': 512, 'fds': 3, 'processes': 1}
+        with memory(10), \
+             m.patch('main.psutil.cpu_percent', return_value=5.0), \
+             m.patch('main.process_tree_usage', return_value=usage):
+            await admission.sample()
+        assert not sessions['small'].closed
+        assert admission.cpu_percent == 5.0
+
+    async def test_evicts_at_most_one_session_per_sample(self, sessions):
+        for i in range(6):
+            sessions[str(i)] = FakeSession(str(i), idle=600 + i)
+        admission = controller()
+        usage = {'cpu_seconds': 0.1, 'rss_bytes': 512, 'fds': 3, 'processes': 1}
+        with memory(10), \
+             m.patch('main.psutil.cpu_percent', return_value=95.0), \
+             m.patch('main.process_tree_usage', return_value=usage):
+            await admission.sample()
+        assert admission.counts['evicted'] == 1
+        assert sessions['5'].closed
@@ -0,0 +1,229 @@
+# tests/unit/test_archive_streaming.py
+"""Unit tests for streaming project archives out of object storage."""
+
+import io
+import os
+import re
+import sys
+import types
+import unittest.mock as m
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import RangedObjectReader, extract_project_archive
+
+
+def make_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+
+class FakeS3:
+    """Serves ranged GetObject requests from an in-memory object."""
+
+    def __init__(self, data):
+        self.data = data
+        self.requests = []
+
+    def get_object(self, Bucket, Key, Range, IfMatch=None):
+        self.requests.append((Range, IfMatch))
+        start, end = re.match(r'bytes=(\d+)-(\d*)', Range).groups()
+        end = int(end) + 1 if end else len(self.data)
+        return {'Body': io.BytesIO(self.data[int(start):end])}
+
+
+class TestRangedObjectReader:
+
+    def test_reads_like_a_file(self):
+        data = bytes(range(256)) * 4
+        reader = RangedObjectReader(FakeS3(data), 'bucket', 'key', len(data))
+        assert reader.read(10) == data[:10]
+        reader.seek(-4, io.SEEK_END)
+        assert reader.read() == data[-4:]
+        reader.seek(100)
+        assert reader.read(3) == data[100:103]
+
+    def test_sequential_reads_share_one_request(self):
+        data = b'x' * 10000
+        s3 = FakeS3(data)
+        reader = RangedObjectReader(s3, 'bucket', 'key', len(data))
+        while reader.read(1000):
+            pass
+        assert len(s3.requests) == 1
+
+    def test_pins_requests_to_etag(self):
+        s3 = FakeS3(b'data')
+        reader = RangedObjectReader(s3, 'bucket', 'key', 4, etag='"abc"')
+        reader.read()
+        assert s3.requests == [('bytes=0-', '"abc"')]
+
+    def test_tail_is_served_from_one_request(self):
+        data = bytes(range(256)) * 4
+        s3 = FakeS3(data)
+        reader = RangedObjectReader(s3, 'bucket', 'key', len(data))
+        reader.seek(-22, io.SEEK_END)
+        assert reader.read(22) == data[-22:]
+        reader.seek(-500, io.SEEK_END)
+        assert reader.read(100) == data[-500:-400]
+        assert len(s3.requests) == 1
+
+    def test_zip_streams_in_two_requests(self, tmp_path):
+        files = {f'src/file{i}.c': os.urandom(20000).hex() for i in range(100)}
+        data = make_zip(files)
+        assert len(data) > main.ARCHIVE_TAIL_SIZE
+        s3 = FakeS3(data)
+        reader = RangedObjectReader(s3, 'bucket', 'key', len(data))
+        with io.BufferedReader(reader, buffer_size=main.STREAM_BUFFER_SIZE) as archive:
+            assert extract_project_archive(archive, str(tmp_path), lambda e: None) == 100
+
+        assert (tmp_path / 'src' / 'file7.c').read_text() == files['src/file7.c']
+        assert len(s3.requests) == 2
+
+    def test_parallel_parts_read_like_a_file(self):
+        data = os.urandom(main.ARCHIVE_TAIL_SIZE + 10000)
+        s3 = FakeS3(data)
+        reader = RangedObjectReader(s3, 'bucket', 'key', len(data), part_size=1000, concurrency=4)
+        with io.BufferedReader(reader, buffer_size=64) as archive:
+            assert archive.read(2500) == data[:2500]
+            archive.seek(7200)
+            assert archive.read(1500) == data[7200:8700]
+            archive.seek(100)
+            assert archive.read(10) == data[100:110]
+            archive.seek(9990)
+            # Parts stop where the tail starts; the rest comes from the tail
+            assert archive.read(20) == data[9990:10010]
+        ranges = [r for r, _ in s3.requests]
+        assert 'bytes=9000-9999' in ranges
+        assert all(r.endswith('-') or int(r.split('-')[1]) < 10000 for r in ranges)
+
+    def test_parallel_parts_stay_within_the_window(self):
+        data = os.urandom(main.ARCHIVE_TAIL_SIZE + 100000)
+        s3 = FakeS3(data)
+        reader = RangedObjectReader(s3, 'bucket', 'key', len(data), part_size=1000, concurrency=3)
+        try:
+            chunks = []
+            while reader.tell() < 100000:
+                chunks.append(reader.read(700))
+                assert len(reader._parts) <= 3
+            assert b''.join(chunks)[:100000] == data[:100000]
+        finally:
+            reader.close()
+        # Every part is fetched exactly once on a sequential pass
+        assert reader.requests == 100
+
+    def test_zip_streams_over_parallel_parts(self, tmp_path):
+        files = {f'src/file{i}.c': os.urandom(20000).hex() for i in range(100)}
+        data = make_zip(files)
+        s3 = FakeS3(data)
+        reader = RangedObjectReader(s3, 'bucket', 'key', len(data), '"v1"', part_size=256 * 1024, concurrency=4)
+        with io.BufferedReader(reader, buffer_size=main.STREAM_BUFFER_SIZE) as archive:
+            assert extract_project_archive(archive, str(tmp_path), lambda e: None) == 100
+
+        assert (tmp_path / 'src' / 'file42.c').read_text() == files['src/file42.c']
+        assert all(if_match == '"v1"' for _, if_match in s3.requests)
+
+
+class TestTransferPlan:
+
+    def plan(self, size, cpus=4, available=8 << 30):
+        with m.patch('main.os.cpu_count', return_value=cpus), \
+             m.patch('main.psutil.virtual_memory', return_value=m.Mock(available=available)):
+            return main.transfer_plan(size)
+
+    def test_small_objects_are_one_part(self):
+        assert self.plan(300 * 1024) == (main.S3_MIN_PART_SIZE, 1)
+
+    def test_parts_split_the_object_across_cores(self):
+        part_size, concurrency = self.plan(32 * 1024 * 1024, cpus=4)
+        assert concurrency == 8
+        assert part_size == 4 * 1024 * 1024
+
+    def test_part_size_is_capped_for_large_objects(self):
+        part_size, concurrency = self.plan(1 << 30, cpus=1)
+        assert part_size == main.S3_MAX_PART_SIZE
+        assert concurrency == 2
+
+    def test_low_memory_limits_concurrency(self):
+        part_size, concurrency = self.plan(64 * 1024 * 1024, cpus=8, available=100 * 1024 * 1024)
+        # 5% of 100 MiB holds a single 8 MiB part
+        assert (part_size, concurrency) == (8 * 1024 * 1024, 1)
+
+
+class TestS3Client:
+
+    def test_client_is_built_once(self):
+        with m.patch('main._s3_client', None), \
+             m.patch('main.make_s3_client', side_effect=lambda: object()) as make:
+            first = main.get_s3_client()
+            assert main.get_s3_client() is first
+        make.assert_called_once()
+
+    # Other modules replace boto3 with a MagicMock when it is imported first
+    @pytest.mark.skipif(not isinstance(main.boto3, types.ModuleType), reason="boto3 is mocked in this run")
+    def test_client_pools_connections(self):
+        client = main.make_s3_client()
+        assert client.meta.config.max_pool_connections == main.S3_MAX_POOL_CONNECTIONS
+        assert client.meta.config.tcp_keepalive
+
+
+class TestExtractProjectArchive:
+
+    def test_skips_blocked_and_suspicious_entries(self, tmp_path):
+        archive = io.BytesIO(make_zip({
+            'main.c': 'int main;',
+            'tool.exe': 'MZ',
+            '../escape.c': 'x',
+            'docs/': '',
+        }))
+        assert extract_project_archive(archive, str(tmp_path), lambda e: None) == 1
+        assert os.listdir(tmp_path) == ['main.c']
+        assert not (tmp_path.parent / 'escape.c').exists()
+
+    def test_reports_bytes_files_and_eta(self, tmp_path):
+        archive = io.BytesIO(make_zip({f'f{i}.c': 'code' * 100 for i in range(5)}))
+        events = []
+        extract_project_archive(archive, str(tmp_path), events.append)
+
+        assert events[0]['stage'] == 'extract'
+        final = events[-1]
+        assert final['files'] == final['total_files'] == 5
+        assert final['bytes'] == final['total_bytes'] > 0
+        assert final['eta'] == 0
+
+    def test_refuses_when_disk_is_too_small(self, tmp_path):
+        archive = io.BytesIO(make_zip({'big.c': 'x' * 1000}))
+        with m.patch('main.shutil.disk_usage', return_value=m.Mock(free=10)):
+            assert extract_project_archive(archive, str(tmp_path), lambda e: None) == 0
+        assert os.listdir(tmp_path) == []
+
+
+class TestDownloadProjectFiles:
+
+    def test_streams_from_s3_without_temp_file(self, tmp_path):
+        data = make_zip({'src/main.c': 'int main;'})
+        s3 = FakeS3(data)
+        s3.head_object = m.Mock(return_value={'ContentLength': len(data)})
+        with m.patch('main.is_dev_mode', return_value=False), \
+             m.patch('main.get_s3_client', return_value=s3), \
+             m.patch('main.psutil.virtual_memory', return_value=m.Mock(available=8 << 30)):
+            assert main.download_project_files('minishell', str(tmp_path), etag='"v1"')
+
+        assert (tmp_path / 'src' / 'main.c').read_text() == 'int main;'
+        assert all(if_match == '"v1"' for _, if_match in s3.requests)
+
+    def test_local_archive_goes_through_validation(self, tmp_path):
+        zip_path = tmp_path / 'minishell.zip'
+        zip_path.write_bytes(make_zip({'main.c': 'x', 'lib.so': 'y'}))
+        target = tmp_path / 'out'
+        target.mkdir()
+        with m.patch('main.is_dev_mode', return_value=True), \
+             m.patch('main.local_project_zip', return_value=str(zip_path)):
+            assert main.download_project_files('minishell', str(target))
+        assert os.listdir(target) == ['main.c']
@@ -271,3 +271,34 @@ class TestSecurityObservations:
         """
         assert validate_command('cat /dev/sda') is True
         assert validate_command('cat ../../etc/passwd') is True
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# CommandValidator rule ids and verdict cache
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestCommandValidatorRules:
+
+    def test_allow_rule_is_first_matching_pattern(self):
+        from main import CommandValidator
+        validator = CommandValidator()
+        assert validator.check('ls -la') == (True, 'ls')
+        assert validator.check('gcc -Wall main.c') == (True, 'gcc')
+        assert validator.check('./minishell') == (True, 'run')
+        assert validator.check('  ') == (True, 'empty')
+
+    def test_deny_rules_in_priority_order(self):
+        from main import CommandValidator
+        validator = CommandValidator()
+        # 'sudo' (container escape) outranks the ';' operator
+        assert validator.check('whoami; sudo id') == (False, 'container_escape')
+        assert validator.check('vim ../secret') == (False, 'path_traversal')
+        assert validator.check('whoami && id') == (False, 'operator')
+        assert validator.check('python3') == (False, 'default_deny')
+
+    def test_repeated_commands_hit_the_cache(self):
+        from main import CommandValidator
+        validator = CommandValidator(cache_size=16)
+        for _ in range(3):
+            validator.check('make re')
+        assert validator.stats() == {'cache_hits': 2, 'cache_misses': 1, 'cache_size': 1}
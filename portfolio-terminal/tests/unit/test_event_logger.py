@@ -0,0 +1,129 @@
+# tests/unit/test_event_logger.py
+"""Unit tests for the sampled, rate-limited event logger."""
+
+import json
+import logging
+import os
+import sys
+import unittest.mock as m
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from main import EventLogger, StructuredFormatter, parse_sample_rates
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def records():
+    handler = ListHandler()
+    target = logging.getLogger('test_event_logger')
+    target.addHandler(handler)
+    target.setLevel(logging.INFO)
+    target.propagate = False
+    yield handler.records
+    target.removeHandler(handler)
+
+
+def event_logger(**kwargs):
+    return EventLogger(logging.getLogger('test_event_logger'), **kwargs)
+
+
+class TestEventLogger:
+
+    def test_writes_event_with_fields(self, records):
+        event_logger().info('shell_ready', source='warm', session='s1')
+        [record] = records
+        assert record.event == 'shell_ready'
+        assert record.fields == {'source': 'warm', 'session': 's1'}
+
+    def test_counter_only_events_are_counted_not_written(self, records):
+        log = event_logger(sample_rates={'pty_output': 0})
+        for _ in range(1000):
+            log.debug('pty_output', bytes=10)
+            log.info('pty_output', bytes=10)
+        assert records == []
+        assert log.counts['pty_output'] == 2000
+
+    def test_events_below_level_are_counted_not_written(self, records):
+        log = event_logger()
+        log.debug('shell_resize')
+        assert records == []
+        assert log.counts['shell_resize'] == 1
+
+    def test_sampling_keeps_a_fraction(self, records):
+        log = event_logger(sample_rates={'command_allowed': 0.5})
+        with m.patch('main.random.random', side_effect=[0.1, 0.9, 0.4, 0.6]):
+            for _ in range(4):
+                log.info('command_allowed')
+        assert len(records) == 2
+        assert records[0].fields['sample_rate'] == 0.5
+
+    def test_rate_limit_reports_suppressed_lines(self, records):
+        log = event_logger(rate_limit=2)
+        with m.patch('main.time.monotonic', return_value=100.0):
+            for _ in range(5):
+                log.warning('archive_entry_skipped')
+        assert len(records) == 2
+        assert log.suppressed['archive_entry_skipped'] == 3
+
+        with m.patch('main.time.monotonic', return_value=101.0):
+            log.warning('archive_entry_skipped')
+        assert records[-1].fields['suppressed'] == 3
+
+    def test_rate_limit_is_per_event(self, records):
+        log = event_logger(rate_limit=1)
+        with m.patch('main.time.monotonic', return_value=100.0):
+            log.info('a')
+            log.info('a')
+            log.info('b')
+        assert [r.event for r in records] == ['a', 'b']
+
+
+class TestStructuredFormatter:
+
+    def make_record(self):
+        record = logging.LogRecord('main', logging.INFO, __file__, 1, "Shell ready", None, None)
+        record.event = 'shell_ready'
+        record.fields = {'session': 's1', 'source': 'cold'}
+        return record
+
+    def test_text_lines_are_key_value(self):
+        line = StructuredFormatter().format(self.make_record())
+        assert line.endswith('INFO shell_ready Shell ready session=s1 source=cold')
+
+    def test_json_lines(self):
+        payload = json.loads(StructuredFormatter(json_output=True).format(self.make_record()))
+        assert payload['event'] == 'shell_ready'
+        assert payload['level'] == 'INFO'
+        assert payload['session'] == 's1'
+
+    def test_events_without_message(self):
+        record = self.make_record()
+        record.msg = ''
+        line = StructuredFormatter().format(record)
+        assert line.endswith('INFO shell_ready session=s1 source=cold')
+        assert 'message' not in json.loads(StructuredFormatter(json_output=True).format(record))
+
+    def test_plain_records_have_no_event(self):
+        record = logging.LogRecord('main', logging.WARNING, __file__, 1, "Worker %s down", ('1',), None)
+        assert StructuredFormatter().format(record).endswith('WARNING - Worker 1 down')
+
+
+class TestParseSampleRates:
+
+    def test_parses_pairs(self):
+        assert parse_sample_rates('pty_output=0, command_allowed=0.1,,bad') == {
+            'pty_output': 0.0,
+            'command_allowed': 0.1,
+        }
@@ -0,0 +1,229 @@
+# tests/unit/test_flow_control.py
+"""Unit tests for credit-based flow control between the PTY and the client."""
+
+import asyncio
+import os
+import sys
+import unittest.mock as m
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import FlowControl, TerminalSession
+from tests.unit.test_terminal_session import RecordingTerminal
+
+
+class TestFlowControl:
+
+    def test_clients_that_never_ack_are_not_throttled(self):
+        flow = FlowControl(high_water=100, low_water=10)
+        flow.on_sent(10_000)
+        assert not flow.paused
+
+    def test_pauses_at_high_water_and_resumes_at_low_water(self):
+        flow = FlowControl(high_water=100, low_water=10)
+        flow.on_ack(0)
+        flow.on_sent(99)
+        assert not flow.paused
+        flow.on_sent(100)
+        assert flow.paused
+        flow.on_ack(50)
+        assert flow.paused
+        flow.on_ack(90)
+        assert not flow.paused
+
+    def test_acks_are_clamped_and_monotonic(self):
+        flow = FlowControl(high_water=100, low_water=10)
+        flow.on_sent(50)
+        flow.on_ack(80)
+        assert flow.acked == 50
+        flow.on_ack(20)
+        assert flow.acked == 50
+
+    def test_reset_on_attach_waits_for_the_new_client_to_opt_in(self):
+        flow = FlowControl(high_water=100, low_water=10)
+        flow.on_ack(0)
+        flow.on_sent(200)
+        assert flow.paused
+        flow.reset(200)
+        assert not flow.paused
+        flow.on_sent(500)
+        assert not flow.paused
+
+    def test_release_unblocks_a_paused_reader(self):
+        flow = FlowControl(high_water=100, low_water=10)
+        flow.on_ack(0)
+        flow.on_sent(100)
+        flow.release()
+        assert not flow.paused
+        flow.on_sent(1000)
+        assert not flow.paused
+
+    def test_ack_after_a_full_window_pauses(self):
+        flow = FlowControl(high_water=100, low_water=10)
+        flow.on_sent(500)
+        flow.on_ack(300)
+        assert flow.paused
+
+    def test_blocks_counts_output_not_sent_yet(self):
+        flow = FlowControl(high_water=100, low_water=10)
+        assert not flow.blocks(1000)
+        flow.on_ack(0)
+        flow.on_sent(60)
+        assert not flow.blocks(39)
+        assert flow.blocks(40)
+
+    def test_advertises_ack_interval_below_low_water(self):
+        assert FlowControl(high_water=1000, low_water=200).describe() == {'window': 1000, 'ack_bytes': 100}
+
+
+@pytest.fixture
+def registry(fake_redis):
+    with m.patch('main.session_registry', new=main.SessionRegistry(fake_redis)), \
+         m.patch.dict(main.terminal_sessions), m.patch.dict(main.active_terminals):
+        yield
+
+
+def count_reads(child):
+    """Make child tally the bytes pulled from its PTY in child.bytes_read"""
+    read = child.read_nonblocking
+    child.bytes_read = 0
+
+    def counting(*args, **kwargs):
+        chunk = read(*args, **kwargs)
+        child.bytes_read += len(chunk)
+        return chunk
+    child.read_nonblocking = counting
+
+
+class SlowTerminal(RecordingTerminal):
+
+    async def send_output(self, text):
+        await asyncio.sleep(0.05)
+        return await super().send_output(text)
+
+
+async def wait_until(predicate, timeout=5):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+# Other modules replace pexpect with a MagicMock when it is imported first
+@pytest.mark.skipif(not isinstance(main.spawn, type), reason="pexpect is mocked in this run")
+class TestPtyBackpressure:
+
+    async def test_reader_stops_draining_the_pty_until_acked(self, registry):
+        child = main.spawn('/bin/sh', ['-c', 'head -c 2000000 /dev/zero | tr "\\0" x; echo DONE'], encoding='utf-8')
+        session = TerminalSession('s1', 'minishell', child, None)
+        session.flow = FlowControl(high_water=64 * 1024, low_water=16 * 1024)
+        # Measure backpressure alone, without output being summarized away
+        session.budget = main.OutputBudget(rate=0, burst=0, per_command=0)
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        session.flow.on_ack(session.scrollback.total)
+        count_reads(child)
+        session.start()
+        try:
+            await wait_until(lambda: session.flow.paused)
+            sent = len(terminal.output)
+            await asyncio.sleep(0.2)
+            # Nothing more is read while paused; the writer is blocked on the full PTY
+            assert len(terminal.output) == sent
+            assert sent < 64 * 1024 + main.COALESCE_MAX_BYTES + main.PTY_READ_SIZE
+            assert child.bytes_read < 64 * 1024 + main.PTY_READ_SIZE
+            assert child.isalive()
+
+            # Acking everything, repeatedly, lets the rest through
+            async def consume():
+                while 'DONE' not in terminal.output:
+                    session.flow.on_ack(session.scrollback.total)
+                    await asyncio.sleep(0.005)
+            await asyncio.wait_for(consume(), 10)
+            assert terminal.output.count('x') == 2_000_000
+        finally:
+            await session.close()
+
+    async def test_unacked_reads_stop_at_high_water(self, registry):
+        child = main.spawn('/bin/sh', ['-c', 'head -c 2000000 /dev/zero | tr "\\0" x'], encoding='utf-8')
+        session = TerminalSession('s1', 'minishell', child, None)
+        session.flow = FlowControl(high_water=32 * 1024, low_water=8 * 1024)
+        session.budget = main.OutputBudget(rate=0, burst=0, per_command=0)
+        await session.attach(RecordingTerminal())
+        session.flow.on_ack(session.scrollback.total)
+        count_reads(child)
+        session.start()
+        try:
+            await asyncio.sleep(0.5)
+            # The check happens before each read, not after each send
+            assert 32 * 1024 <= child.bytes_read < 32 * 1024 + main.PTY_READ_SIZE
+        finally:
+            await session.close()
+
+    async def test_slow_client_bounds_what_is_read(self, registry):
+        child = main.spawn('/bin/sh', ['-c', 'head -c 20000000 /dev/zero | tr "\\0" x'], encoding='utf-8')
+        session = TerminalSession('s1', 'minishell', child, None)
+        session.budget = main.OutputBudget(rate=0, burst=0, per_command=0)
+        terminal = SlowTerminal()
+        await session.attach(terminal)
+        count_reads(child)
+        session.start()
+        try:
+            await asyncio.sleep(1)
+            backlog = child.bytes_read - len(terminal.output)
+            assert backlog < main.PTY_BACKLOG_BYTES + main.COALESCE_MAX_BYTES + main.PTY_READ_SIZE
+        finally:
+            # Closing mid-send is not swallowed by the reader
+            await asyncio.wait_for(session.close(), 5)
+
+
+
+class TestAckFrames:
+
+    async def test_ack_frames_reach_the_session(self, registry):
+        session = TerminalSession('s1', 'minishell', m.Mock(), None)
+        session.flow.on_sent(500)
+        terminal = m.Mock()
+        terminal.receive = m.AsyncMock(side_effect=[
+            ('control', {'ack': 300}),
+            ('control', ['not', 'a', 'dict']),
+            main.WebSocketDisconnect(1000),
+        ])
+        terminal.send_output = m.AsyncMock()
+        with pytest.raises(main.WebSocketDisconnect):
+            await main.handle_client_messages(terminal, session)
+        assert session.flow.acked == 300
+        assert session.flow.enabled
+        terminal.send_output.assert_not_called()
+
+
+class TestServerNotices:
+    """Notices the server writes itself count like shell output."""
+
+    async def test_warnings_and_close_reasons_advance_the_offsets(self, registry):
+        session = TerminalSession('s1', 'minishell', m.Mock(), None)
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        session.flow.on_ack(session.scrollback.total)
+        await session.warn('idle', 30, 'Closing soon')
+        await session.close('Closed for inactivity')
+        # What the client saw is exactly what the offsets cover
+        assert session.scrollback.since(0) == terminal.output
+        assert session.flow.sent == len(terminal.output.encode('utf-8'))
+        assert terminal.controls[-1] == {'warning': {'limit': 'idle', 'seconds': 30}}
+        assert terminal.closed_with == 4001
+
+    async def test_blocked_command_notice_is_in_the_scrollback(self, registry):
+        session = TerminalSession('s1', 'minishell', m.Mock(), None)
+        terminal = RecordingTerminal()
+        terminal.receive = m.AsyncMock(side_effect=[('input', 'sudo ls\r'), main.WebSocketDisconnect(1000)])
+        await session.attach(terminal)
+        with pytest.raises(main.WebSocketDisconnect):
+            await main.handle_client_messages(terminal, session)
+        assert 'Command blocked' in session.scrollback.since(0)
+        assert session.flow.sent == session.scrollback.total
+        session.child.write.assert_not_called()
@@ -0,0 +1,129 @@
+# tests/unit/test_frame_protocol.py
+"""Unit tests for the binary terminal framing and the JSON fallback parser."""
+
+import json
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from main import (
+    BINARY_SUBPROTOCOL,
+    OP_CONTROL,
+    OP_INPUT,
+    OP_OUTPUT,
+    OP_RESIZE,
+    TerminalSocket,
+    decode_frame,
+    encode_frame,
+    parse_json_message,
+)
+
+
+class FakeWebSocket:
+
+    def __init__(self, subprotocols=(), incoming=()):
+        self.scope = {'subprotocols': list(subprotocols)}
+        self.incoming = list(incoming)
+        self.accepted_subprotocol = 'unset'
+        self.sent = []
+
+    async def accept(self, subprotocol=None):
+        self.accepted_subprotocol = subprotocol
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+    async def send_text(self, data):
+        self.sent.append(data)
+
+    async def receive(self):
+        return self.incoming.pop(0)
+
+
+class TestBinaryFrames:
+
+    def test_encode_output(self):
+        assert encode_frame(OP_OUTPUT, 'héllo') == b'\x01' + 'héllo'.encode('utf-8')
+
+    def test_decode_input(self):
+        assert decode_frame(encode_frame(OP_INPUT, 'ls\r')) == ('input', 'ls\r')
+
+    def test_decode_resize(self):
+        frame = encode_frame(OP_RESIZE, struct.pack('!HH', 40, 120))
+        assert decode_frame(frame) == ('resize', (40, 120))
+
+    def test_decode_control(self):
+        frame = encode_frame(OP_CONTROL, json.dumps({'ping': 1}))
+        assert decode_frame(frame) == ('control', {'ping': 1})
+
+    def test_empty_frame_raises(self):
+        with pytest.raises(ValueError):
+            decode_frame(b'')
+
+    def test_unknown_opcode_raises(self):
+        with pytest.raises(ValueError):
+            decode_frame(b'\x7fxyz')
+
+    def test_short_resize_raises(self):
+        with pytest.raises(ValueError):
+            decode_frame(b'\x02\x00')
+
+
+class TestJsonFallback:
+
+    def test_input_message(self):
+        assert parse_json_message('{"input": "ls\\r"}') == ('input', 'ls\r')
+
+    def test_resize_message(self):
+        assert parse_json_message('{"resize": {"rows": 30, "cols": 100}}') == ('resize', (30, 100))
+
+    def test_resize_defaults(self):
+        assert parse_json_message('{"resize": {}}') == ('resize', (24, 80))
+
+    def test_raw_text_is_input(self):
+        assert parse_json_message('ls -la') == ('input', 'ls -la')
+
+    def test_non_object_json_is_raw_input(self):
+        assert parse_json_message('5') == ('input', '5')
+
+    def test_other_objects_are_control(self):
+        assert parse_json_message('{"mfa_code": "123"}') == ('control', {'mfa_code': '123'})
+
+
+class TestTerminalSocket:
+
+    async def test_negotiates_binary_when_offered(self):
+        ws = FakeWebSocket(subprotocols=[BINARY_SUBPROTOCOL])
+        terminal = await TerminalSocket.accept(ws)
+        assert terminal.binary is True
+        assert ws.accepted_subprotocol == BINARY_SUBPROTOCOL
+
+    async def test_falls_back_to_json(self):
+        ws = FakeWebSocket()
+        terminal = await TerminalSocket.accept(ws)
+        assert terminal.binary is False
+        assert ws.accepted_subprotocol is None
+
+    async def test_binary_output_frame(self):
+        ws = FakeWebSocket()
+        size = await TerminalSocket(ws, binary=True).send_output('ok')
+        assert ws.sent == [b'\x01ok']
+        assert size == 3
+
+    async def test_json_output_frame(self):
+        ws = FakeWebSocket()
+        await TerminalSocket(ws).send_output('ok')
+        assert json.loads(ws.sent[0]) == {'output': 'ok'}
+
+    async def test_receive_binary_and_text(self):
+        ws = FakeWebSocket(incoming=[
+            {'type': 'websocket.receive', 'bytes': b'\x00pwd'},
+            {'type': 'websocket.receive', 'text': '{"input": "ls"}'},
+        ])
+        terminal = TerminalSocket(ws, binary=True)
+        assert await terminal.receive() == ('input', 'pwd')
+        assert await terminal.receive() == ('input', 'ls')
@@ -0,0 +1,148 @@
+# tests/unit/test_output_budget.py
+"""Unit tests for the per-session output budget."""
+
+import asyncio
+import os
+import sys
+import unittest.mock as m
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import OutputBudget, TerminalSession
+from tests.unit.test_terminal_session import FakeChild, RecordingTerminal
+
+
+@pytest.fixture
+def session(fake_redis):
+    session = TerminalSession('s1', 'minishell', FakeChild(), None)
+    session.budget = OutputBudget(rate=0, burst=0, per_command=10)
+    with m.patch('main.session_registry', new=main.SessionRegistry(fake_redis)), \
+         m.patch.dict(main.terminal_sessions), m.patch.dict(main.active_terminals):
+        main.terminal_sessions['s1'] = session
+        yield session
+
+
+class TestOutputBudget:
+
+    def test_output_within_limits_passes_through(self):
+        budget = OutputBudget(rate=1000, burst=1000, per_command=100)
+        assert budget.admit('hello') == 'hello'
+        assert budget.summary() == ''
+
+    def test_per_command_cap_truncates_and_summarizes(self):
+        budget = OutputBudget(rate=0, burst=0, per_command=5)
+        assert budget.admit('0123456789') == '01234'
+        assert budget.admit('abc$ ') == ''
+        assert budget.suppressed_total == 10
+        summary = budget.summary()
+        assert '... 10 bytes suppressed (output limit per command) ...' in summary
+        assert summary.endswith('56789abc$ ')
+        assert budget.summary() == ''
+
+    def test_input_resets_the_cap(self):
+        budget = OutputBudget(rate=0, burst=0, per_command=5)
+        budget.admit('0123456789')
+        budget.note_input()
+        resumed = budget.admit('ok')
+        assert resumed.startswith('\r\n\x1b[0m... 5 bytes suppressed')
+        # Resuming replaces the dropped output with the count only
+        assert '56789' not in resumed
+        assert resumed.endswith('ok')
+
+    def test_rate_limit_waits_for_half_the_burst(self):
+        budget = OutputBudget(rate=100, burst=100, per_command=0)
+        with m.patch('main.time.monotonic', return_value=0.0):
+            budget._refilled = 0.0
+            assert budget.admit('x' * 150) == 'x' * 100
+        with m.patch('main.time.monotonic', return_value=0.3):
+            # 30 bytes refilled is not enough to resume
+            assert budget.admit('y' * 10) == ''
+        with m.patch('main.time.monotonic', return_value=0.6):
+            resumed = budget.admit('z' * 10)
+        assert '... 60 bytes suppressed (output rate limit) ...' in resumed
+        assert resumed.endswith('z' * 10)
+
+    def test_multibyte_characters_are_not_split(self):
+        budget = OutputBudget(rate=0, burst=0, per_command=3)
+        assert budget.admit('aéé') == 'aé'
+        assert budget.suppressed == 2
+        assert budget.summary().endswith('é')
+
+    def test_characters_split_by_a_limit_are_suppressed_whole(self):
+        budget = OutputBudget(rate=0, burst=0, per_command=2)
+        assert budget.admit('aé€') == 'a'
+        assert budget.suppressed == 5
+        assert budget.summary().endswith('é€')
+
+    def test_tail_starts_on_a_character_boundary(self):
+        budget = OutputBudget(rate=0, burst=0, per_command=1, tail_bytes=4)
+        budget.admit('x' + '€' * 3)
+        assert budget.summary().endswith('\r\n€€')
+
+    def test_charged_output_counts_against_both_limits(self):
+        budget = OutputBudget(rate=100, burst=100, per_command=50)
+        with m.patch('main.time.monotonic', return_value=0.0):
+            budget._refilled = 0.0
+            budget.charge('é' * 20)
+            assert budget.command_bytes == 40
+            assert budget.tokens == 60
+            assert budget.admit('x' * 20) == 'x' * 10
+
+    def test_zero_limits_disable_the_budget(self):
+        budget = OutputBudget(rate=0, burst=0, per_command=0)
+        assert budget.admit('x' * 100000) == 'x' * 100000
+
+    def test_suppressed_bytes_are_counted_by_reason(self):
+        counter = main.output_suppressed_bytes.labels('command')
+        before = counter.value
+        OutputBudget(rate=0, burst=0, per_command=1).admit('abc')
+        assert counter.value == before + 2
+
+
+class TestSessionOutputBudget:
+
+    async def test_summary_follows_once_output_goes_quiet(self, session):
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        with m.patch('main.OUTPUT_SUMMARY_QUIET_SECONDS', 0.01):
+            await session.send_output('0123456789abcdef')
+            await session.send_output('$ ')
+            assert terminal.output == '0123456789'
+            await asyncio.sleep(0.05)
+        assert '... 8 bytes suppressed' in terminal.output
+        assert terminal.output.endswith('abcdef$ ')
+        # Suppressed output never reaches the scrollback, so offsets match what was sent
+        assert session.scrollback.since() == terminal.output
+
+    async def test_summary_is_not_postponed_forever(self, session):
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        with m.patch('main.OUTPUT_SUMMARY_QUIET_SECONDS', 0.03), \
+             m.patch('main.OUTPUT_SUMMARY_MAX_DELAY', 0.02):
+            await session.send_output('x' * 20)
+            for _ in range(6):
+                await asyncio.sleep(0.01)
+                await session.send_output('y')
+        assert 'bytes suppressed' in terminal.output
+
+    async def test_any_input_resets_the_cap(self, session):
+        session.budget.admit('x' * 20)
+        session.child = m.Mock()
+        terminal = m.Mock()
+        # A pager's next page is a space, not an Enter
+        terminal.receive = m.AsyncMock(side_effect=[('input', ' '), main.WebSocketDisconnect(1000)])
+        with pytest.raises(main.WebSocketDisconnect):
+            await main.handle_client_messages(terminal, session)
+        assert session.budget.command_bytes == 0
+        assert session.budget.admit('next page') == '\r\n\x1b[0m... 10 bytes suppressed (output limit per command) ...\r\nnext page'
+
+    async def test_notices_are_charged_but_never_suppressed(self, session):
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        await session.notify('a notice longer than the cap')
+        assert terminal.output.endswith('a notice longer than the cap')
+        assert session.budget.command_bytes == len('a notice longer than the cap')
+        assert await session.send_output('more') == 0
@@ -0,0 +1,85 @@
+# tests/unit/test_output_coalescer.py
+"""Unit tests for OutputCoalescer batching and FrameStats accounting."""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from main import FrameStats, OutputCoalescer, TerminalSocket
+
+
+class FakeWebSocket:
+
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, data):
+        self.frames.append(json.loads(data)['output'])
+
+
+class TestOutputCoalescer:
+
+    async def test_buffers_until_flush(self):
+        ws = FakeWebSocket()
+        coalescer = OutputCoalescer(TerminalSocket(ws), window=10, max_bytes=1024)
+        await coalescer.push('a')
+        await coalescer.push('b')
+        assert ws.frames == []
+        await coalescer.flush()
+        assert ws.frames == ['ab']
+
+    async def test_flushes_at_byte_cap(self):
+        ws = FakeWebSocket()
+        coalescer = OutputCoalescer(TerminalSocket(ws), window=10, max_bytes=4)
+        await coalescer.push('ab')
+        await coalescer.push('cd')
+        assert ws.frames == ['abcd']
+
+    async def test_echo_after_input_is_sent_immediately(self):
+        ws = FakeWebSocket()
+        coalescer = OutputCoalescer(TerminalSocket(ws), window=10, max_bytes=1024)
+        coalescer.note_input()
+        await coalescer.push('l')
+        assert ws.frames == ['l']
+        # Only the first chunk after input bypasses the window
+        await coalescer.push('s output')
+        assert ws.frames == ['l']
+
+    async def test_zero_window_disables_coalescing(self):
+        ws = FakeWebSocket()
+        coalescer = OutputCoalescer(TerminalSocket(ws), window=0, max_bytes=1024)
+        await coalescer.push('a')
+        await coalescer.push('b')
+        assert ws.frames == ['a', 'b']
+
+    async def test_time_until_flush(self):
+        coalescer = OutputCoalescer(TerminalSocket(FakeWebSocket()), window=10, max_bytes=1024)
+        assert coalescer.time_until_flush() is None
+        await coalescer.push('a')
+        assert 0 < coalescer.time_until_flush() <= 10
+        await coalescer.flush()
+        assert coalescer.time_until_flush() is None
+
+    async def test_flush_with_nothing_pending_sends_nothing(self):
+        ws = FakeWebSocket()
+        await OutputCoalescer(TerminalSocket(ws)).flush()
+        assert ws.frames == []
+
+
+class TestFrameStats:
+
+    def test_snapshot_reports_totals_and_average_frame_size(self):
+        stats = FrameStats()
+        stats.record(100)
+        stats.record(300)
+        snapshot = stats.snapshot()
+        assert snapshot['output_frames_total'] == 2
+        assert snapshot['output_bytes_total'] == 400
+        assert snapshot['output_bytes_per_frame'] == 200
+
+    def test_empty_snapshot(self):
+        snapshot = FrameStats().snapshot()
+        assert snapshot['output_frames_per_second'] == 0
+        assert snapshot['output_bytes_per_frame'] == 0
@@ -0,0 +1,80 @@
+# tests/unit/test_prefetch.py
+"""Unit tests for the startup project prefetch."""
+
+import asyncio
+import os
+import sys
+import unittest.mock as m
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+
+
+def versions(mapping):
+    return m.patch.object(main.project_cache, 'latest_version', side_effect=lambda slug: mapping.get(slug, (None, None)))
+
+
+class TestPrefetchProject:
+
+    async def test_installs_and_activates_latest_version(self):
+        with versions({'minishell': ('v1', None)}), \
+             m.patch.dict(main.prefetch_state), \
+             m.patch('main.install_project_version', return_value=True) as install, \
+             m.patch.object(main.project_cache, 'activate') as activate:
+            await main.prefetch_project('minishell')
+            assert main.prefetch_state['minishell'] == 'cached'
+
+        assert install.call_args[0][:3] == ('minishell', 'v1', None)
+        activate.assert_called_once_with('minishell', 'v1')
+
+    async def test_missing_archive(self):
+        with versions({}), m.patch.dict(main.prefetch_state):
+            await main.prefetch_project('minishell')
+            assert main.prefetch_state['minishell'] == 'missing'
+
+    async def test_failed_install(self):
+        with versions({'minishell': ('v1', None)}), \
+             m.patch.dict(main.prefetch_state), \
+             m.patch('main.install_project_version', return_value=False), \
+             m.patch.object(main.project_cache, 'activate') as activate:
+            await main.prefetch_project('minishell')
+            assert main.prefetch_state['minishell'] == 'failed'
+        activate.assert_not_called()
+
+    async def test_errors_are_contained(self):
+        with m.patch.object(main.project_cache, 'latest_version', side_effect=OSError("boom")), \
+             m.patch.dict(main.prefetch_state):
+            await main.prefetch_project('minishell')
+            assert main.prefetch_state['minishell'] == 'failed'
+
+
+class TestPrefetchProjects:
+
+    async def test_bounded_concurrency_and_hot_projects_first(self):
+        running = 0
+        peak = 0
+        order = []
+
+        async def fake_prefetch(slug):
+            nonlocal running, peak
+            order.append(slug)
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        with m.patch('main.prefetch_project', new=fake_prefetch), \
+             m.patch('main.PREFETCH_ENABLED', True), \
+             m.patch('main.PREFETCH_CONCURRENCY', 2), \
+             m.patch('main.HOT_PROJECTS', ['minishell', 'cub3d']):
+            await main.prefetch_projects()
+
+        assert peak == 2
+        assert order[:2] == ['minishell', 'cub3d']
+        assert sorted(order) == sorted(main.ALLOWED_PROJECTS)
+
+    async def test_disabled_marks_projects_skipped(self):
+        with m.patch('main.PREFETCH_ENABLED', False), m.patch.dict(main.prefetch_state):
+            await main.prefetch_projects()
+            assert set(main.prefetch_state.values()) == {'skipped'}
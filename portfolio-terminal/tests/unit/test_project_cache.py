@@ -0,0 +1,156 @@
+# tests/unit/test_project_cache.py
+"""Unit tests for the versioned ProjectCache and per-session workspaces."""
+
+import os
+import sys
+import unittest.mock as m
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import ProjectCache, create_workspace
+
+
+def fake_download(files):
+    """Stand-in for download_project_files that writes the given files."""
+    calls = []
+
+    def download(project_slug, target_dir, etag=None, progress=None):
+        calls.append((project_slug, etag))
+        for name, content in files.items():
+            path = os.path.join(target_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(content)
+        return True
+
+    download.calls = calls
+    return download
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ProjectCache(root=str(tmp_path / 'projects'), max_bytes=10 ** 9, revalidate_seconds=0)
+
+
+class TestProjectCacheInstall:
+
+    def test_install_extracts_read_only_version(self, cache):
+        with m.patch('main.download_project_files', new=fake_download({'src/main.c': 'int main;'})):
+            assert cache.install('minishell', 'v1') is True
+        path = os.path.join(cache.version_dir('minishell', 'v1'), 'src', 'main.c')
+        assert open(path).read() == 'int main;'
+        assert os.stat(path).st_mode & 0o222 == 0
+        assert cache.has_version('minishell', 'v1')
+
+    def test_cached_version_is_not_downloaded_again(self, cache):
+        download = fake_download({'a.c': 'a'})
+        with m.patch('main.download_project_files', new=download):
+            cache.install('minishell', 'v1', etag='"abc"')
+            cache.install('minishell', 'v1', etag='"abc"')
+        assert download.calls == [('minishell', '"abc"')]
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_failed_download_leaves_no_version(self, cache):
+        with m.patch('main.download_project_files', return_value=False):
+            assert cache.install('minishell', 'v1') is False
+        assert not cache.has_version('minishell', 'v1')
+        assert os.listdir(cache.project_root('minishell')) == []
+
+    def test_activate_switches_current(self, cache):
+        with m.patch('main.download_project_files', new=fake_download({'a.c': 'a'})):
+            cache.install('minishell', 'v1')
+            cache.install('minishell', 'v2')
+        cache.activate('minishell', 'v1')
+        assert cache.current_version('minishell') == 'v1'
+        cache.activate('minishell', 'v2')
+        assert cache.current_version('minishell') == 'v2'
+
+
+class TestProjectCacheVersions:
+
+    def test_latest_version_is_revalidated_after_ttl(self, cache):
+        cache.revalidate_seconds = 60
+        with m.patch('main.fetch_project_version', return_value=('v1', '"e1"')) as fetch:
+            assert cache.latest_version('minishell') == ('v1', '"e1"')
+            assert cache.latest_version('minishell') == ('v1', '"e1"')
+        assert fetch.call_count == 1
+
+    def test_origin_errors_fall_back_to_current(self, cache):
+        with m.patch('main.download_project_files', new=fake_download({'a.c': 'a'})):
+            cache.install('minishell', 'v1')
+        cache.activate('minishell', 'v1')
+        with m.patch('main.fetch_project_version', side_effect=ConnectionError):
+            assert cache.latest_version('minishell') == ('v1', None)
+
+    def test_local_zip_version_is_content_hash(self, tmp_path):
+        archive = tmp_path / 'minishell.zip'
+        archive.write_bytes(b'zip bytes')
+        with m.patch('main.is_dev_mode', return_value=True), \
+             m.patch('main.local_project_zip', return_value=str(archive)):
+            version, etag = main.fetch_project_version('minishell')
+        assert version.startswith('sha256-')
+        assert etag is None
+
+
+class TestProjectCacheEviction:
+
+    def test_evicts_least_recently_used_non_current_versions(self, cache):
+        cache.max_bytes = 25
+        with m.patch('main.download_project_files', new=fake_download({'a.c': 'x' * 10})):
+            for version in ('v1', 'v2', 'v3'):
+                cache.install('minishell', version)
+                cache.activate('minishell', version)
+                os.utime(os.path.join(cache.version_dir('minishell', version), '.complete'),
+                         (100 + int(version[1]), 100 + int(version[1])))
+        cache.collect_garbage()
+        assert not cache.has_version('minishell', 'v1')
+        assert cache.has_version('minishell', 'v2')
+        assert cache.has_version('minishell', 'v3')
+        assert cache.stats()['evictions'] == 1
+
+    def test_current_version_is_never_evicted(self, cache):
+        cache.max_bytes = 0
+        with m.patch('main.download_project_files', new=fake_download({'a.c': 'x' * 10})):
+            cache.install('minishell', 'v1')
+            assert cache.has_version('minishell', 'v1')
+        cache.activate('minishell', 'v1')
+        cache.collect_garbage()
+        assert cache.has_version('minishell', 'v1')
+
+
+class TestWorkspaces:
+
+    def test_workspace_hardlinks_cached_files(self, cache, tmp_path):
+        with m.patch('main.download_project_files', new=fake_download({'src/main.c': 'code'})):
+            cache.install('minishell', 'v1')
+        with m.patch('main.project_cache', new=cache), \
+             m.patch('main.SANDBOXES_DIR', new=str(tmp_path / 'sandboxes')):
+            workspace = create_workspace('minishell', 'v1')
+        cached = os.path.join(cache.version_dir('minishell', 'v1'), 'src', 'main.c')
+        linked = os.path.join(workspace, 'src', 'main.c')
+        assert os.path.samefile(cached, linked)
+        assert not os.path.exists(os.path.join(workspace, '.complete'))
+        # The workspace directories themselves are writable for build output
+        assert os.access(os.path.join(workspace, 'src'), os.W_OK)
+
+    def test_copy_mode_gives_writable_private_files(self, cache, tmp_path):
+        with m.patch('main.download_project_files', new=fake_download({'a.c': 'code'})):
+            cache.install('minishell', 'v1')
+        with m.patch('main.project_cache', new=cache), \
+             m.patch('main.WORKSPACE_MODE', new='copy'), \
+             m.patch('main.SANDBOXES_DIR', new=str(tmp_path / 'sandboxes')):
+            workspace = create_workspace('minishell', 'v1')
+        copied = os.path.join(workspace, 'a.c')
+        assert not os.path.samefile(copied, os.path.join(cache.version_dir('minishell', 'v1'), 'a.c'))
+        assert os.stat(copied).st_mode & 0o200
+
+    def test_workspace_without_version_is_empty(self, tmp_path):
+        with m.patch('main.SANDBOXES_DIR', new=str(tmp_path / 'sandboxes')):
+            workspace = create_workspace('minishell')
+        assert os.listdir(workspace) == []
+        main.remove_workspace(workspace)
+        assert not os.path.exists(os.path.dirname(workspace))
@@ -0,0 +1,78 @@
+# tests/unit/test_project_images.py
+"""Unit tests for serving project images from session workspaces and the cache."""
+
+import os
+import sys
+import unittest.mock as m
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import TerminalSession
+from tests.unit.test_terminal_session import FakeChild
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    projects = tmp_path / 'projects'
+    cached = projects / 'minishell' / 'v1' / 'images'
+    cached.mkdir(parents=True)
+    (projects / 'minishell' / 'current').symlink_to(projects / 'minishell' / 'v1')
+    (cached / 'logo.png').write_bytes(b'cached logo')
+    workspace = tmp_path / 'sandboxes' / 'abc' / 'minishell'
+    (workspace / 'images').mkdir(parents=True)
+    (workspace / 'images' / 'plot.png').write_bytes(b'session plot')
+    (workspace / 'images' / 'logo.png').write_bytes(b'session logo')
+    session = TerminalSession('s1', 'minishell', FakeChild(), str(workspace))
+    with m.patch('main.PROJECTS_DIR', str(projects)), m.patch.dict(main.terminal_sessions, {'s1': session}):
+        yield session
+
+
+def served(response):
+    with open(response.path, 'rb') as f:
+        return f.read()
+
+
+class TestProjectImages:
+
+    async def test_session_images_come_first(self, dirs):
+        response = await main.get_project_image('minishell', 'plot.png', session='s1', resume=dirs.token)
+        assert served(response) == b'session plot'
+        response = await main.get_project_image('minishell', 'logo.png', session='s1', resume=dirs.token)
+        assert served(response) == b'session logo'
+
+    async def test_falls_back_to_the_cached_project(self, dirs):
+        os.remove(os.path.join(dirs.workspace, 'images', 'logo.png'))
+        response = await main.get_project_image('minishell', 'logo.png', session='s1', resume=dirs.token)
+        assert served(response) == b'cached logo'
+
+    async def test_workspace_needs_the_session_token(self, dirs):
+        response = await main.get_project_image('minishell', 'logo.png', session='s1', resume='wrong')
+        assert served(response) == b'cached logo'
+        with pytest.raises(main.HTTPException) as error:
+            await main.get_project_image('minishell', 'plot.png', session='s1')
+        assert error.value.status_code == 404
+
+
+class TestSupervisorProjectImages:
+
+    async def test_session_images_are_fetched_from_the_owning_worker(self, fake_redis):
+        supervisor = main.WorkerSupervisor(count=2, base_port=9000)
+        fake_redis._hset(main.SessionRegistry.key('s1'), {'worker': '1'})
+        response = m.MagicMock(status=200, headers={'Content-Type': 'image/png'})
+        response.read = m.AsyncMock(return_value=b'session plot')
+        supervisor.http = m.MagicMock()
+        supervisor.http.get.return_value.__aenter__.return_value = response
+        with m.patch('main.supervisor', new=supervisor), m.patch('main.async_redis', new=fake_redis):
+            served = await main.supervisor_project_image('minishell', 'plot.png', session='s1', resume='t')
+        assert served.body == b'session plot'
+        assert served.media_type == 'image/png'
+        assert supervisor.http.get.call_args.args[0] == 'http://127.0.0.1:9001/images/minishell/plot.png'
+        assert supervisor.http.get.call_args.kwargs['params'] == {'session': 's1', 'resume': 't'}
+
+    async def test_without_a_session_the_cache_is_served_locally(self, dirs):
+        with m.patch('main.supervisor', new=main.WorkerSupervisor(count=2, base_port=9000)):
+            response = await main.supervisor_project_image('minishell', 'logo.png')
+        assert served(response) == b'cached logo'
@@ -0,0 +1,110 @@
+# tests/unit/test_prometheus_metrics.py
+"""Unit tests for the Prometheus metrics registry and its instrumentation."""
+
+import os
+import sys
+import unittest.mock as m
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import MetricsRegistry, merge_prometheus
+
+
+class TestMetricsRegistry:
+
+    def test_counter_with_labels(self):
+        registry = MetricsRegistry()
+        requests = registry.counter('app_requests_total', "Requests", labels=('method',))
+        requests.labels('GET').inc()
+        requests.labels('GET').inc(2)
+        requests.labels('POST').inc()
+        assert registry.render() == (
+            '# HELP app_requests_total Requests\n'
+            '# TYPE app_requests_total counter\n'
+            'app_requests_total{method="GET"} 3\n'
+            'app_requests_total{method="POST"} 1\n'
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram('app_latency_seconds', "Latency", (0.1, 1)).labels()
+        for value in (0.05, 0.1, 0.5, 5):
+            latency.observe(value)
+        lines = registry.render().splitlines()
+        assert lines[2:] == [
+            'app_latency_seconds_bucket{le="0.1"} 2',
+            'app_latency_seconds_bucket{le="1.0"} 3',
+            'app_latency_seconds_bucket{le="+Inf"} 4',
+            'app_latency_seconds_sum 5.65',
+            'app_latency_seconds_count 4',
+        ]
+
+    def test_collected_gauge(self):
+        registry = MetricsRegistry()
+        registry.gauge('app_queue', "Queue depth", labels=('queue',), collect=lambda: {('jobs',): 7})
+        assert 'app_queue{queue="jobs"} 7' in registry.render()
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter('app_errors_total', "Errors", labels=('where',)).labels('a"b\\c\n').inc()
+        assert 'app_errors_total{where="a\\"b\\\\c\\n"} 1' in registry.render()
+
+    def test_duplicate_names_are_rejected(self):
+        registry = MetricsRegistry()
+        registry.counter('app_total', "Total")
+        with pytest.raises(ValueError):
+            registry.gauge('app_total', "Total")
+
+
+class TestMergePrometheus:
+
+    def test_labels_samples_by_worker_and_groups_families(self):
+        worker = (
+            '# HELP app_total Total\n'
+            '# TYPE app_total counter\n'
+            'app_total{kind="x"} {n}\n'
+            '# HELP app_up Up\n'
+            '# TYPE app_up gauge\n'
+            'app_up 1\n'
+        )
+        text = merge_prometheus({'0': worker.replace('{n}', '2'), '1': worker.replace('{n}', '5')})
+        assert text.splitlines() == [
+            '# HELP app_total Total',
+            '# TYPE app_total counter',
+            'app_total{worker="0",kind="x"} 2',
+            'app_total{worker="1",kind="x"} 5',
+            '# HELP app_up Up',
+            '# TYPE app_up gauge',
+            'app_up{worker="0"} 1',
+            'app_up{worker="1"} 1',
+        ]
+
+
+class TestInstrumentation:
+
+    def test_validation_verdicts_are_counted(self):
+        blocked = main.command_verdicts.labels('blocked', 'container_escape')
+        allowed = main.command_verdicts.labels('allowed', 'ls')
+        blocked_before, allowed_before = blocked.value, allowed.value
+        main.validate_command('docker ps')
+        main.validate_command('ls -la')
+        assert blocked.value == blocked_before + 1
+        assert allowed.value == allowed_before + 1
+
+    def test_record_error_counts_by_location(self):
+        counter = main.errors_total.labels('pty_read')
+        before = counter.value
+        main.record_error('pty_read', OSError("EIO"))
+        assert counter.value == before + 1
+        assert main.last_error_message == 'pty_read: EIO'
+
+    async def test_prompt_detection_outcome(self):
+        child = m.Mock()
+        child.expect.return_value = 0
+        histogram = main.prompt_detection_seconds.labels('ok')
+        before = histogram.count
+        await main.wait_for_prompt(child)
+        assert histogram.count == before + 1
@@ -0,0 +1,121 @@
+# tests/unit/test_session_reaper.py
+"""Unit tests for the idle and lifetime session reaper."""
+
+import os
+import sys
+import time
+import unittest.mock as m
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import SessionReaper, TerminalSession
+from tests.unit.test_terminal_session import FakeChild, RecordingTerminal
+
+
+def reaper(**overrides):
+    settings = dict(idle_timeout=600, max_lifetime=900, warning_seconds=60, interval=1)
+    settings.update(overrides)
+    return SessionReaper(**settings)
+
+
+@pytest.fixture
+def session(fake_redis):
+    session = TerminalSession('s1', 'minishell', FakeChild(), None)
+    session.terminal = RecordingTerminal()
+    with m.patch('main.session_registry', new=main.SessionRegistry(fake_redis)), \
+         m.patch.dict(main.terminal_sessions), m.patch.dict(main.active_terminals):
+        main.terminal_sessions['s1'] = session
+        yield session
+
+
+def age(session, started=0, input=0, output=0):
+    """Backdate the session's start and last activity by the given seconds"""
+    now = time.monotonic()
+    session.started_at = now - started
+    session.last_input = now - input
+    session.last_output = now - output
+
+
+class TestDeadline:
+
+    def test_nearest_limit_wins(self, session):
+        age(session, started=100, input=590, output=590)
+        limit, seconds = reaper().deadline(session, time.monotonic())
+        assert limit == 'idle'
+        assert seconds == pytest.approx(10, abs=1)
+
+        age(session, started=895)
+        assert reaper().deadline(session, time.monotonic())[0] == 'lifetime'
+
+    def test_output_counts_as_activity(self, session):
+        age(session, started=100, input=700, output=5)
+        limit, seconds = reaper().deadline(session, time.monotonic())
+        assert limit == 'idle'
+        assert seconds == pytest.approx(595, abs=1)
+
+    def test_disabled_limits(self, session):
+        assert reaper(idle_timeout=0, max_lifetime=0).deadline(session, time.monotonic()) == (None, None)
+
+
+class TestSweep:
+
+    async def test_active_session_is_left_alone(self, session):
+        terminal = session.terminal
+        await reaper().sweep()
+        assert not session.closed
+        assert terminal.controls == []
+
+    async def test_warns_once_before_idle_timeout(self, session):
+        age(session, started=100, input=570, output=570)
+        sessions_reaper = reaper()
+        await sessions_reaper.sweep()
+        await sessions_reaper.sweep()
+
+        [control] = session.terminal.controls
+        assert control['warning']['limit'] == 'idle'
+        assert 0 < control['warning']['seconds'] <= 30
+        assert 'Press a key' in session.terminal.output
+        assert not session.closed
+
+    async def test_activity_after_warning_resets_it(self, session):
+        sessions_reaper = reaper()
+        age(session, started=100, input=570, output=570)
+        await sessions_reaper.sweep()
+        age(session, started=100)
+        await sessions_reaper.sweep()
+        assert session.warned is None
+        age(session, started=100, input=570, output=570)
+        await sessions_reaper.sweep()
+        assert len(session.terminal.controls) == 2
+
+    async def test_closes_idle_session(self, session):
+        terminal = session.terminal
+        age(session, started=700, input=601, output=601)
+        sessions_reaper = reaper()
+        await sessions_reaper.sweep()
+
+        assert session.closed
+        assert session.child.terminated
+        assert 's1' not in main.terminal_sessions
+        assert 'inactivity' in terminal.output
+        assert terminal.closed_with == 4001
+        assert sessions_reaper.stats()['reaped_idle_total'] == 1
+
+    async def test_closes_session_past_lifetime_despite_activity(self, session):
+        terminal = session.terminal
+        age(session, started=901)
+        sessions_reaper = reaper()
+        await sessions_reaper.sweep()
+
+        assert session.closed
+        assert '15 minute limit' in terminal.output
+        assert sessions_reaper.stats()['reaped_lifetime_total'] == 1
+
+    async def test_detached_session_is_reaped_without_warning(self, session):
+        session.terminal = None
+        age(session, started=901)
+        await reaper().sweep()
+        assert session.closed
@@ -0,0 +1,75 @@
+# tests/unit/test_session_registry.py
+"""Unit tests for the Redis-backed SessionRegistry."""
+
+import asyncio
+import os
+import sys
+import unittest.mock as m
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from main import SessionRegistry
+
+
+class TestSessionRegistry:
+
+    async def test_register_is_one_round_trip(self, fake_redis):
+        registry = SessionRegistry(fake_redis, ttl=3600)
+        await registry.register('s1', {'project': 'minishell', 'client_ip': '1.2.3.4'})
+
+        assert fake_redis.round_trips == 1
+        session = await fake_redis.hgetall('terminal_session:s1')
+        assert session['project'] == 'minishell'
+        assert 'last_heartbeat' in session
+        assert fake_redis.ttls['terminal_session:s1'] == 3600
+        assert await registry.active() == ['s1']
+
+    async def test_activity_is_flushed_with_heartbeat(self, fake_redis):
+        registry = SessionRegistry(fake_redis)
+        await registry.register('s1', {'project': 'minishell'})
+        await registry.register('s2', {'project': 'cub3d'})
+        registry.touch('s1', 'last_input')
+        registry.touch('s2', 'last_output')
+        registry.touch('unknown', 'last_input')
+        trips = fake_redis.round_trips
+
+        await registry.heartbeat()
+
+        assert fake_redis.round_trips == trips + 1
+        assert 'last_input' in await fake_redis.hgetall('terminal_session:s1')
+        assert 'last_output' in await fake_redis.hgetall('terminal_session:s2')
+        assert 'terminal_session:unknown' not in fake_redis.hashes
+
+    async def test_heartbeat_without_sessions_skips_redis(self, fake_redis):
+        await SessionRegistry(fake_redis).heartbeat()
+        assert fake_redis.round_trips == 0
+
+    async def test_unregister_removes_session_and_index_entry(self, fake_redis):
+        registry = SessionRegistry(fake_redis)
+        await registry.register('s1', {'project': 'minishell'})
+        await registry.unregister('s1')
+
+        assert await fake_redis.hgetall('terminal_session:s1') == {}
+        assert await registry.active() == []
+
+    async def test_stale_sessions_drop_out_of_index(self, fake_redis):
+        registry = SessionRegistry(fake_redis, heartbeat_interval=30)
+        with m.patch('main.time.time', return_value=1000.0):
+            await registry.register('old', {'project': 'minishell'})
+        with m.patch('main.time.time', return_value=1080.0):
+            await registry.register('new', {'project': 'minishell'})
+        with m.patch('main.time.time', return_value=1100.0):
+            assert await registry.active() == ['new']
+        assert await fake_redis.zscore(SessionRegistry.INDEX_KEY, 'old') is None
+
+    async def test_heartbeat_loop_refreshes_the_registered_ids(self, fake_redis):
+        registry = SessionRegistry(fake_redis, heartbeat_interval=0.01)
+        assert registry.registered is None
+        await registry.register('s2', {'project': 'minishell'})
+        await registry.register('s1', {'project': 'cub3d'})
+        task = asyncio.create_task(registry.run())
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            task.cancel()
+        assert registry.registered == ['s1', 's2']
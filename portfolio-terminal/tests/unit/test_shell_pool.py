@@ -0,0 +1,145 @@
+# tests/unit/test_shell_pool.py
+"""Unit tests for the pre-spawned ShellPool and the Histogram helper."""
+
+import os
+import sys
+import unittest.mock as m
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import Histogram, ShellPool
+
+
+class FakeChild:
+
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.closed = False
+
+    def isalive(self):
+        return self.alive
+
+    def close(self, force=False):
+        self.closed = True
+
+
+def entry(child, age=0, version='v1'):
+    return (child, main.time.monotonic() - age, '/ws/minishell', version)
+
+
+def refill_patches(version='v1', spawn=None, prompt=None):
+    """Patch everything ShellPool._refill touches outside the pool itself."""
+    from contextlib import ExitStack
+    stack = ExitStack()
+    stack.enter_context(m.patch.object(main.project_cache, 'current_version', return_value=version))
+    stack.enter_context(m.patch('main.create_workspace', return_value='/ws/minishell'))
+    stack.enter_context(m.patch('main.remove_workspace'))
+    stack.enter_context(m.patch('main.spawn_shell', new=spawn or m.Mock(side_effect=lambda _: FakeChild())))
+    stack.enter_context(m.patch('main.wait_for_prompt', new=prompt or m.AsyncMock()))
+    return stack
+
+
+def make_pool(**overrides):
+    options = {'size': 2, 'refill_rate': 1, 'refill_interval': 60, 'max_idle': 600}
+    options.update(overrides)
+    return ShellPool(**options)
+
+
+class TestShellPoolAcquire:
+
+    async def test_miss_on_empty_pool(self):
+        pool = make_pool()
+        assert await pool.acquire('minishell', 'v1') is None
+        assert pool.misses == 1
+
+    async def test_hit_after_refill(self):
+        pool = make_pool()
+        child = FakeChild()
+        with refill_patches(spawn=m.Mock(return_value=child)):
+            await pool._refill('minishell')
+        assert await pool.acquire('minishell', 'v1') == (child, '/ws/minishell')
+        assert pool.hits == 1
+
+    async def test_dead_shells_are_skipped(self):
+        pool = make_pool()
+        dead, alive = FakeChild(alive=False), FakeChild()
+        pool._idle['minishell'] = main.deque([entry(dead), entry(alive)])
+        with m.patch('main.remove_workspace'):
+            assert (await pool.acquire('minishell', 'v1'))[0] is alive
+        assert dead.closed
+
+    async def test_expired_shells_are_skipped(self):
+        pool = make_pool(max_idle=10)
+        stale = FakeChild()
+        pool._idle['minishell'] = main.deque([entry(stale, age=60)])
+        with m.patch('main.remove_workspace'):
+            assert await pool.acquire('minishell', 'v1') is None
+        assert stale.closed
+
+    async def test_shells_for_other_versions_are_skipped(self):
+        pool = make_pool()
+        old = FakeChild()
+        pool._idle['minishell'] = main.deque([entry(old, version='v0')])
+        with m.patch('main.remove_workspace') as remove:
+            assert await pool.acquire('minishell', 'v1') is None
+        assert old.closed
+        remove.assert_called_once_with('/ws/minishell')
+
+
+class TestShellPoolRefill:
+
+    async def test_refill_respects_rate(self):
+        pool = make_pool(size=3, refill_rate=2)
+        with refill_patches():
+            await pool._refill('minishell')
+            assert pool.stats()['idle']['minishell'] == 2
+            await pool._refill('minishell')
+            assert pool.stats()['idle']['minishell'] == 3
+
+    async def test_skips_projects_without_cached_version(self):
+        pool = make_pool()
+        spawn = m.Mock()
+        with refill_patches(version=None, spawn=spawn):
+            await pool._refill('minishell')
+        spawn.assert_not_called()
+
+    async def test_shell_without_prompt_is_discarded(self):
+        pool = make_pool()
+        child = FakeChild()
+        with refill_patches(spawn=m.Mock(return_value=child), prompt=m.AsyncMock(side_effect=TimeoutError)):
+            await pool._refill('minishell')
+        assert child.closed
+        assert pool.stats()['idle']['minishell'] == 0
+
+    async def test_close_all(self):
+        pool = make_pool()
+        child = FakeChild()
+        pool._idle['minishell'] = main.deque([entry(child)])
+        with m.patch('main.remove_workspace'):
+            await pool.close_all()
+        assert child.closed
+
+
+    async def test_shells_are_closed_off_the_event_loop(self):
+        pool = make_pool()
+        loop_thread = main.threading.get_ident()
+        closed_on = []
+        child = FakeChild()
+        child.close = lambda force=False: closed_on.append(main.threading.get_ident())
+        pool._idle['minishell'] = main.deque([entry(child, version='v0')])
+        with refill_patches():
+            await pool._refill('minishell')
+        assert closed_on and closed_on[0] != loop_thread
+
+
+class TestHistogram:
+
+    def test_cumulative_buckets(self):
+        histogram = Histogram((0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        assert snapshot['buckets'] == {'0.1': 1, '1': 2, '+Inf': 3}
+        assert snapshot['count'] == 3
+        assert snapshot['sum'] == 5.55
@@ -0,0 +1,175 @@
+# tests/unit/test_single_flight.py
+"""Unit tests for SingleFlight and the Redis-locked project install."""
+
+import asyncio
+import os
+import sys
+import threading
+import unittest.mock as m
+
+import pytest
+import redis
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import SingleFlight
+
+
+class TestSingleFlight:
+
+    async def test_concurrent_callers_share_one_job(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def job(slug, publish):
+            calls.append(slug)
+            release.wait(5)
+            return f"installed {slug}"
+
+        callers = [asyncio.create_task(flight.run('minishell', job, 'minishell')) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*callers)
+
+        assert calls == ['minishell']
+        assert results == ['installed minishell'] * 5
+        assert flight.stats() == {'started': 1, 'joined': 4}
+
+    async def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.run('a', lambda key, publish: key, 'a'),
+            flight.run('b', lambda key, publish: key, 'b'),
+        )
+        assert results == ['a', 'b']
+        assert flight.stats()['started'] == 2
+
+    async def test_progress_reaches_every_caller(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def job(publish):
+            release.wait(5)
+            publish({'stage': 'download', 'percent': 50})
+            publish({'stage': 'download', 'percent': 100})
+            return True
+
+        seen = {1: [], 2: []}
+
+        def recorder(n):
+            async def on_progress(event):
+                seen[n].append(event['percent'])
+            return on_progress
+
+        first = asyncio.create_task(flight.run('key', job, on_progress=recorder(1)))
+        second = asyncio.create_task(flight.run('key', job, on_progress=recorder(2)))
+        await asyncio.sleep(0.05)
+        release.set()
+        assert await asyncio.gather(first, second) == [True, True]
+        assert seen[1] == seen[2] == [50, 100]
+
+    async def test_late_joiner_gets_latest_event(self):
+        flight = SingleFlight()
+        published = threading.Event()
+        release = threading.Event()
+
+        def job(publish):
+            publish({'stage': 'download', 'percent': 40})
+            published.set()
+            release.wait(5)
+            return True
+
+        first = asyncio.create_task(flight.run('key', job))
+        await asyncio.get_running_loop().run_in_executor(None, published.wait, 5)
+        await asyncio.sleep(0.01)
+
+        seen = []
+
+        async def on_progress(event):
+            seen.append(event['percent'])
+
+        second = asyncio.create_task(flight.run('key', job, on_progress=on_progress))
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(first, second)
+        assert seen == [40]
+
+    async def test_exception_propagates_to_all_callers(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def job(publish):
+            release.wait(5)
+            raise OSError("disk full")
+
+        callers = [asyncio.create_task(flight.run('key', job)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        assert all(isinstance(r, OSError) for r in results)
+
+    async def test_key_is_released_after_completion(self):
+        flight = SingleFlight()
+        assert await flight.run('key', lambda publish: 1) == 1
+        assert await flight.run('key', lambda publish: 2) == 2
+        assert flight.stats() == {'started': 2, 'joined': 0}
+
+    async def test_cancelled_caller_does_not_abort_the_job(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def job(publish):
+            release.wait(5)
+            return 'done'
+
+        abandoned = asyncio.create_task(flight.run('key', job))
+        waiting = asyncio.create_task(flight.run('key', job))
+        await asyncio.sleep(0.05)
+        abandoned.cancel()
+        release.set()
+        assert await waiting == 'done'
+        with pytest.raises(asyncio.CancelledError):
+            await abandoned
+
+
+class TestInstallProjectVersion:
+
+    def test_installs_under_redis_lock(self):
+        lock = m.Mock()
+        lock.acquire.return_value = True
+        with m.patch.object(main.redis_client, 'lock', return_value=lock) as make_lock, \
+             m.patch.object(main.project_cache, 'has_version', return_value=False), \
+             m.patch.object(main.project_cache, 'install', return_value=True) as install:
+            assert main.install_project_version('minishell', 'v1', None, lambda e: None)
+
+        assert make_lock.call_args[0][0] == 'terminal_install:minishell:v1'
+        install.assert_called_once()
+        lock.release.assert_called_once()
+
+    def test_reports_waiting_when_lock_is_held_elsewhere(self):
+        lock = m.Mock()
+        lock.acquire.side_effect = [False, True]
+        events = []
+        with m.patch.object(main.redis_client, 'lock', return_value=lock), \
+             m.patch.object(main.project_cache, 'has_version', return_value=False), \
+             m.patch.object(main.project_cache, 'install', return_value=True):
+            main.install_project_version('minishell', 'v1', None, events.append)
+
+        assert events == [{'stage': 'waiting'}]
+        lock.release.assert_called_once()
+
+    def test_skips_lock_for_cached_version(self):
+        with m.patch.object(main.redis_client, 'lock') as make_lock, \
+             m.patch.object(main.project_cache, 'has_version', return_value=True), \
+             m.patch.object(main.project_cache, 'install', return_value=True):
+            assert main.install_project_version('minishell', 'v1', None, lambda e: None)
+        make_lock.assert_not_called()
+
+    def test_installs_without_lock_when_redis_is_down(self):
+        with m.patch.object(main.redis_client, 'lock', side_effect=redis.ConnectionError("down")), \
+             m.patch.object(main.project_cache, 'has_version', return_value=False), \
+             m.patch.object(main.project_cache, 'install', return_value=True) as install:
+            assert main.install_project_version('minishell', 'v1', None, lambda e: None)
+        install.assert_called_once()
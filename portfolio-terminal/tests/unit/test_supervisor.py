@@ -0,0 +1,104 @@
+# tests/unit/test_supervisor.py
+"""Unit tests for supervisor-mode session routing and metrics aggregation."""
+
+import os
+import sys
+import unittest.mock as m
+import uuid
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import HashRing, SessionRegistry, WorkerSupervisor, merge_metrics
+
+
+class TestHashRing:
+
+    def test_same_key_same_node(self):
+        ring = HashRing(['0', '1', '2'])
+        assert len({ring.node_for('session-a') for _ in range(10)}) == 1
+
+    def test_spreads_keys_across_nodes(self):
+        ring = HashRing(['0', '1', '2', '3'])
+        counts = Counter(ring.node_for(str(uuid.uuid4())) for _ in range(4000))
+        assert set(counts) == {'0', '1', '2', '3'}
+        assert min(counts.values()) > 600
+
+    def test_adding_a_node_moves_few_keys(self):
+        keys = [str(uuid.uuid4()) for _ in range(2000)]
+        before = HashRing(['0', '1', '2'])
+        after = HashRing(['0', '1', '2', '3'])
+        moved = sum(before.node_for(k) != after.node_for(k) for k in keys)
+        # Only keys landing on the new node move: about a quarter of them
+        assert moved < len(keys) * 0.4
+        assert all(after.node_for(k) == '3' for k in keys if before.node_for(k) != after.node_for(k))
+
+
+class TestSessionOwner:
+
+    async def test_directory_entry_wins(self, fake_redis):
+        supervisor = WorkerSupervisor(count=4, base_port=9000)
+        fake_redis._hset(SessionRegistry.key('s1'), {'worker': '3'})
+        with m.patch('main.async_redis', new=fake_redis):
+            assert await supervisor.owner('s1') == '3'
+
+    async def test_unknown_session_falls_back_to_ring(self, fake_redis):
+        supervisor = WorkerSupervisor(count=4, base_port=9000)
+        with m.patch('main.async_redis', new=fake_redis):
+            assert await supervisor.owner('s2') == supervisor.ring.node_for('s2')
+
+    async def test_stale_worker_id_is_ignored(self, fake_redis):
+        supervisor = WorkerSupervisor(count=2, base_port=9000)
+        fake_redis._hset(SessionRegistry.key('s1'), {'worker': '7'})
+        with m.patch('main.async_redis', new=fake_redis):
+            assert await supervisor.owner('s1') == supervisor.ring.node_for('s1')
+
+    async def test_redis_outage_falls_back_to_ring(self):
+        supervisor = WorkerSupervisor(count=2, base_port=9000)
+        failing = m.AsyncMock()
+        failing.hget.side_effect = main.redis.ConnectionError("down")
+        with m.patch('main.async_redis', new=failing):
+            assert await supervisor.owner('s1') == supervisor.ring.node_for('s1')
+
+
+class TestPlacement:
+
+    def test_one_client_stays_on_one_worker(self):
+        supervisor = WorkerSupervisor(count=4, base_port=9000)
+        assert len({supervisor.place('203.0.113.7') for _ in range(10)}) == 1
+
+    def test_clients_spread_over_workers(self):
+        supervisor = WorkerSupervisor(count=4, base_port=9000)
+        workers = {supervisor.place(f"10.0.{i // 256}.{i % 256}") for i in range(1000)}
+        assert workers == set(supervisor.ports)
+
+    async def test_workers_trust_forwarded_client_from_loopback_only(self):
+        supervisor = WorkerSupervisor(count=1, base_port=9000)
+        with m.patch('main.asyncio.create_subprocess_exec', new=m.AsyncMock()) as spawn:
+            await supervisor._spawn('0')
+        args = spawn.call_args.args
+        assert '--proxy-headers' in args
+        assert args[args.index('--forwarded-allow-ips') + 1] == '127.0.0.1'
+
+
+class TestMergeMetrics:
+
+    def test_sums_nested_numbers(self):
+        merged = merge_metrics([
+            {'active_terminals': 2, 'shell_pool': {'hits': 1, 'idle': {'minishell': 1}}, 'name': 'a'},
+            {'active_terminals': 3, 'shell_pool': {'hits': 4, 'idle': {'minishell': 0, 'cub3d': 2}}, 'name': 'b'},
+        ])
+        assert merged['active_terminals'] == 5
+        assert merged['shell_pool'] == {'hits': 5, 'idle': {'minishell': 1, 'cub3d': 2}}
+        assert merged['name'] == 'a'
+
+    def test_histograms_add_bucketwise(self):
+        a = main.Histogram([0.1, 1])
+        b = main.Histogram([0.1, 1])
+        a.observe(0.05)
+        b.observe(0.5)
+        b.observe(5)
+        merged = merge_metrics([a.snapshot(), b.snapshot()])
+        assert merged['count'] == 3
+        assert merged['buckets'] == {'0.1': 1, '1': 2, '+Inf': 3}
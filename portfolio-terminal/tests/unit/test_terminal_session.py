@@ -0,0 +1,195 @@
+# tests/unit/test_terminal_session.py
+"""Unit tests for reconnectable TerminalSessions and their scrollback."""
+
+import asyncio
+import os
+import sys
+import unittest.mock as m
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import main
+from main import Scrollback, TerminalSession
+
+
+class RecordingTerminal:
+    """Stand-in for TerminalSocket that records what it is sent."""
+
+    def __init__(self):
+        self.output = ''
+        self.controls = []
+        self.closed_with = None
+
+    async def send_output(self, text):
+        self.output += text
+        return len(text)
+
+    async def send_control(self, message):
+        self.controls.append(message)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+class FakeChild:
+
+    def __init__(self):
+        self.alive = True
+        self.terminated = False
+
+    def isalive(self):
+        return self.alive
+
+    def terminate(self):
+        self.terminated = True
+        self.alive = False
+
+
+@pytest.fixture
+def session(fake_redis):
+    session = TerminalSession('s1', 'minishell', FakeChild(), None)
+    with m.patch('main.session_registry', new=main.SessionRegistry(fake_redis)), \
+         m.patch.dict(main.terminal_sessions), m.patch.dict(main.active_terminals):
+        main.terminal_sessions['s1'] = session
+        yield session
+
+
+class TestScrollback:
+
+    def test_keeps_only_the_newest_bytes(self):
+        scrollback = Scrollback(max_bytes=10)
+        scrollback.append('0123456789')
+        scrollback.append('abcde')
+        assert scrollback.total == 15
+        assert scrollback.since() == '56789abcde'
+
+    def test_replays_from_offset(self):
+        scrollback = Scrollback(max_bytes=100)
+        scrollback.append('hello ')
+        scrollback.append('world')
+        assert scrollback.since(6) == 'world'
+        assert scrollback.since(11) == ''
+
+    def test_offset_older_than_buffer_replays_everything_retained(self):
+        scrollback = Scrollback(max_bytes=4)
+        scrollback.append('abcdefgh')
+        assert scrollback.since(1) == 'efgh'
+
+    def test_offsets_count_utf8_bytes(self):
+        scrollback = Scrollback(max_bytes=100)
+        scrollback.append('é')
+        scrollback.append('x')
+        assert scrollback.total == 3
+        assert scrollback.since(2) == 'x'
+
+    def test_split_character_at_the_edge_is_dropped(self):
+        scrollback = Scrollback(max_bytes=2)
+        scrollback.append('aéb')  # 4 bytes: 'a', two for 'é', 'b'
+        assert scrollback.since() == 'b'
+
+
+class TestTerminalSession:
+
+    async def test_output_is_kept_while_detached_and_replayed(self, session):
+        first = RecordingTerminal()
+        await session.attach(first)
+        await session.send_output('before ')
+        with m.patch('main.SESSION_GRACE_SECONDS', 60):
+            await session.detach(first)
+        await session.send_output('missed')
+
+        second = RecordingTerminal()
+        await session.attach(second, offset=len('before '))
+        assert first.output == 'before '
+        assert second.output == 'missed'
+        assert second.controls[-1]['session'] == {'id': 's1', 'token': session.token, 'offset': 13}
+        assert not session.child.terminated
+
+    async def test_new_connection_takes_over(self, session):
+        old, new = RecordingTerminal(), RecordingTerminal()
+        await session.attach(old)
+        await session.attach(new)
+        assert old.closed_with == 4000
+        # The old socket's late disconnect must not detach the new one
+        await session.detach(old)
+        assert session.terminal is new
+
+    async def test_expires_after_grace_period(self, session):
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        with m.patch('main.SESSION_GRACE_SECONDS', 0.01):
+            await session.detach(terminal)
+        await asyncio.sleep(0.05)
+        assert session.closed
+        assert session.child.terminated
+        assert 's1' not in main.terminal_sessions
+
+    async def test_reattach_cancels_expiry(self, session):
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        with m.patch('main.SESSION_GRACE_SECONDS', 0.02):
+            await session.detach(terminal)
+        await session.attach(RecordingTerminal())
+        await asyncio.sleep(0.05)
+        assert not session.closed
+
+    async def test_dead_shell_closes_on_detach(self, session):
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        session.child.alive = False
+        with m.patch('main.SESSION_GRACE_SECONDS', 60):
+            await session.detach(terminal)
+        assert session.closed
+
+    async def test_grace_zero_closes_immediately(self, session):
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        with m.patch('main.SESSION_GRACE_SECONDS', 0):
+            await session.detach(terminal)
+        assert session.closed
+
+    def test_token_check(self, session):
+        assert session.matches(session.token)
+        assert not session.matches('wrong')
+        assert not session.matches(None)
+
+
+class TestNextChunk:
+
+    async def test_times_out_with_empty_string(self):
+        assert await main._next_chunk(asyncio.Queue(), 0.01) == ''
+
+    async def test_returns_queued_and_awaited_items(self):
+        chunks = asyncio.Queue()
+        chunks.put_nowait('queued')
+        assert await main._next_chunk(chunks, 0) == 'queued'
+        asyncio.get_running_loop().call_later(0.01, chunks.put_nowait, 'later')
+        assert await main._next_chunk(chunks, 1) == 'later'
+
+    async def test_cancellation_propagates(self):
+        task = asyncio.create_task(main._next_chunk(asyncio.Queue(), None))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+
+# Other modules replace pexpect with a MagicMock when it is imported first
+@pytest.mark.skipif(not isinstance(main.spawn, type), reason="pexpect is mocked in this run")
+class TestOutputPump:
+
+    async def test_output_after_a_quiet_spell_is_forwarded(self, session):
+        session.child = main.spawn('/bin/sh', ['-c', 'echo first; sleep 0.2; echo second'], encoding='utf-8')
+        terminal = RecordingTerminal()
+        await session.attach(terminal)
+        session.start()
+        try:
+            # The pause outlasts the coalesce window, so the pump times out waiting in between
+            await asyncio.wait_for(session.read_task, 5)
+            assert 'first' in terminal.output
+            assert 'second' in terminal.output
+            assert 'Session terminated' in terminal.output
+        finally:
+            await session.close()
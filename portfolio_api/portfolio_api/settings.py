@@ -83,6 +83,16 @@ CACHES = {
 	}
 }
 
+# Upper bound on how long a rendered project response stays in the cache;
+# content changes invalidate it immediately through the content version
+PROJECT_RESPONSE_CACHE_TIMEOUT = int(os.environ.get('PROJECT_RESPONSE_CACHE_TIMEOUT', 24 * 60 * 60))
+
+# Materialized project documents: base for relative media URLs in them (left
+# relative when unset; R2 URLs are absolute already), and whether content
+# changes rebuild them on a background thread
+PROJECT_DOCUMENT_BASE_URL = os.environ.get('PROJECT_DOCUMENT_BASE_URL', '')
+PROJECT_DOCUMENTS_ASYNC = os.environ.get('PROJECT_DOCUMENTS_ASYNC', 'True').lower() in ('true', '1', 't')
+
 RATELIMIT_USE_CACHE = 'rate_limit'
 RATELIMIT_ENABLE = True
 RATELIMIT_FAIL_OPEN = False
@@ -109,11 +119,16 @@ MIDDLEWARE = [
 	'django.middleware.common.CommonMiddleware',
 	'django.middleware.csrf.CsrfViewMiddleware',
 	'django.contrib.auth.middleware.AuthenticationMiddleware',
+	'projects.middleware.QueryDiagnosticsMiddleware',
 	'django.contrib.messages.middleware.MessageMiddleware',
 	'django.middleware.clickjacking.XFrameOptionsMiddleware',
 	'django_ratelimit.middleware.RatelimitMiddleware',
 ]
 
+# Record query counts and timings for every request; single requests can opt in
+# with an X-Query-Diagnostics: 1 header in DEBUG or as staff
+QUERY_DIAGNOSTICS = os.environ.get('QUERY_DIAGNOSTICS', 'False').lower() in ('true', '1', 't')
+
 # Security middleware configuration
 SECURE_HSTS_SECONDS = 31536000  # 1 year
 SECURE_HSTS_INCLUDE_SUBDOMAINS = True
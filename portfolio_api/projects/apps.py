@@ -6,3 +6,7 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        # Content changes invalidate the project response cache
+        from . import signals  # noqa: F401
@@ -4,7 +4,8 @@ import asyncio
 import json
 import logging
 import os
-from urllib.parse import parse_qs
+import struct
+from urllib.parse import parse_qs, urlencode
 
 import jwt
 import websockets
@@ -14,6 +15,80 @@ from django.conf import settings
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Binary framing shared with the terminal service (see portfolio-terminal/main.py).
+# Each binary frame is a 1-byte opcode followed by the payload.
+BINARY_SUBPROTOCOL = 'terminal.binary.v1'
+OP_INPUT = 0x00
+OP_OUTPUT = 0x01
+OP_RESIZE = 0x02
+OP_CONTROL = 0x03
+
+def resize_dimension(value):
+	"""A terminal row or column count as it fits the resize frame, or ValueError"""
+	try:
+		value = int(value)
+	except (TypeError, ValueError):
+		raise ValueError(f"Invalid terminal size: {value!r}")
+	if not 1 <= value <= 0xFFFF:
+		raise ValueError(f"Terminal size out of range: {value}")
+	return value
+
+def json_to_binary(text_data, outgoing):
+	"""
+	Translate a JSON text frame into a binary frame.
+	Outgoing frames (terminal -> browser) carry output, incoming ones carry input.
+	"""
+	try:
+		message = json.loads(text_data)
+	except json.JSONDecodeError:
+		message = None
+	if not isinstance(message, dict):
+		opcode = OP_OUTPUT if outgoing else OP_INPUT
+		return bytes((opcode,)) + text_data.encode('utf-8')
+	if outgoing and 'output' in message:
+		return bytes((OP_OUTPUT,)) + str(message['output']).encode('utf-8')
+	if not outgoing and 'input' in message:
+		return bytes((OP_INPUT,)) + str(message['input']).encode('utf-8')
+	if not outgoing and isinstance(message.get('resize'), dict):
+		rows = resize_dimension(message['resize'].get('rows', 24))
+		cols = resize_dimension(message['resize'].get('cols', 80))
+		return bytes((OP_RESIZE,)) + struct.pack('!HH', rows, cols)
+	return bytes((OP_CONTROL,)) + json.dumps(message).encode('utf-8')
+
+def binary_to_json(bytes_data):
+	"""Translate a binary frame into the equivalent JSON text frame"""
+	if not bytes_data:
+		raise ValueError("Empty frame")
+	opcode, payload = bytes_data[0], bytes_data[1:]
+	if opcode == OP_INPUT:
+		return json.dumps({'input': payload.decode('utf-8', errors='replace')})
+	if opcode == OP_OUTPUT:
+		return json.dumps({'output': payload.decode('utf-8', errors='replace')})
+	if opcode == OP_RESIZE:
+		if len(payload) != 4:
+			raise ValueError(f"Resize frame payload is {len(payload)} bytes, expected 4")
+		rows, cols = struct.unpack('!HH', payload)
+		return json.dumps({'resize': {'rows': rows, 'cols': cols}})
+	if opcode == OP_CONTROL:
+		return payload.decode('utf-8')
+	raise ValueError(f"Unknown opcode: {opcode}")
+
+# Query parameters a reconnecting browser passes through to resume its shell
+RESUME_PARAMS = ('session', 'resume', 'offset')
+
+def build_terminal_url(terminal_base_url, project_slug, query_params):
+	"""Terminal service URL for a project, carrying any session resume parameters"""
+	if terminal_base_url.startswith('wss://'):
+		# For production
+		terminal_url = f"{terminal_base_url}/terminal/{project_slug}/"
+	else:
+		# For development or if base URL doesn't include protocol
+		terminal_url = f"wss://{terminal_base_url}/terminal/{project_slug}/"
+	resume = {key: query_params[key][0] for key in RESUME_PARAMS if query_params.get(key)}
+	if resume:
+		terminal_url += f"?{urlencode(resume)}"
+	return terminal_url
+
 def validate_jwt(token):
 	"""Validate JWT token for terminal access"""
 	try:
@@ -58,17 +133,14 @@ class TerminalConsumer(AsyncWebsocketConsumer):
 
 		self.project_slug = self.scope['url_route']['kwargs']['project_slug']
 
-		# Accept WebSocket connection from browser
-		await self.accept()
+		# Accept WebSocket connection from browser, using binary frames if offered
+		self.binary = BINARY_SUBPROTOCOL in self.scope.get('subprotocols', [])
+		self.upstream_binary = False
+		await self.accept(subprotocol=BINARY_SUBPROTOCOL if self.binary else None)
 
 		# Get terminal service URL from environment
 		terminal_base_url = os.environ.get('TERMINAL_SERVICE_URL', 'wss://portfolio-terminal-4t9w.onrender.com')
-		if terminal_base_url.startswith('wss://'):
-			# For production
-			self.terminal_url = f"{terminal_base_url}/terminal/{self.project_slug}/"
-		else:
-			# For development or if base URL doesn't include protocol
-			self.terminal_url = f"wss://{terminal_base_url}/terminal/{self.project_slug}/"
+		self.terminal_url = build_terminal_url(terminal_base_url, self.project_slug, query_params)
 		
 		logger.info("Connecting to terminal service at: %s", self.terminal_url)
 		
@@ -79,28 +151,34 @@ class TerminalConsumer(AsyncWebsocketConsumer):
 			# - S3 file download for large projects (30-60s)
 			# - ZIP extraction and bash initialization (10-20s)
 			self.terminal_ws = await asyncio.wait_for(
-				websockets.connect(self.terminal_url, ping_interval=30, ping_timeout=120),
+				websockets.connect(
+					self.terminal_url,
+					ping_interval=30,
+					ping_timeout=120,
+					subprotocols=[BINARY_SUBPROTOCOL] if self.binary else None,
+				),
 				timeout=180  # Increased from 60s to 180s (3 minutes)
 			)
+			# Frames are relayed untouched when both hops speak the same protocol;
+			# an older terminal service may decline the binary one
+			self.upstream_binary = self.terminal_ws.subprotocol == BINARY_SUBPROTOCOL
 			
 			# Start forwarding messages from terminal to browser
 			self.forward_task = asyncio.create_task(self.forward_from_terminal())
 			
 			# Send welcome message
-			await self.send(text_data=json.dumps({
-				'output': "Connecting to terminal for {}...\r\n".format(self.project_slug)
-			}))
+			await self.send_output("Connecting to terminal for {}...\r\n".format(self.project_slug))
 			
 		except asyncio.TimeoutError:
 			error_msg = "Connection to terminal service timed out after 180 seconds. Server may be downloading project files.\r\n"
 			logger.error(error_msg)
-			await self.send(text_data=json.dumps({'output': error_msg}))
+			await self.send_output(error_msg)
 			await self.close()
 		except Exception as e:
 			# Handle connection errors
 			error_msg = f"Error connecting to terminal service: {str(e)}\r\n"
 			logger.error("Terminal connection error: %s", e)
-			await self.send(text_data=json.dumps({'output': error_msg}))
+			await self.send_output(error_msg)
 			await self.close()
 
 	async def disconnect(self, close_code):
@@ -130,30 +208,23 @@ class TerminalConsumer(AsyncWebsocketConsumer):
 						self.terminal_ws.recv(),
 						timeout=300  # 5-minute timeout for receiving messages
 					)
-					logger.debug("Forwarding terminal message: %s...", message[:30])
-					await self.send(text_data=message)
+					await self.send_to_browser(message)
 				except asyncio.TimeoutError:
 					# Send a ping to keep the connection alive
 					logger.info("Terminal read timeout - sending ping")
 					await self.terminal_ws.ping()
-					await self.send(text_data=json.dumps({
-						'output': '\r\n[Terminal connection is still active...]\r\n'
-					}))
+					await self.send_output('\r\n[Terminal connection is still active...]\r\n')
 		except websockets.ConnectionClosed as e:
 			logger.warning("Terminal WebSocket closed with code %s: %s", e.code, e.reason)
 			try:
-				await self.send(text_data=json.dumps({
-					'output': '\r\n\r\nTerminal connection closed. Refresh to reconnect.\r\n'
-				}))
+				await self.send_output('\r\n\r\nTerminal connection closed. Refresh to reconnect.\r\n')
 			except Exception as notify_exc:
 				# Connection might already be closed
 				logger.error("Failed to notify client about closed terminal connection: %s", str(notify_exc))
 		except (ConnectionError, RuntimeError, ValueError) as e:
 			logger.error("Error in forward_from_terminal: %s", str(e), exc_info=True)
 			try:
-				await self.send(text_data=json.dumps({
-					'output': f'\r\n\r\nTerminal error: {str(e)}\r\n'
-				}))
+				await self.send_output(f'\r\n\r\nTerminal error: {str(e)}\r\n')
 			except Exception as notify_exc:
 				# Connection might already be closed
 				logger.error("Failed to notify client about terminal error: %s", str(notify_exc))
@@ -167,17 +238,42 @@ class TerminalConsumer(AsyncWebsocketConsumer):
 				# Connection is likely already closed
 				logger.debug("WebSocket connection already closed: %s", type(e).__name__)
 	
-	async def receive(self, text_data):
+	async def send_output(self, text):
+		"""Send a status line to the browser in whichever framing it negotiated"""
+		if self.binary:
+			await self.send(bytes_data=bytes((OP_OUTPUT,)) + text.encode('utf-8'))
+		else:
+			await self.send(text_data=json.dumps({'output': text}))
+
+	async def send_to_browser(self, message):
+		"""Relay a terminal service frame, translating only if the hops disagree"""
+		if isinstance(message, bytes):
+			if self.binary:
+				await self.send(bytes_data=message)
+			else:
+				await self.send(text_data=binary_to_json(message))
+		elif self.binary:
+			await self.send(bytes_data=json_to_binary(message, outgoing=True))
+		else:
+			await self.send(text_data=message)
+
+	async def receive(self, text_data=None, bytes_data=None):
 		if hasattr(self, 'terminal_ws'):
 			try:
+				if bytes_data is not None:
+					message = bytes_data if self.upstream_binary else binary_to_json(bytes_data)
+				elif self.upstream_binary:
+					message = json_to_binary(text_data, outgoing=False)
+				else:
+					message = text_data
 				# Check connection is still open by attempting to send
-				await self.terminal_ws.send(text_data)
+				await self.terminal_ws.send(message)
+			except (ValueError, TypeError, UnicodeDecodeError, struct.error) as e:
+				logger.warning("Dropping malformed terminal frame: %s", e)
 			except websockets.exceptions.ConnectionClosed:
 				# Handle closed connection
 				logger.warning("Terminal WebSocket closed when trying to send data")
-				await self.send(text_data=json.dumps({
-					'output': '\r\nTerminal connection lost, please refresh.\r\n'
-				}))
+				await self.send_output('\r\nTerminal connection lost, please refresh.\r\n')
 
 class HealthCheckConsumer(AsyncWebsocketConsumer):
 	async def connect(self):
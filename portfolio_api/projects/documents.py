@@ -0,0 +1,160 @@
+# portfolio_api/projects/documents.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core import checks
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from .models import Gallery, GalleryImage, Project, ProjectDocument
+from .response_cache import bump_content_version
+from .serializers import ProjectSerializer
+
+logger = logging.getLogger(__name__)
+
+class DocumentRequest:
+	"""
+	Stands in for the request in the serializer context. Documents are built
+	outside of any request, so relative media URLs are made absolute against
+	PROJECT_DOCUMENT_BASE_URL, or left relative if it is unset; storage URLs
+	on R2 are absolute already.
+	"""
+
+	def build_absolute_uri(self, location):
+		return urljoin(settings.PROJECT_DOCUMENT_BASE_URL, location)
+
+def document_queryset():
+	return Project.objects.prefetch_related(
+		Prefetch('galleries', queryset=Gallery.objects.prefetch_related('images').order_by('order'))
+	)
+
+def render_project(project):
+	"""A project's API representation as JSON text"""
+	data = ProjectSerializer(project, context={'request': DocumentRequest()}).data
+	return JSONRenderer().render(data).decode('utf-8')
+
+def rebuild_document(project_id):
+	"""Materialize one project's document; returns it, or None if the project is gone"""
+	project = document_queryset().filter(pk=project_id).first()
+	if project is None:
+		# Its document was deleted along with it
+		return None
+	document, _ = ProjectDocument.objects.update_or_create(
+		project=project, defaults={'body': render_project(project)}
+	)
+	# Responses cached while the rebuild was pending hold the old document
+	bump_content_version()
+	return document
+
+def rebuild_all_documents():
+	"""Materialize every project's document; returns how many were written"""
+	count = 0
+	for project in document_queryset():
+		ProjectDocument.objects.update_or_create(project=project, defaults={'body': render_project(project)})
+		count += 1
+	bump_content_version()
+	return count
+
+# One worker, so rebuilds of a project never race each other
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='project-documents')
+_pending = set()
+_pending_lock = threading.Lock()
+
+def _rebuild_in_background(project_id):
+	with _pending_lock:
+		# Changes committed from here on queue another rebuild
+		_pending.discard(project_id)
+	try:
+		rebuild_document(project_id)
+	except Exception as e:
+		logger.error("Failed to rebuild document for project %s: %s", project_id, e, exc_info=True)
+	finally:
+		close_old_connections()
+
+def schedule_rebuild(project_id):
+	"""
+	Rebuild a project's document once the current transaction commits, on a
+	background thread unless PROJECT_DOCUMENTS_ASYNC is off. An admin save
+	touches the project and each inline gallery and image, so rebuilds
+	already queued for the project are not queued again.
+	"""
+	def submit():
+		if not settings.PROJECT_DOCUMENTS_ASYNC:
+			rebuild_document(project_id)
+			return
+		with _pending_lock:
+			if project_id in _pending:
+				return
+			_pending.add(project_id)
+		_executor.submit(_rebuild_in_background, project_id)
+	transaction.on_commit(submit, robust=True)
+
+def rebuild_on_change(sender, instance, **kwargs):
+	"""Signal receiver scheduling a rebuild of the project instance belongs to"""
+	if isinstance(instance, Project):
+		project_id = instance.pk
+	elif isinstance(instance, Gallery):
+		project_id = instance.project_id
+	elif isinstance(instance, GalleryImage):
+		project_id = Gallery.objects.filter(pk=instance.gallery_id).values_list('project_id', flat=True).first()
+	else:
+		return
+	if project_id is not None:
+		schedule_rebuild(project_id)
+
+def project_document(**filters):
+	"""Stored document body of the project matching filters, or None"""
+	return ProjectDocument.objects.filter(**{f'project__{k}': v for k, v in filters.items()}).values_list(
+		'body', flat=True
+	).first()
+
+def documents_response(queryset):
+	"""
+	JSON array of the documents of the projects in queryset, in its order.
+	Projects whose document hasn't been built yet are serialized live.
+	"""
+	rows = list(queryset.values_list('pk', 'document__body'))
+	missing = [pk for pk, body in rows if body is None]
+	if missing:
+		live = {project.pk: render_project(project) for project in document_queryset().filter(pk__in=missing)}
+		for pk in missing:
+			schedule_rebuild(pk)
+		rows = [(pk, body if body is not None else live[pk]) for pk, body in rows]
+	body = '[' + ','.join(body for _, body in rows) + ']'
+	return HttpResponse(body.encode('utf-8'), content_type='application/json')
+
+def document_response(body):
+	return HttpResponse(body.encode('utf-8'), content_type='application/json')
+
+def stale_documents():
+	"""Slugs of projects whose document is missing or differs from the live serializer output"""
+	documents = dict(ProjectDocument.objects.values_list('project_id', 'body'))
+	return [
+		project.slug for project in document_queryset().order_by('slug')
+		if documents.get(project.pk) != render_project(project)
+	]
+
+@checks.register(checks.Tags.database)
+def check_project_documents(app_configs=None, databases=None, **kwargs):
+	"""Reported by `manage.py check --database default`"""
+	if not databases:
+		return []
+	try:
+		stale = stale_documents()
+	except DatabaseError:
+		# Tables not migrated yet
+		return []
+	return [
+		checks.Warning(
+			f"Materialized document for project '{slug}' is missing or out of date",
+			hint="Run `manage.py rebuild_project_documents`.",
+			id='projects.W001',
+		)
+		for slug in stale
+	]
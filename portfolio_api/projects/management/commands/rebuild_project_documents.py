@@ -0,0 +1,36 @@
+# portfolio_api/projects/management/commands/rebuild_project_documents.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.documents import rebuild_all_documents, rebuild_document, stale_documents
+from projects.models import Project
+
+
+class Command(BaseCommand):
+	help = 'Rebuild the materialized JSON documents served by the project endpoints'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--slug', help='Only rebuild the document of this project')
+		parser.add_argument('--check', action='store_true',
+			help="Don't rebuild; fail if any document differs from the live serializer output")
+
+	def handle(self, *args, **options):
+		if options['check']:
+			stale = stale_documents()
+			for slug in stale:
+				self.stderr.write(f"Stale document: {slug}")
+			if stale:
+				raise CommandError(f"{len(stale)} project document(s) out of date")
+			self.stdout.write(self.style.SUCCESS("All project documents are up to date"))
+			return
+
+		if options['slug']:
+			project = Project.objects.filter(slug=options['slug']).first()
+			if project is None:
+				raise CommandError(f"No project with slug {options['slug']}")
+			rebuild_document(project.pk)
+			self.stdout.write(self.style.SUCCESS(f"Rebuilt document for {project.slug}"))
+			return
+
+		count = rebuild_all_documents()
+		self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} project documents"))
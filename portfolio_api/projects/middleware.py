@@ -1,9 +1,16 @@
 # portfolio_api/middleware.py
 
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
 from django.utils.deprecation import MiddlewareMixin
 from django.http import HttpResponseForbidden
 from django.core.cache import cache
 
+logger = logging.getLogger(__name__)
+
 class TerminalSecurityMiddleware:
 	def __init__(self, get_response):
 		self.get_response = get_response
@@ -60,4 +67,67 @@ class SecurityHeadersMiddleware(MiddlewareMixin):
 			response['X-RateLimit-Remaining'] = str(60 - count)
 		else:
 			response['X-RateLimit-Remaining'] = '60'
-		return response
\ No newline at end of file
+		return response
+
+class QueryRecorder:
+	"""Database execute wrapper counting and timing the statements it runs"""
+
+	def __init__(self):
+		self.count = 0
+		self.seconds = 0.0
+		self.slowest = 0.0
+		self.statements = set()
+
+	def __call__(self, execute, sql, params, many, context):
+		started = time.perf_counter()
+		try:
+			return execute(sql, params, many, context)
+		finally:
+			elapsed = time.perf_counter() - started
+			self.count += 1
+			self.seconds += elapsed
+			self.slowest = max(self.slowest, elapsed)
+			self.statements.add(sql)
+
+	@property
+	def repeated(self):
+		"""Statements that ran again with other parameters, the usual sign of an N+1"""
+		return self.count - len(self.statements)
+
+class QueryDiagnosticsMiddleware:
+	"""
+	Request-scoped database diagnostics.
+
+	Enabled for every request by the QUERY_DIAGNOSTICS setting, or for one
+	request by sending "X-Query-Diagnostics: 1" when DEBUG is on or the user
+	is staff. Records the queries the request actually ran, without adding
+	any, then logs their count and timings and returns them in X-Query-*
+	response headers. SQL text is never exposed.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def enabled(self, request):
+		if settings.QUERY_DIAGNOSTICS:
+			return True
+		if request.META.get('HTTP_X_QUERY_DIAGNOSTICS') != '1':
+			return False
+		user = getattr(request, 'user', None)
+		return settings.DEBUG or bool(user is not None and user.is_staff)
+
+	def __call__(self, request):
+		if not self.enabled(request):
+			return self.get_response(request)
+		recorder = QueryRecorder()
+		with connection.execute_wrapper(recorder):
+			response = self.get_response(request)
+		response['X-Query-Count'] = str(recorder.count)
+		response['X-Query-Repeated'] = str(recorder.repeated)
+		response['X-Query-Time-Ms'] = f"{recorder.seconds * 1000:.1f}"
+		logger.info(
+			"Query diagnostics for %s %s: %d queries (%d repeated) in %.1f ms, slowest %.1f ms",
+			request.method, request.path, recorder.count, recorder.repeated,
+			recorder.seconds * 1000, recorder.slowest * 1000,
+		)
+		return response
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_add_project_type_and_internship_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectDocument',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='projects.project')),
+                ('body', models.TextField(help_text='Serialized project JSON')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
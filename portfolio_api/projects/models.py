@@ -196,6 +196,24 @@ class GalleryImage(models.Model):
 	def __str__(self):
 		return f"Image {self.order} of {self.gallery}"
 
+class ProjectDocument(models.Model):
+	"""
+	Materialized API representation of a project: the serialized JSON with
+	its galleries and images, rebuilt whenever any of them change, so read
+	endpoints can return it without walking the relations.
+	"""
+	project = models.OneToOneField(
+		Project,
+		on_delete=models.CASCADE,
+		primary_key=True,
+		related_name='document'
+	)
+	body = models.TextField(help_text="Serialized project JSON")
+	updated_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return f"Document for {self.project_id}"
+
 class ContactSubmission(models.Model):
 	name = models.CharField(max_length=100)
 	email = models.EmailField()
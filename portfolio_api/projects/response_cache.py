@@ -0,0 +1,100 @@
+# portfolio_api/projects/response_cache.py
+
+import hashlib
+import logging
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever project content changes; part of every cached response key
+CONTENT_VERSION_KEY = 'projects:content-version'
+RESPONSE_KEY_PREFIX = 'projects:response'
+
+def content_version():
+	"""Current project content version, starting at 1"""
+	version = cache.get(CONTENT_VERSION_KEY)
+	if version is None:
+		cache.add(CONTENT_VERSION_KEY, 1, timeout=None)
+		version = cache.get(CONTENT_VERSION_KEY, 1)
+	return version
+
+def bump_content_version():
+	"""Invalidate every cached project response at once"""
+	try:
+		return cache.incr(CONTENT_VERSION_KEY)
+	except ValueError:
+		# Key missing, e.g. after a cache flush: any fresh value orphans old entries
+		cache.add(CONTENT_VERSION_KEY, 2, timeout=None)
+		return cache.get(CONTENT_VERSION_KEY)
+
+def invalidate_on_commit(sender, **kwargs):
+	"""
+	Signal receiver for content changes. The bump waits for the commit so a
+	concurrent request can't cache the old rows under the new version.
+	"""
+	transaction.on_commit(bump_content_version, robust=True)
+
+def response_cache_key(request, version):
+	# Responses embed absolute URIs, so the scheme and host are part of the key
+	query = urlencode(sorted(request.GET.lists()), doseq=True)
+	url = f"{request.scheme}://{request.get_host()}{request.path}?{query}"
+	return f"{RESPONSE_KEY_PREFIX}:{version}:{hashlib.sha256(url.encode()).hexdigest()}"
+
+def etag_matches(request, etag):
+	header = request.META.get('HTTP_IF_NONE_MATCH', '')
+	return any(tag.strip() in (etag, '*') for tag in header.split(','))
+
+def cached_response(request, build):
+	"""
+	Serve a JSON API response from the versioned response cache.
+
+	build() returns the response to use on a miss: a DRF Response, or an
+	HttpResponse whose content is already JSON. Successful responses
+	are rendered once and stored as bytes under the current content version,
+	with an ETag derived from the body, so repeat visitors presenting it in
+	If-None-Match get a 304. Only GETs negotiated to JSON are cached.
+	"""
+	renderer = getattr(request, 'accepted_renderer', None)
+	if request.method != 'GET' or getattr(renderer, 'format', None) != 'json':
+		return build()
+
+	try:
+		key = response_cache_key(request, content_version())
+		entry = cache.get(key)
+	except Exception as e:
+		# Redis being down must not take the API with it
+		logger.warning("Response cache unavailable: %s", e)
+		return build()
+	if entry is None:
+		response = build()
+		if response.status_code != 200:
+			return response
+		if isinstance(response, Response):
+			body = JSONRenderer().render(response.data)
+		else:
+			body = response.content
+		entry = {'body': body, 'etag': f'"{hashlib.sha256(body).hexdigest()[:32]}"'}
+		try:
+			cache.set(key, entry, settings.PROJECT_RESPONSE_CACHE_TIMEOUT)
+		except Exception as e:
+			logger.warning("Failed to cache response for %s: %s", request.path, e)
+		hit = False
+	else:
+		hit = True
+
+	if etag_matches(request, entry['etag']):
+		response = HttpResponseNotModified()
+	else:
+		response = HttpResponse(entry['body'], content_type='application/json')
+	response['ETag'] = entry['etag']
+	# Always revalidate: content can change at any time, but a 304 is cheap
+	response['Cache-Control'] = 'no-cache'
+	response['X-Cache'] = 'HIT' if hit else 'MISS'
+	return response
@@ -78,7 +78,42 @@ def validate_code_snippets(data):
 	
 	return result
 
-class ProjectSerializer(serializers.ModelSerializer):
+def sparse_fieldset(query_params):
+	"""Field names in the comma-separated ?fields= and ?exclude= parameters, None where absent"""
+	def names(param):
+		value = query_params.get(param)
+		return None if value is None else {name.strip() for name in value.split(',') if name.strip()}
+	return names('fields'), names('exclude')
+
+class SparseFieldsetMixin:
+	"""
+	Model serializer mixin taking `fields` and `exclude` keyword arguments
+	that drop fields from its output. model_columns() then gives the columns
+	the remaining fields read, for .only(); column_sources names those of
+	method fields, whose source the serializer can't know.
+	"""
+	column_sources = {}
+
+	def __init__(self, *args, fields=None, exclude=None, **kwargs):
+		super().__init__(*args, **kwargs)
+		for name in list(self.fields):
+			if (fields is not None and name not in fields) or (exclude is not None and name in exclude):
+				self.fields.pop(name)
+
+	def model_columns(self):
+		opts = self.Meta.model._meta
+		concrete = {field.name for field in opts.concrete_fields}
+		columns = [opts.pk.name]
+		for name, field in self.fields.items():
+			if field.write_only:
+				continue
+			for source in self.column_sources.get(name, (field.source,)):
+				column = source.split('.')[0]
+				if column in concrete and column not in columns:
+					columns.append(column)
+		return columns
+
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 	thumbnail_url = serializers.SerializerMethodField()
 	galleries = GallerySerializer(many=True, read_only=True, source='galleries.all')
 	tech_stack = serializers.JSONField()
@@ -87,6 +122,7 @@ class ProjectSerializer(serializers.ModelSerializer):
 	stats = serializers.JSONField(required=False)
 	badges = serializers.JSONField(required=False)
 	impact_metrics = serializers.JSONField(required=False)
+	column_sources = {'thumbnail_url': ('thumbnail',)}
 	
 	class Meta:
 		model = Project
@@ -115,6 +151,20 @@ class ProjectSerializer(serializers.ModelSerializer):
 	def validate_code_steps(self, data):
 		return validate_code_steps(data)
 
+class ProjectListSerializer(ProjectSerializer):
+	"""
+	Compact project representation for cards and listings, without the
+	README, code, demo and gallery fields of the detail page
+	"""
+
+	class Meta(ProjectSerializer.Meta):
+		fields = [
+			'id', 'title', 'slug', 'description', 'tech_stack', 'thumbnail',
+			'thumbnail_url', 'live_url', 'code_url', 'is_featured', 'score',
+			'has_interactive_demo', 'project_type', 'company', 'role',
+			'stats', 'badges',
+		]
+
 class ContactSubmissionSerializer(serializers.ModelSerializer):
 	class Meta:
 		model = ContactSubmission
@@ -249,5 +299,6 @@ class InternshipListSerializer(serializers.ModelSerializer):
 		return f"{start} - {end}"
 	
 	def get_project_count(self, obj):
-		"""Return number of projects in this internship"""
-		return obj.projects.count()
\ No newline at end of file
+		"""Return number of projects in this internship, annotated by InternshipViewSet"""
+		count = getattr(obj, 'project_count', None)
+		return obj.projects.count() if count is None else count
\ No newline at end of file
@@ -0,0 +1,16 @@
+# portfolio_api/projects/signals.py
+
+from django.db.models.signals import post_delete, post_save
+
+from .documents import rebuild_on_change
+from .models import Gallery, GalleryImage, Project
+from .response_cache import invalidate_on_commit
+
+# Models whose rows end up in project documents and cached responses
+CACHED_CONTENT_MODELS = (Project, Gallery, GalleryImage)
+
+for model in CACHED_CONTENT_MODELS:
+	post_save.connect(invalidate_on_commit, sender=model, dispatch_uid=f'invalidate-{model.__name__}-save')
+	post_delete.connect(invalidate_on_commit, sender=model, dispatch_uid=f'invalidate-{model.__name__}-delete')
+	post_save.connect(rebuild_on_change, sender=model, dispatch_uid=f'rebuild-{model.__name__}-save')
+	post_delete.connect(rebuild_on_change, sender=model, dispatch_uid=f'rebuild-{model.__name__}-delete')
@@ -14,7 +14,7 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.mail import send_mail
 from django.core.validators import validate_email
-from django.db.models import Prefetch
+from django.db.models import Count, Prefetch
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.decorators import method_decorator
@@ -26,13 +26,17 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from .documents import document_response, documents_response, project_document, schedule_rebuild
 from .models import Gallery, Internship, InternshipProject, Project
+from .response_cache import cached_response
 from .serializers import (
 	ContactSubmissionSerializer,
 	InternshipListSerializer,
 	InternshipProjectSerializer,
 	InternshipSerializer,
+	ProjectListSerializer,
 	ProjectSerializer,
+	sparse_fieldset,
 )
 from .storage import CustomS3Storage
 
@@ -53,36 +57,17 @@ class ProjectDetail(generics.RetrieveAPIView):
 	serializer_class = ProjectSerializer
 
 	def retrieve(self, request, *args, **kwargs):
+		body = project_document(slug=kwargs[self.lookup_field])
+		if body is not None:
+			return document_response(body)
 		instance = self.get_object()
-		
-		# Detailed logging for the ft_transcendence project specifically
-		if instance.slug == 'ft_transcendence':
-			logger.info("============ FT_TRANSCENDENCE PROJECT DATA ============")
-			logger.info("Title: %s", instance.title)
-			logger.info("Slug: %s", instance.slug)
-			logger.info("Thumbnail: %s", instance.thumbnail)
-
-			# Log galleries and their images
-			galleries = instance.galleries.all().prefetch_related('images')
-			logger.info("Number of galleries: %d", galleries.count())
-
-			for i, gallery in enumerate(galleries):
-				logger.info("Gallery %d: %s", i+1, gallery.name)
-				logger.info("Gallery images count: %d", gallery.images.count())
-
-				for j, image in enumerate(gallery.images.all()):
-					logger.info("  Image %d: %s", j+1, image.image)
-					logger.info("  Image URL: %s", image.image.url)
-					logger.info("  Image path: %s", image.image.name)
-
-			# Log live URL which should contain a valid link
-			logger.info("Live URL: %s", instance.live_url)
-			logger.info("Has interactive demo: %s", instance.has_interactive_demo)
-			logger.info("============ END PROJECT DATA ============")
-		
+		schedule_rebuild(instance.pk)
 		serializer = self.get_serializer(instance)
 		return Response(serializer.data)
 
+	def get(self, request, *args, **kwargs):
+		return cached_response(request, lambda: self.retrieve(request, *args, **kwargs))
+
 @api_view(['GET', 'POST'])
 @ratelimit(key='ip', rate='60/m')
 def project_by_slug(request):
@@ -94,12 +79,18 @@ def project_by_slug(request):
 	if not slug:
 		return Response({'error': 'Slug is required'}, status=400)
 	
-	project = get_object_or_404(
-		Project.objects.prefetch_related('galleries__images'),
-		slug=slug
-	)
-	serializer = ProjectSerializer(project, context={'request': request})
-	return Response(serializer.data)
+	def build():
+		body = project_document(slug=slug)
+		if body is not None:
+			return document_response(body)
+		project = get_object_or_404(
+			Project.objects.prefetch_related('galleries__images'),
+			slug=slug
+		)
+		schedule_rebuild(project.pk)
+		serializer = ProjectSerializer(project, context={'request': request})
+		return Response(serializer.data)
+	return cached_response(request, build)
 
 class ContactSubmissionView(APIView):
 	permission_classes = [AllowAny]
@@ -324,6 +315,30 @@ class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
 		
 		return queryset
 
+	def list(self, request, *args, **kwargs):
+		fields, exclude = sparse_fieldset(request.query_params)
+		compact = request.query_params.get('compact', 'false').lower() == 'true'
+		if fields is None and exclude is None and not compact:
+			# Materialized documents, so listing never walks galleries and images
+			return cached_response(request, lambda: documents_response(self.get_queryset()))
+		serializer_class = ProjectListSerializer if compact else ProjectSerializer
+		return cached_response(request, lambda: self.sparse_list(serializer_class, fields, exclude))
+
+	def sparse_list(self, serializer_class, fields, exclude):
+		"""
+		?compact=true and ?fields=/?exclude= are serialized live, loading only
+		the columns the chosen fields read, so the README, code and demo
+		columns stay in the database unless asked for.
+		"""
+		kwargs = {'context': self.get_serializer_context(), 'fields': fields, 'exclude': exclude}
+		serializer = serializer_class(**kwargs)
+		queryset = self.get_queryset().only(*serializer.model_columns())
+		if 'galleries' in serializer.fields:
+			queryset = queryset.prefetch_related(
+				Prefetch('galleries', queryset=Gallery.objects.prefetch_related('images').order_by('order'))
+			)
+		return Response(serializer_class(queryset, many=True, **kwargs).data)
+
 @api_view(['GET'])
 @permission_classes([AllowAny])  # Allow anonymous access for demo terminal
 def generate_terminal_token(request):
@@ -359,6 +374,12 @@ def generate_terminal_token(request):
 	return Response({'token': token})
 
 
+# Columns InternshipListSerializer reads; the large JSON ones are left in the database
+INTERNSHIP_LIST_COLUMNS = (
+	'id', 'company', 'role', 'subtitle', 'slug', 'start_date', 'end_date',
+	'overview', 'stats', 'is_active', 'order',
+)
+
 class InternshipViewSet(viewsets.ReadOnlyModelViewSet):
 	"""
 	ViewSet for internship experiences
@@ -373,7 +394,13 @@ class InternshipViewSet(viewsets.ReadOnlyModelViewSet):
 	
 	def get_queryset(self):
 		"""Return only active internships, ordered by order field"""
-		return Internship.objects.filter(is_active=True).prefetch_related('projects')
+		queryset = Internship.objects.filter(is_active=True)
+		if self.action == 'list':
+			# Only the card columns, with projects counted in the same query
+			return queryset.only(*INTERNSHIP_LIST_COLUMNS).annotate(project_count=Count('projects'))
+		return queryset.prefetch_related(
+			Prefetch('projects', queryset=InternshipProject.objects.order_by('order', 'title'))
+		)
 	
 	def get_serializer_class(self):
 		"""Use lightweight serializer for list, full serializer for detail"""
@@ -29,8 +29,46 @@ def make_project(**kwargs):
     return project
 
 
+def make_internship(**kwargs):
+    """Create an active Internship. Pass keyword arguments to override defaults."""
+    import datetime
+
+    from projects.models import Internship
+
+    defaults = {
+        'company': 'Acme Corp',
+        'role': 'Backend Engineer',
+        'subtitle': 'Building internal tools',
+        'start_date': datetime.date(2025, 5, 1),
+        'overview': 'An internship.',
+    }
+    defaults.update(kwargs)
+    return Internship.objects.create(**defaults)
+
+
+def make_internship_project(internship, **kwargs):
+    """Create an InternshipProject belonging to internship."""
+    from projects.models import InternshipProject
+
+    defaults = {
+        'title': 'Internship Tool',
+        'description': 'A tool built during the internship.',
+    }
+    defaults.update(kwargs)
+    return InternshipProject.objects.create(internship=internship, **defaults)
+
+
 # ─────────────────────────── fixtures ────────────────────────────────────────
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache, so cached API responses don't leak between tests."""
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     """A DRF APIClient ready to make requests."""
@@ -0,0 +1,141 @@
+# tests/integration/test_project_documents.py
+"""Integration tests for materialized project documents."""
+
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from projects import documents
+from projects.models import Gallery, GalleryImage, ProjectDocument
+from tests.conftest import make_project
+
+
+@pytest.fixture
+def on_commit(django_capture_on_commit_callbacks):
+    """Run on_commit callbacks, which the test transaction would otherwise hold back."""
+    return lambda: django_capture_on_commit_callbacks(execute=True)
+
+
+@pytest.mark.django_db
+class TestDocumentRebuilds:
+
+    def test_saving_a_project_materializes_its_document(self, on_commit):
+        with on_commit():
+            project = make_project(title='Minishell', is_featured=True)
+        document = ProjectDocument.objects.get(project=project)
+        assert json.loads(document.body)['title'] == 'Minishell'
+
+    def test_gallery_and_image_changes_rebuild_the_project(self, on_commit):
+        with on_commit():
+            project = make_project(title='Cub3D')
+        with on_commit():
+            gallery = Gallery.objects.create(project=project, name='Screens')
+            GalleryImage.objects.create(gallery=gallery, image='galleries/a.png', caption='Raycaster')
+        body = json.loads(ProjectDocument.objects.get(project=project).body)
+        image = body['galleries'][0]['images'][0]
+        assert image['caption'] == 'Raycaster'
+        assert image['image_url'].endswith('/galleries/a.png')
+
+        with on_commit():
+            gallery.delete()
+        assert json.loads(ProjectDocument.objects.get(project=project).body)['galleries'] == []
+
+    def test_deleting_a_project_deletes_its_document(self, on_commit):
+        with on_commit():
+            project = make_project(title='FDF')
+        with on_commit():
+            project.delete()
+        assert not ProjectDocument.objects.exists()
+
+    def test_media_urls_stay_relative_without_a_base_url(self, settings):
+        settings.PROJECT_DOCUMENT_BASE_URL = ''
+        assert documents.DocumentRequest().build_absolute_uri('/media/a.png') == '/media/a.png'
+        settings.PROJECT_DOCUMENT_BASE_URL = 'http://localhost:8000/'
+        assert documents.DocumentRequest().build_absolute_uri('/media/a.png') == 'http://localhost:8000/media/a.png'
+
+    def test_queued_rebuilds_of_a_project_are_not_repeated(self, settings, monkeypatch, on_commit):
+        settings.PROJECT_DOCUMENTS_ASYNC = True
+        submitted = []
+        monkeypatch.setattr(documents._executor, 'submit', lambda fn, pk: submitted.append(pk))
+        monkeypatch.setattr(documents, '_pending', set())
+        with on_commit():
+            project = make_project(title='Push Swap')
+            for i in range(3):
+                Gallery.objects.create(project=project, name=f'Gallery {i}')
+        assert submitted == [project.pk]
+
+
+@pytest.mark.django_db
+class TestDocumentEndpoints:
+
+    def test_detail_is_served_from_the_document_in_one_query(self, api_client, on_commit, django_assert_num_queries):
+        with on_commit():
+            project = make_project(title='Philosophers')
+            gallery = Gallery.objects.create(project=project, name='Screens')
+            GalleryImage.objects.create(gallery=gallery, image='galleries/p.png')
+        url = reverse('project-detail', kwargs={'slug': project.slug})
+        with django_assert_num_queries(1):
+            response = api_client.get(url)
+        assert response.json()['galleries'][0]['images'][0]['image_url'].endswith('/galleries/p.png')
+
+    def test_list_is_served_from_documents_in_one_query(self, api_client, on_commit, django_assert_num_queries):
+        with on_commit():
+            for i in range(5):
+                project = make_project(title=f'Project {i}', is_featured=True, score=i)
+                Gallery.objects.create(project=project, name='Screens')
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse('project-list'))
+        assert [p['title'] for p in response.json()] == [f'Project {i}' for i in reversed(range(5))]
+
+    def test_documents_match_the_live_serializer(self, api_client, on_commit):
+        with on_commit():
+            project = make_project(title='Minitalk', is_featured=True, tech_stack=['C'], readme='# Minitalk')
+            gallery = Gallery.objects.create(project=project, name='Screens')
+            GalleryImage.objects.create(gallery=gallery, image='galleries/m.png')
+        from projects.serializers import ProjectSerializer
+        from rest_framework.test import APIRequestFactory
+        request = APIRequestFactory().get('/')
+        live = ProjectSerializer(documents.document_queryset().get(pk=project.pk), context={'request': request}).data
+        served = api_client.get(reverse('project-detail', kwargs={'slug': project.slug})).json()
+        assert served == json.loads(json.dumps(live))
+
+    def test_projects_without_a_document_are_serialized_live(self, api_client):
+        make_project(title='Late', is_featured=True)
+        data = api_client.get(reverse('project-list')).json()
+        assert [p['title'] for p in data] == ['Late']
+
+
+@pytest.mark.django_db
+class TestDocumentChecks:
+
+    def test_stale_documents_are_reported(self, on_commit):
+        with on_commit():
+            project = make_project(title='Libft')
+        assert documents.stale_documents() == []
+        ProjectDocument.objects.filter(project=project).update(body='{}')
+        assert documents.stale_documents() == ['libft']
+        warnings = documents.check_project_documents(databases=['default'])
+        assert [w.id for w in warnings] == ['projects.W001']
+        assert documents.check_project_documents() == []
+
+    def test_command_rebuilds_and_checks(self):
+        make_project(title='Libft')
+        make_project(title='Get Next Line')
+        with pytest.raises(CommandError):
+            call_command('rebuild_project_documents', '--check', stderr=io.StringIO())
+
+        out = io.StringIO()
+        call_command('rebuild_project_documents', stdout=out)
+        assert 'Rebuilt 2 project documents' in out.getvalue()
+        call_command('rebuild_project_documents', '--check', stdout=io.StringIO())
+
+    def test_command_rebuilds_one_project(self):
+        make_project(title='Libft')
+        call_command('rebuild_project_documents', '--slug', 'libft', stdout=io.StringIO())
+        assert ProjectDocument.objects.filter(project__slug='libft').exists()
+        with pytest.raises(CommandError):
+            call_command('rebuild_project_documents', '--slug', 'nope', stdout=io.StringIO())
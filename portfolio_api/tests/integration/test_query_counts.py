@@ -0,0 +1,185 @@
+# tests/integration/test_query_counts.py
+"""Query-count regression tests for every endpoint in projects/urls.py."""
+
+import datetime
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from projects.documents import rebuild_all_documents
+from projects.models import Gallery, GalleryImage, Internship, InternshipProject
+from tests.conftest import make_internship, make_internship_project, make_project
+
+
+@pytest.fixture
+def projects_with_galleries(db):
+    """Several featured projects, each with galleries of images, so N+1s show up."""
+    projects = []
+    for i in range(4):
+        project = make_project(title=f'Project {i}', is_featured=True, score=i)
+        for g in range(2):
+            gallery = Gallery.objects.create(project=project, name=f'Gallery {g}', order=g)
+            for n in range(3):
+                GalleryImage.objects.create(gallery=gallery, image=f'galleries/{i}-{g}-{n}.png', order=n)
+        projects.append(project)
+    return projects
+
+
+@pytest.fixture
+def internships(db):
+    """Several active internships with a few projects each."""
+    result = []
+    for i in range(3):
+        internship = make_internship(company=f'Company {i}', order=i)
+        for p in range(3):
+            make_internship_project(internship, title=f'Tool {i}-{p}', order=p)
+        result.append(internship)
+    return result
+
+
+@pytest.fixture
+def internship_factory(db):
+    """Bulk-create `count` active internships with `projects` projects each."""
+
+    def create(count, projects=5):
+        internships = Internship.objects.bulk_create([
+            Internship(
+                company=f'Company {i}', role='Engineer', subtitle='Subtitle',
+                slug=f'company-{i}', start_date=datetime.date(2025, 1, 1),
+                overview='Overview', order=i, code_samples=[{'code': 'x' * 1000}],
+            )
+            for i in range(count)
+        ])
+        InternshipProject.objects.bulk_create([
+            InternshipProject(
+                internship=internship, title=f'Tool {p}', slug=f'tool-{p}',
+                description='Description', order=p,
+            )
+            for internship in internships for p in range(projects)
+        ])
+        return internships
+    return create
+
+
+@pytest.mark.django_db
+class TestProjectEndpointQueries:
+
+    def test_debug_view(self, api_client, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert api_client.get(reverse('debug')).status_code == 200
+
+    def test_project_list_from_documents(self, api_client, projects_with_galleries, django_assert_num_queries):
+        rebuild_all_documents()
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse('project-list'))
+        assert len(response.json()) == 4
+
+    def test_project_list_without_documents(self, api_client, projects_with_galleries, django_assert_num_queries):
+        # Listing, then the projects, galleries and images for live serialization
+        with django_assert_num_queries(4):
+            response = api_client.get(reverse('project-list'))
+        assert len(response.json()[0]['galleries'][1]['images']) == 3
+
+    def test_compact_project_list(self, api_client, projects_with_galleries, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse('project-list'), {'compact': 'true'})
+        assert 'galleries' not in response.json()[0]
+
+    def test_sparse_project_list_with_galleries(self, api_client, projects_with_galleries, django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = api_client.get(reverse('project-list'), {'fields': 'title,galleries'})
+        assert len(response.json()[0]['galleries']) == 2
+
+    def test_project_detail_from_document(self, api_client, projects_with_galleries, django_assert_num_queries):
+        rebuild_all_documents()
+        url = reverse('project-detail', kwargs={'slug': projects_with_galleries[0].slug})
+        with django_assert_num_queries(1):
+            assert api_client.get(url).status_code == 200
+
+    def test_project_detail_without_document(self, api_client, projects_with_galleries, django_assert_num_queries):
+        url = reverse('project-detail', kwargs={'slug': projects_with_galleries[0].slug})
+        # Document lookup, then the project, galleries and images
+        with django_assert_num_queries(4):
+            response = api_client.get(url)
+        assert len(response.json()['galleries']) == 2
+
+    def test_cached_project_detail(self, api_client, projects_with_galleries, django_assert_num_queries):
+        url = reverse('project-detail', kwargs={'slug': projects_with_galleries[0].slug})
+        api_client.get(url)
+        with django_assert_num_queries(0):
+            assert api_client.get(url).status_code == 200
+
+    def test_contact_submission(self, api_client, django_assert_num_queries):
+        with mock.patch('projects.views.threading.Thread'), django_assert_num_queries(1):
+            response = api_client.post(reverse('contact-submission'), {
+                'name': 'Visitor', 'email': 'visitor@example.com', 'message': 'Hello!',
+            }, format='json')
+        assert response.status_code == 201
+
+    def test_project_files(self, api_client, project, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse('project-files', kwargs={'slug': project.slug}))
+        assert response.status_code == 404
+
+    def test_import_data(self, api_client, django_assert_num_queries):
+        with mock.patch('django.core.management.call_command'), django_assert_num_queries(0):
+            assert api_client.post('/api/import-data/').status_code == 200
+
+    def test_health(self, api_client, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert api_client.get(reverse('health-check')).status_code == 200
+
+    def test_terminal_token(self, api_client, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert api_client.get(reverse('terminal_token')).status_code == 200
+
+
+@pytest.mark.django_db
+class TestInternshipEndpointQueries:
+
+    def test_internship_list(self, api_client, internships, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse('internship-list'))
+        assert [i['project_count'] for i in response.json()] == [3, 3, 3]
+
+    @pytest.mark.parametrize('url_name', ['internship-list', 'internship-detail'])
+    def test_query_count_does_not_grow_with_data(self, api_client, internship_factory, url_name):
+        def queries(count, projects):
+            Internship.objects.all().delete()
+            internships = internship_factory(count, projects)
+            kwargs = {'slug': internships[0].slug} if url_name == 'internship-detail' else {}
+            with CaptureQueriesContext(connection) as captured:
+                assert api_client.get(reverse(url_name, kwargs=kwargs)).status_code == 200
+            return len(captured)
+
+        assert queries(2, 2) == queries(50, 20)
+
+    def test_internship_list_leaves_large_columns_unloaded(self, api_client, internship_factory):
+        internship_factory(1)
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(reverse('internship-list'))
+        assert 'code_samples' not in captured[0]['sql']
+        assert 'code_samples' not in response.json()[0]
+
+    def test_internship_detail(self, api_client, internships, django_assert_num_queries):
+        url = reverse('internship-detail', kwargs={'slug': internships[0].slug})
+        with django_assert_num_queries(2):
+            response = api_client.get(url)
+        assert [p['title'] for p in response.json()['projects']] == ['Tool 0-0', 'Tool 0-1', 'Tool 0-2']
+
+    def test_internship_project_list(self, api_client, internships, django_assert_num_queries):
+        url = reverse('internship-project-list', kwargs={'internship_slug': internships[0].slug})
+        with django_assert_num_queries(1):
+            response = api_client.get(url)
+        assert [p['internship_company'] for p in response.json()] == ['Company 0'] * 3
+
+    def test_internship_project_detail(self, api_client, internships, django_assert_num_queries):
+        project = internships[0].projects.first()
+        url = reverse('internship-project-detail', kwargs={
+            'internship_slug': internships[0].slug, 'slug': project.slug,
+        })
+        with django_assert_num_queries(1):
+            assert api_client.get(url).status_code == 200
@@ -0,0 +1,58 @@
+# tests/integration/test_query_diagnostics.py
+"""Integration tests for request-scoped query diagnostics."""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from projects.middleware import QueryRecorder
+from tests.conftest import make_project
+
+
+@pytest.mark.django_db
+class TestQueryDiagnosticsMiddleware:
+
+    def test_header_enables_diagnostics_in_debug(self, api_client, project, settings):
+        settings.DEBUG = True
+        url = reverse('project-detail', kwargs={'slug': project.slug})
+        response = api_client.get(url, HTTP_X_QUERY_DIAGNOSTICS='1')
+        # Document lookup, then the project and its (empty) galleries
+        assert response['X-Query-Count'] == '3'
+        assert response['X-Query-Repeated'] == '0'
+        assert float(response['X-Query-Time-Ms']) >= 0
+
+    def test_off_by_default(self, api_client, project):
+        response = api_client.get(reverse('project-detail', kwargs={'slug': project.slug}))
+        assert 'X-Query-Count' not in response
+
+    def test_header_is_ignored_for_anonymous_users_outside_debug(self, api_client, project, settings):
+        settings.DEBUG = False
+        response = api_client.get(reverse('health-check'), HTTP_X_QUERY_DIAGNOSTICS='1')
+        assert 'X-Query-Count' not in response
+
+    def test_header_works_for_staff_outside_debug(self, api_client, settings):
+        settings.DEBUG = False
+        staff = get_user_model().objects.create_user('admin', password='pw', is_staff=True)
+        api_client.force_login(staff)
+        response = api_client.get(reverse('health-check'), HTTP_X_QUERY_DIAGNOSTICS='1')
+        assert response['X-Query-Count'] == '0'
+
+    def test_setting_enables_diagnostics_for_every_request(self, api_client, settings, caplog):
+        settings.QUERY_DIAGNOSTICS = True
+        make_project(title='Libft', is_featured=True)
+        with caplog.at_level('INFO', logger='projects.middleware'):
+            response = api_client.get(reverse('project-list'))
+        assert int(response['X-Query-Count']) >= 1
+        assert 'Query diagnostics for GET /api/projects/' in caplog.text
+
+
+class TestQueryRecorder:
+
+    def test_counts_repeated_statements(self):
+        recorder = QueryRecorder()
+        execute = lambda sql, params, many, context: None
+        for params in ((1,), (2,), (3,)):
+            recorder(execute, 'SELECT * FROM t WHERE id = %s', params, False, {})
+        recorder(execute, 'SELECT 1', (), False, {})
+        assert recorder.count == 4
+        assert recorder.repeated == 2
@@ -0,0 +1,89 @@
+# tests/integration/test_response_cache.py
+"""Integration tests for the versioned project response cache."""
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+
+from projects import views
+from projects.models import Gallery
+from projects.response_cache import bump_content_version, content_version
+from tests.conftest import make_project
+
+
+@pytest.mark.django_db
+class TestProjectResponseCache:
+
+    def test_repeat_requests_are_served_from_cache(self, api_client, django_assert_num_queries):
+        make_project(title='Minishell', is_featured=True)
+        url = reverse('project-list')
+        first = api_client.get(url)
+        assert first['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            second = api_client.get(url)
+        assert second['X-Cache'] == 'HIT'
+        assert second.content == first.content
+        assert second.json()[0]['title'] == 'Minishell'
+
+    def test_matching_etag_gets_304(self, api_client):
+        project = make_project(title='Push Swap')
+        url = reverse('project-detail', kwargs={'slug': project.slug})
+        first = api_client.get(url)
+        etag = first['ETag']
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert response.content == b''
+        assert api_client.get(url, HTTP_IF_NONE_MATCH='"stale"').status_code == 200
+
+    def test_query_parameters_are_part_of_the_key(self, api_client):
+        make_project(title='Featured', is_featured=True)
+        make_project(title='Regular', is_featured=False)
+        url = reverse('project-list')
+        assert len(api_client.get(url).json()) == 1
+        assert len(api_client.get(url, {'include_all': 'true'}).json()) == 2
+
+    def test_content_changes_invalidate_cached_responses(self, api_client, django_capture_on_commit_callbacks):
+        project = make_project(title='Cub3D', is_featured=True)
+        url = reverse('project-detail', kwargs={'slug': project.slug})
+        etag = api_client.get(url)['ETag']
+
+        version = content_version()
+        with django_capture_on_commit_callbacks(execute=True):
+            Gallery.objects.create(project=project, name='Screenshots')
+        assert content_version() > version
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['galleries'][0]['name'] == 'Screenshots'
+
+    def test_errors_are_not_cached(self, api_client):
+        url = reverse('project-detail', kwargs={'slug': 'late-project'})
+        assert api_client.get(url).status_code == 404
+        make_project(title='Late Project')
+        assert api_client.get(url).status_code == 200
+
+    def test_browsable_api_bypasses_the_cache(self, api_client):
+        project = make_project(title='Philosophers')
+        url = reverse('project-detail', kwargs={'slug': project.slug})
+        response = api_client.get(url, HTTP_ACCEPT='text/html')
+        assert 'X-Cache' not in response
+
+    def test_project_by_slug_is_cached(self):
+        make_project(title='Minitalk')
+        factory = APIRequestFactory()
+        first = views.project_by_slug(factory.get('/api/project-by-slug/', {'slug': 'minitalk'}))
+        second = views.project_by_slug(factory.get('/api/project-by-slug/', {'slug': 'minitalk'}))
+        assert (first['X-Cache'], second['X-Cache']) == ('MISS', 'HIT')
+        assert second.content == first.content
+
+
+class TestContentVersion:
+
+    def test_bump_recovers_from_a_flushed_cache(self):
+        from django.core.cache import cache
+        before = content_version()
+        assert bump_content_version() == before + 1
+        cache.clear()
+        assert bump_content_version() == 2
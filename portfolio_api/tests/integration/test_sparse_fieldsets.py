@@ -0,0 +1,62 @@
+# tests/integration/test_sparse_fieldsets.py
+"""Integration tests for compact and sparse project listings."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from projects.serializers import ProjectListSerializer
+from tests.conftest import make_project
+
+
+@pytest.fixture
+def projects(db):
+    return [
+        make_project(
+            title=f'Project {i}', is_featured=True, score=i, readme='# README ' * 500,
+            code_snippets={'main': {'code': 'int main(void);'}}, tech_stack=['C'],
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestSparseProjectList:
+
+    def test_compact_list(self, api_client, projects):
+        data = api_client.get(reverse('project-list'), {'compact': 'true'}).json()
+        assert [p['title'] for p in data] == ['Project 2', 'Project 1', 'Project 0']
+        assert set(data[0]) == set(ProjectListSerializer.Meta.fields)
+
+    def test_fields_and_exclude(self, api_client, projects):
+        url = reverse('project-list')
+        data = api_client.get(url, {'fields': 'slug,title,tech_stack', 'exclude': 'tech_stack'}).json()
+        assert data[0] == {'title': 'Project 2', 'slug': 'project-2'}
+        data = api_client.get(url, {'exclude': 'readme,galleries'}).json()
+        assert 'readme' not in data[0] and 'galleries' not in data[0]
+        assert data[0]['code_snippets'] == {'main': {'code': 'int main(void);'}}
+
+    def test_fields_apply_to_the_compact_list(self, api_client, projects):
+        data = api_client.get(reverse('project-list'), {'compact': 'true', 'fields': 'slug,readme'}).json()
+        assert data[0] == {'slug': 'project-2'}
+
+    def test_large_columns_are_not_fetched(self, api_client, projects):
+        with CaptureQueriesContext(connection) as captured:
+            api_client.get(reverse('project-list'), {'compact': 'true'})
+        sql = captured[0]['sql']
+        for column in ('readme', 'code_snippets', 'code_steps', 'demo_commands'):
+            assert f'"{column}"' not in sql
+
+    def test_sparse_lists_are_cached_separately(self, api_client, projects):
+        url = reverse('project-list')
+        assert api_client.get(url, {'fields': 'slug'})['X-Cache'] == 'MISS'
+        assert api_client.get(url, {'fields': 'title'})['X-Cache'] == 'MISS'
+        response = api_client.get(url, {'fields': 'slug'})
+        assert response['X-Cache'] == 'HIT'
+        assert response.json()[0] == {'slug': 'project-2'}
+
+    def test_default_list_is_unchanged(self, api_client, projects):
+        data = api_client.get(reverse('project-list')).json()
+        assert data[0]['readme'].startswith('# README')
+        assert data[0]['galleries'] == []
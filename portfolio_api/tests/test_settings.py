@@ -44,6 +44,10 @@ CHANNEL_LAYERS = {
     }
 }
 
+# ── Project documents — built inline, with the test client's host ────────────
+PROJECT_DOCUMENT_BASE_URL = 'http://testserver/'
+PROJECT_DOCUMENTS_ASYNC = False
+
 # ── Misc tweaks ───────────────────────────────────────────────────────────────
 DEBUG = True
 ALLOWED_HOSTS = ['*']
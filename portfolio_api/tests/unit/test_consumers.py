@@ -0,0 +1,139 @@
+# tests/unit/test_consumers.py
+"""Unit tests for the terminal proxy's JSON <-> binary frame translation."""
+
+import json
+import struct
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from projects.consumers import (
+    OP_CONTROL,
+    OP_INPUT,
+    OP_OUTPUT,
+    OP_RESIZE,
+    TerminalConsumer,
+    binary_to_json,
+    build_terminal_url,
+    json_to_binary,
+)
+
+# ═════════════════════════════════════════════════════════════════════════════
+# json_to_binary
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestJsonToBinary:
+
+    def test_output_frame(self):
+        frame = json_to_binary(json.dumps({'output': 'héllo'}), outgoing=True)
+        assert frame == bytes((OP_OUTPUT,)) + 'héllo'.encode('utf-8')
+
+    def test_input_frame(self):
+        frame = json_to_binary(json.dumps({'input': 'ls\r'}), outgoing=False)
+        assert frame == bytes((OP_INPUT,)) + b'ls\r'
+
+    def test_resize_frame(self):
+        frame = json_to_binary(json.dumps({'resize': {'rows': 40, 'cols': 120}}), outgoing=False)
+        assert frame == bytes((OP_RESIZE,)) + struct.pack('!HH', 40, 120)
+
+    @pytest.mark.parametrize('resize', [
+        {'rows': -1, 'cols': 80},
+        {'rows': 24, 'cols': 70000},
+        {'rows': None, 'cols': 80},
+        {'rows': 'tall', 'cols': 80},
+        {'rows': [24], 'cols': 80},
+    ])
+    def test_invalid_resize_raises_value_error(self, resize):
+        with pytest.raises(ValueError):
+            json_to_binary(json.dumps({'resize': resize}), outgoing=False)
+
+    def test_raw_text_input(self):
+        assert json_to_binary('pwd', outgoing=False) == bytes((OP_INPUT,)) + b'pwd'
+
+    def test_other_messages_become_control(self):
+        frame = json_to_binary(json.dumps({'error': 'Project not found'}), outgoing=True)
+        assert frame[0] == OP_CONTROL
+        assert json.loads(frame[1:]) == {'error': 'Project not found'}
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# binary_to_json
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestBinaryToJson:
+
+    def test_input_frame(self):
+        assert json.loads(binary_to_json(b'\x00ls')) == {'input': 'ls'}
+
+    def test_output_frame(self):
+        assert json.loads(binary_to_json(b'\x01done')) == {'output': 'done'}
+
+    def test_resize_frame(self):
+        frame = bytes((OP_RESIZE,)) + struct.pack('!HH', 24, 80)
+        assert json.loads(binary_to_json(frame)) == {'resize': {'rows': 24, 'cols': 80}}
+
+    def test_truncated_resize_frame_raises(self):
+        with pytest.raises(ValueError):
+            binary_to_json(bytes((OP_RESIZE,)) + b'\x00')
+
+    def test_control_frame_passes_json_through(self):
+        assert binary_to_json(b'\x03{"a": 1}') == '{"a": 1}'
+
+    def test_round_trip(self):
+        text = json.dumps({'input': 'make re\r'})
+        assert json.loads(binary_to_json(json_to_binary(text, outgoing=False))) == {'input': 'make re\r'}
+
+    def test_empty_frame_raises(self):
+        with pytest.raises(ValueError):
+            binary_to_json(b'')
+
+    def test_unknown_opcode_raises(self):
+        with pytest.raises(ValueError):
+            binary_to_json(b'\x09abc')
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# TerminalConsumer.receive
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestReceive:
+
+    def consumer(self, upstream_binary):
+        consumer = TerminalConsumer()
+        consumer.terminal_ws = mock.AsyncMock()
+        consumer.upstream_binary = upstream_binary
+        return consumer
+
+    def test_out_of_range_resize_is_dropped(self):
+        consumer = self.consumer(upstream_binary=True)
+        async_to_sync(consumer.receive)(text_data=json.dumps({'resize': {'rows': -1, 'cols': 80}}))
+        consumer.terminal_ws.send.assert_not_called()
+        # The consumer keeps relaying afterwards
+        async_to_sync(consumer.receive)(text_data=json.dumps({'input': 'ls\r'}))
+        consumer.terminal_ws.send.assert_called_once_with(bytes((OP_INPUT,)) + b'ls\r')
+
+    def test_truncated_binary_resize_is_dropped(self):
+        consumer = self.consumer(upstream_binary=False)
+        async_to_sync(consumer.receive)(bytes_data=bytes((OP_RESIZE,)) + b'\x00')
+        consumer.terminal_ws.send.assert_not_called()
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# build_terminal_url
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestBuildTerminalUrl:
+
+    def test_production_url(self):
+        url = build_terminal_url('wss://terminal.example.com', 'minishell', {'token': ['jwt']})
+        assert url == 'wss://terminal.example.com/terminal/minishell/'
+
+    def test_bare_host_gets_wss(self):
+        assert build_terminal_url('terminal:8000', 'fdf', {}) == 'wss://terminal:8000/terminal/fdf/'
+
+    def test_resume_parameters_are_forwarded(self):
+        query = {'token': ['jwt'], 'session': ['abc'], 'resume': ['t0k'], 'offset': ['42']}
+        url = build_terminal_url('wss://terminal.example.com', 'minishell', query)
+        # The JWT stays with the proxy; only resume parameters go upstream
+        assert url == 'wss://terminal.example.com/terminal/minishell/?session=abc&resume=t0k&offset=42'
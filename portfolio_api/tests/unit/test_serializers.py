@@ -1,7 +1,15 @@
 # tests/unit/test_serializers.py
 """Unit tests for serializer helper functions and serializer field validation."""
 
-from projects.serializers import validate_code_snippets, validate_code_steps
+from django.http import QueryDict
+
+from projects.serializers import (
+    ProjectListSerializer,
+    ProjectSerializer,
+    sparse_fieldset,
+    validate_code_snippets,
+    validate_code_steps,
+)
 
 # ═════════════════════════════════════════════════════════════════════════════
 # validate_code_steps
@@ -86,3 +94,29 @@ class TestValidateCodeSnippets:
         data = {'parse_input': 'some code'}
         result = validate_code_snippets(data)
         assert result['parse_input']['title'] == 'Parse Input'
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# Sparse fieldsets
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestSparseFieldsets:
+
+    def test_parses_fields_and_exclude(self):
+        assert sparse_fieldset(QueryDict('fields=id, title,,slug&exclude=slug')) == ({'id', 'title', 'slug'}, {'slug'})
+        assert sparse_fieldset(QueryDict('')) == (None, None)
+        assert sparse_fieldset(QueryDict('fields=')) == (set(), None)
+
+    def test_fields_and_exclude_trim_the_serializer(self):
+        serializer = ProjectSerializer(fields={'id', 'title', 'slug', 'readme'}, exclude={'readme'})
+        assert set(serializer.fields) == {'id', 'title', 'slug'}
+
+    def test_model_columns_follow_method_field_sources(self):
+        serializer = ProjectSerializer(fields={'title', 'thumbnail_url', 'galleries', 'architecture_diagram'})
+        # Galleries are a relation and the diagram is write-only
+        assert serializer.model_columns() == ['id', 'title', 'thumbnail']
+
+    def test_list_serializer_leaves_out_large_columns(self):
+        columns = ProjectListSerializer().model_columns()
+        for column in ('readme', 'code_snippets', 'code_steps', 'demo_commands', 'challenges'):
+            assert column not in columns
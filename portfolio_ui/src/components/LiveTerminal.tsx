@@ -16,6 +16,11 @@ interface LiveTerminalProps {
   slug: string;
 }
 
+// Reconnect backoff after a dropped connection: 1s, 2s, 4s... up to 30s
+const RECONNECT_BASE_DELAY = 1000;
+const RECONNECT_MAX_DELAY = 30000;
+const MAX_RECONNECT_ATTEMPTS = 8;
+
 // Function to get an auth token
 async function fetchAuthToken() {
   try {
@@ -99,6 +104,8 @@ export default function LiveTerminal({ project, slug }: LiveTerminalProps) {
     }
     
     isInitializingRef.current = true;
+    let disposed = false;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
 
     // Initialization delay to ensure DOM is ready and avoid race conditions
     const initTimer = setTimeout(() => {
@@ -176,71 +183,118 @@ export default function LiveTerminal({ project, slug }: LiveTerminalProps) {
         
         try {
           term.write('Connecting to secure terminal...\r\n');
-          const socket = new WebSocket(wsUrl);
-          socketRef.current = socket;
           
-          // Connection timeout - increased to 15 seconds for Render cold starts
-          const connectionTimeout = setTimeout(() => {
-            if (socket.readyState === WebSocket.CONNECTING) {
-              socket.close();
-              setError('Connection timed out - server may be starting up. Please try again.');
-              setIsLoading(false);
-            }
-          }, 15000); // Increased from 5s to 15s
-          
-          // Socket event handlers
-          socket.onopen = () => {
-            clearTimeout(connectionTimeout);
-            setConnected(true);
-            setIsLoading(false);
-            term.write('Connected to terminal server...\r\n');
-            setTimeout(() => term.focus(), 500);
-          };
+          // Flow control: once the server announces it, ack the output
+          // offset xterm has rendered so a flood of output waits for us
+          const encoder = new TextEncoder();
+          let outputOffset = 0;
+          let ackedOffset = 0;
+          let ackBytes = 0;
+          // Offset of the next byte to arrive, which a resume replays from
+          let receivedOffset = 0;
+          // Id and token of our session on the server, to reattach to it
+          let session: { id: string; token: string } | null = null;
+          let attempt = 0;
           
-          socket.onclose = (event) => {
-            clearTimeout(connectionTimeout);
-            setConnected(false);
-            term.write('\r\nConnection closed. Please refresh to reconnect.\r\n');
+          const connect = () => {
+            const url = session
+              ? `${wsUrl}&session=${encodeURIComponent(session.id)}&resume=${encodeURIComponent(session.token)}&offset=${receivedOffset}`
+              : wsUrl;
+            const socket = new WebSocket(url);
+            socketRef.current = socket;
             
-            if (event.code === 4003) {
-              setError('Authentication failed. Please refresh the page.');
-            } else if (!event.wasClean) {
-              setError(`Connection failed (code: ${event.code}). Please try again.`);
-            }
-          };
-          
-          socket.onerror = (event) => {
-            console.error('❌ WebSocket error occurred');
-            console.error('  - Event:', event);
-            console.error('  - ReadyState:', socket.readyState);
-            console.error('  - URL:', wsUrl);
-            clearTimeout(connectionTimeout);
-            setConnected(false);
-            setIsLoading(false);
-            setError('WebSocket connection failed - check browser console for details');
-            term.write('\r\nError connecting to terminal server.\r\n');
-          };
-          
-          socket.onmessage = (event) => {
-            try {
-              const data = JSON.parse(event.data);
-              if (data.output) {
-                term.write(data.output);
+            // Connection timeout - increased to 15 seconds for Render cold starts
+            const connectionTimeout = setTimeout(() => {
+              if (socket.readyState === WebSocket.CONNECTING) {
+                socket.close();
               }
-              // Handle auth challenge if implemented
-              if (data.action === 'require_mfa') {
-                // Show MFA dialog to user
-                promptForMFA(socket);
+            }, 15000); // Increased from 5s to 15s
+            
+            // Socket event handlers
+            socket.onopen = () => {
+              clearTimeout(connectionTimeout);
+              attempt = 0;
+              setConnectionAttempts(0);
+              setConnected(true);
+              setIsLoading(false);
+              setError(null);
+              term.write(session ? '\r\nReconnected to terminal server...\r\n' : 'Connected to terminal server...\r\n');
+              setTimeout(() => term.focus(), 500);
+            };
+            
+            socket.onclose = (event) => {
+              clearTimeout(connectionTimeout);
+              if (disposed || socketRef.current !== socket) return;
+              setConnected(false);
+              
+              if (event.code === 4003) {
+                setError('Authentication failed. Please refresh the page.');
+                return;
               }
-            } catch (e) {
-              // If not JSON, write directly
-              term.write(event.data);
-            }
+              // Closed on purpose: the session ended (4001), another tab
+              // took it over (4000), or the shell exited
+              if (event.code === 4000 || event.code === 4001 || event.code === 1000) {
+                term.write('\r\nConnection closed. Please refresh to reconnect.\r\n');
+                return;
+              }
+              if (attempt >= MAX_RECONNECT_ATTEMPTS) {
+                setIsLoading(false);
+                setError(`Connection failed (code: ${event.code}). Please try again.`);
+                return;
+              }
+              const delay = Math.min(RECONNECT_BASE_DELAY * 2 ** attempt, RECONNECT_MAX_DELAY);
+              attempt += 1;
+              setConnectionAttempts(attempt);
+              term.write(`\r\nConnection lost. Reconnecting in ${Math.round(delay / 1000)}s...\r\n`);
+              reconnectTimer = setTimeout(connect, delay);
+            };
+            
+            socket.onerror = (event) => {
+              // onclose follows and decides whether to reconnect
+              console.error('❌ WebSocket error occurred');
+              console.error('  - Event:', event);
+              console.error('  - ReadyState:', socket.readyState);
+              console.error('  - URL:', wsUrl);
+            };
+            
+            socket.onmessage = (event) => {
+              try {
+                const data = JSON.parse(event.data);
+                if (data.session && typeof data.session.offset === 'number') {
+                  session = { id: data.session.id, token: data.session.token };
+                  outputOffset = ackedOffset = receivedOffset = data.session.offset;
+                }
+                if (data.flow && typeof data.flow.ack_bytes === 'number') {
+                  ackBytes = data.flow.ack_bytes;
+                }
+                if (data.output) {
+                  const size = encoder.encode(data.output).length;
+                  receivedOffset += size;
+                  term.write(data.output, () => {
+                    outputOffset += size;
+                    if (ackBytes > 0 && outputOffset - ackedOffset >= ackBytes && socket.readyState === WebSocket.OPEN) {
+                      ackedOffset = outputOffset;
+                      socket.send(JSON.stringify({ ack: outputOffset }));
+                    }
+                  });
+                }
+                // Handle auth challenge if implemented
+                if (data.action === 'require_mfa') {
+                  // Show MFA dialog to user
+                  promptForMFA(socket);
+                }
+              } catch (e) {
+                // If not JSON, write directly
+                term.write(event.data);
+              }
+            };
           };
+          connect();
           
           // Input handling
           term.onData((data) => {
-            if (socket.readyState === WebSocket.OPEN) {
+            const socket = socketRef.current;
+            if (socket?.readyState === WebSocket.OPEN) {
               socket.send(JSON.stringify({ 
                 input: data
               }));
@@ -248,7 +302,7 @@ export default function LiveTerminal({ project, slug }: LiveTerminalProps) {
           });
           
           // Set up resize handling
-          const handleResize = () => { resizeTerminal(term, fitAddon, socket); };
+          const handleResize = () => { resizeTerminal(term, fitAddon, socketRef.current); };
           resizeHandlerRef.current = handleResize;
           
           window.addEventListener('resize', handleResize);
@@ -276,6 +330,8 @@ export default function LiveTerminal({ project, slug }: LiveTerminalProps) {
     // Cleanup function
     return () => {
       clearTimeout(initTimer);
+      clearTimeout(reconnectTimer);
+      disposed = true;
       isInitializingRef.current = false;
       
       // Clean up event listeners